@@ -0,0 +1,197 @@
+"""
+Agregação de ticks (ou candles t1) em candles de qualquer timeframe.
+
+Timeframes no formato do factory: tN (minutos), hN (horas) e d1 (dia),
+por exemplo t1, t2, t5, t7, t15, h1, h4, d1. Timeframes maiores que um dia
+(d2, d5, h48, ...) são rejeitados: as fronteiras são contadas a partir da
+meia-noite de cada dia e eles virariam candles diários.
+
+Regras de fronteira (as mesmas do MT5 e dos CSVs de backtest):
+    - o candle é rotulado pelo horário de abertura
+    - intervalo fechado à esquerda: [abertura, abertura + timeframe)
+    - fronteiras contadas a partir da meia-noite de cada dia (um t7 começa
+      às 00:00, 00:07, ...; um h4 às 00:00, 04:00, ...)
+
+resample_bars agrega um bloco inteiro de uma vez; BarAggregator faz o
+mesmo em streaming, bloco a bloco (arquivos grandes em chunks ou ticks do
+MT5 ao vivo), carregando o candle em formação entre os blocos.
+
+Exemplo:
+
+    aggregator = BarAggregator('t5')
+    for chunk in pd.read_csv('ticks.csv', index_col=0, parse_dates=True, chunksize=1_000_000):
+        store.append('WIN@N', 't5', aggregator.update(chunk))
+    store.append('WIN@N', 't5', aggregator.flush())
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+
+TIMEFRAME_PATTERN = re.compile(r'^([thd])(\d+)$')
+UNIT_MINUTES = {'t': 1, 'h': 60, 'd': 1440}
+MAX_MINUTES = 1440
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'tick_volume', 'volume']
+DAY_NS = 86_400 * 10**9
+
+
+def timeframe_minutes(timeframe):
+    """
+    Duração do timeframe em minutos
+
+    Raises:
+        ValueError: Se o timeframe não estiver no formato tN/hN/d1 ou passar de um dia
+    """
+    match = TIMEFRAME_PATTERN.match(timeframe.lower())
+    if not match or int(match.group(2)) == 0:
+        raise ValueError(f"Timeframe inválido: {timeframe} (use tN, hN ou d1)")
+    minutes = UNIT_MINUTES[match.group(1)] * int(match.group(2))
+    if minutes > MAX_MINUTES:
+        raise ValueError(f"Timeframe inválido: {timeframe} (maior que um dia; as fronteiras "
+                         f"são contadas a partir da meia-noite)")
+    return minutes
+
+
+def timeframe_delta(timeframe):
+    """Duração do timeframe como Timedelta"""
+    return pd.Timedelta(minutes=timeframe_minutes(timeframe))
+
+
+def bar_starts(times, timeframe):
+    """
+    Abertura do candle de cada horário
+
+    Args:
+        times (pandas.DatetimeIndex): Horários (ticks ou candles menores)
+        timeframe (str): Timeframe de destino
+
+    Returns:
+        numpy.ndarray: datetime64[ns] com a abertura do candle de cada horário
+    """
+    step = timeframe_minutes(timeframe) * 60 * 10**9
+    t = np.asarray(times, dtype='datetime64[ns]').astype(np.int64)
+    day = t - t % DAY_NS
+    return (day + (t - day) // step * step).astype('datetime64[ns]')
+
+
+def _columns(df, price_column):
+    """Extrai open/high/low/close/tick_volume/volume de candles ou ticks"""
+    if 'open' in df:
+        tick_volume = df['tick_volume'] if 'tick_volume' in df else pd.Series(1, index=df.index)
+        volume = df['volume'] if 'volume' in df else pd.Series(0, index=df.index)
+        return (df['open'].to_numpy(float), df['high'].to_numpy(float), df['low'].to_numpy(float),
+                df['close'].to_numpy(float), tick_volume.to_numpy(float), volume.to_numpy(float))
+
+    price = df[price_column].to_numpy(float)
+    if 'volume_real' in df:
+        volume = df['volume_real'].to_numpy(float)
+    elif 'volume' in df:
+        volume = df['volume'].to_numpy(float)
+    else:
+        volume = np.zeros(len(df))
+    return price, price, price, price, np.ones(len(df)), volume
+
+
+def resample_bars(df, timeframe, price_column='last'):
+    """
+    Agrega ticks ou candles em candles do timeframe (bloco inteiro)
+
+    Args:
+        df (pandas.DataFrame): Índice de tempo ordenado; candles (open/high/low/close
+                               [/tick_volume/volume]) ou ticks (price_column [/volume])
+        timeframe (str): Timeframe de destino
+        price_column (str): Coluna de preço dos ticks (last, bid, ...)
+
+    Returns:
+        pandas.DataFrame: Candles com BAR_COLUMNS, índice time (abertura); inclui o
+                          último candle mesmo que ainda esteja em formação
+    """
+    if df.empty:
+        return pd.DataFrame(columns=BAR_COLUMNS, index=pd.DatetimeIndex([], name='time'), dtype=float)
+
+    opens, highs, lows, closes, tick_volume, volume = _columns(df, price_column)
+    starts = bar_starts(df.index, timeframe)
+    first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last = np.r_[first[1:], len(starts)] - 1
+
+    return pd.DataFrame({
+        'open': opens[first],
+        'high': np.maximum.reduceat(highs, first),
+        'low': np.minimum.reduceat(lows, first),
+        'close': closes[last],
+        'tick_volume': np.add.reduceat(tick_volume, first),
+        'volume': np.add.reduceat(volume, first)
+    }, index=pd.DatetimeIndex(starts[first], name='time'))
+
+
+class BarAggregator:
+    """
+    Agregação em streaming de um timeframe
+
+    Cada update devolve só os candles completos; o candle em formação fica
+    guardado e é combinado com o próximo bloco. Um candle fecha quando chega
+    um dado de um candle posterior, por close_until (relógio) ou por flush.
+
+    Args:
+        timeframe (str): Timeframe de destino
+        price_column (str): Coluna de preço dos ticks
+    """
+
+    def __init__(self, timeframe, price_column='last'):
+        self.timeframe = timeframe
+        self.delta = timeframe_delta(timeframe)
+        self.price_column = price_column
+        self.partial = None
+        self.late = 0
+
+    def update(self, df):
+        """
+        Processa um bloco de ticks ou candles (ordenado por tempo)
+
+        Returns:
+            pandas.DataFrame: Candles completados por este bloco (pode ser vazio)
+        """
+        if self.partial is not None and not df.empty:
+            # Dados anteriores ao candle em formação chegaram atrasados e são descartados
+            late = df.index < self.partial.index[0]
+            if late.any():
+                self.late += int(late.sum())
+                df = df[~late]
+
+        bars = resample_bars(df, self.timeframe, self.price_column)
+        if bars.empty:
+            return bars
+
+        if self.partial is not None:
+            if self.partial.index[0] == bars.index[0]:
+                merged = self.partial.iloc[0].copy()
+                merged['high'] = max(merged['high'], bars['high'].iat[0])
+                merged['low'] = min(merged['low'], bars['low'].iat[0])
+                merged['close'] = bars['close'].iat[0]
+                merged['tick_volume'] += bars['tick_volume'].iat[0]
+                merged['volume'] += bars['volume'].iat[0]
+                bars.iloc[0] = merged
+            else:
+                bars = pd.concat([self.partial, bars])
+
+        self.partial = bars.iloc[-1:]
+        return bars.iloc[:-1]
+
+    def close_until(self, time):
+        """
+        Fecha o candle em formação se o horário já passou do seu fim
+
+        Returns:
+            pandas.DataFrame: O candle fechado (ou vazio)
+        """
+        if self.partial is not None and self.partial.index[0] + self.delta <= pd.Timestamp(time):
+            return self.flush()
+        return self.partial.iloc[:0] if self.partial is not None else resample_bars(pd.DataFrame(), self.timeframe)
+
+    def flush(self):
+        """Devolve o candle em formação como completo (fim do arquivo ou do pregão)"""
+        bars = self.partial if self.partial is not None else resample_bars(pd.DataFrame(), self.timeframe)
+        self.partial = None
+        return bars
@@ -0,0 +1,223 @@
+"""
+Store local de candles por símbolo/timeframe e ingestão de ticks em chunks.
+
+Layout (em {base_dir}/{symbol}/{timeframe}/):
+    - YYYY-MM.parquet: candles do mês (pickle se não houver engine de parquet)
+
+Os candles são gravados por mês, então acrescentar um chunk reescreve só os
+meses que ele toca, e carregar um período lê só os meses do período.
+
+A ingestão lê o arquivo de ticks (ou de candles t1) em chunks e alimenta um
+BarAggregator por timeframe, gravando os candles completos de cada chunk:
+a memória usada depende do tamanho do chunk, não do arquivo.
+
+    python common/candle_store.py --source ticks_WIN.csv --symbol WIN@N --timeframes t1 t2 t5 t15 h1
+"""
+
+import os
+import sys
+import json
+import time
+import glob
+import shutil
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from common.bars import BarAggregator, timeframe_minutes
+from common.segments import SEGMENT_EXT, read_segment, write_segment
+
+class CandleStore:
+    """
+    Candles particionados por mês
+
+    Args:
+        base_dir (str): Pasta base do store
+    """
+
+    def __init__(self, base_dir='data/candles'):
+        self.base_dir = base_dir
+
+    def path(self, symbol, timeframe, month=None):
+        folder = os.path.join(self.base_dir, symbol, timeframe)
+        return folder if month is None else os.path.join(folder, f"{month}.{SEGMENT_EXT}")
+
+    def months(self, symbol, timeframe):
+        """Meses gravados (YYYY-MM), em ordem"""
+        files = glob.glob(os.path.join(self.path(symbol, timeframe), '*.*'))
+        return sorted({os.path.basename(f).split('.')[0] for f in files if not f.endswith('.tmp')})
+
+    def timeframes(self, symbol):
+        """Timeframes gravados de um símbolo"""
+        folder = os.path.join(self.base_dir, symbol)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(d for d in os.listdir(folder) if os.path.isdir(os.path.join(folder, d)))
+
+    def meta_path(self, symbol, timeframe):
+        return os.path.join(self.base_dir, symbol, f"{timeframe}.meta.json")
+
+    def read_meta(self, symbol, timeframe):
+        """Metadados gravados com um timeframe (None se não houver)"""
+        try:
+            with open(self.meta_path(symbol, timeframe), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def write_meta(self, symbol, timeframe, meta):
+        """Grava os metadados de um timeframe (escrita atômica)"""
+        path = self.meta_path(symbol, timeframe)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=4)
+        os.replace(f"{path}.tmp", path)
+
+    def drop(self, symbol, timeframe):
+        """Remove todos os candles e metadados gravados de um timeframe"""
+        shutil.rmtree(self.path(symbol, timeframe), ignore_errors=True)
+        if os.path.exists(self.meta_path(symbol, timeframe)):
+            os.remove(self.meta_path(symbol, timeframe))
+
+    def _read_month(self, symbol, timeframe, month):
+        for path in glob.glob(os.path.join(self.path(symbol, timeframe), f"{month}.*")):
+            if not path.endswith('.tmp'):
+                return read_segment(path)
+        return None
+
+    def append(self, symbol, timeframe, bars):
+        """
+        Acrescenta candles (candles já gravados com o mesmo horário são substituídos)
+
+        Returns:
+            int: Quantidade de candles recebidos
+        """
+        if bars is None or bars.empty:
+            return 0
+        os.makedirs(self.path(symbol, timeframe), exist_ok=True)
+
+        for month, chunk in bars.groupby(bars.index.strftime('%Y-%m')):
+            existing = self._read_month(symbol, timeframe, month)
+            if existing is not None:
+                chunk = pd.concat([existing, chunk])
+                chunk = chunk[~chunk.index.duplicated(keep='last')].sort_index()
+            write_segment(chunk, self.path(symbol, timeframe, month))
+        return len(bars)
+
+    def load(self, symbol, timeframe, data_ini=None, data_fim=None):
+        """
+        Lê os candles de um período
+
+        Args:
+            data_ini (str|datetime): Início (inclusivo, opcional)
+            data_fim (str|datetime): Fim (inclusivo, opcional; uma data sem hora inclui o dia todo)
+
+        Returns:
+            pandas.DataFrame: Candles do período (vazio se não houver)
+        """
+        months = self.months(symbol, timeframe)
+        start = pd.Timestamp(data_ini) if data_ini is not None else None
+        end = pd.Timestamp(data_fim) if data_fim is not None else None
+        if end is not None and end == end.normalize():
+            end = end + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+
+        if start is not None:
+            months = [m for m in months if m >= start.strftime('%Y-%m')]
+        if end is not None:
+            months = [m for m in months if m <= end.strftime('%Y-%m')]
+
+        frames = [self._read_month(symbol, timeframe, m) for m in months]
+        frames = [f for f in frames if f is not None]
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames)
+        return df.loc[start:end] if (start is not None or end is not None) else df
+
+
+def read_source(path, chunksize, time_column='time'):
+    """
+    Lê um arquivo de ticks/candles em chunks
+
+    Aceita CSV (com coluna de tempo em datetime ou em segundos/ms epoch, como o
+    copy_ticks do MT5) e parquet/pickle (lidos de uma vez e fatiados).
+
+    Yields:
+        pandas.DataFrame: Chunks indexados por tempo
+    """
+    if path.endswith('.csv'):
+        chunks = pd.read_csv(path, chunksize=chunksize)
+    else:
+        df = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_pickle(path)
+        if time_column not in df:
+            df = df.reset_index()
+        chunks = (df.iloc[i:i + chunksize] for i in range(0, len(df), chunksize))
+
+    for chunk in chunks:
+        if 'time_msc' in chunk:
+            times = pd.to_datetime(chunk['time_msc'], unit='ms')
+        elif pd.api.types.is_numeric_dtype(chunk[time_column]):
+            times = pd.to_datetime(chunk[time_column], unit='s')
+        else:
+            times = pd.to_datetime(chunk[time_column])
+        yield chunk.drop(columns=[c for c in (time_column, 'time_msc') if c in chunk]).set_index(
+            pd.DatetimeIndex(times, name='time'))
+
+
+def aggregate_file(source, symbol, timeframes, store, chunksize=1_000_000, price_column='last'):
+    """
+    Agrega um arquivo de ticks (ou candles t1) em vários timeframes, em chunks
+
+    Args:
+        source (str): Arquivo de ticks/candles ordenado por tempo
+        symbol (str): Símbolo no store
+        timeframes (list): Timeframes de destino
+        store (CandleStore): Onde gravar os candles
+        chunksize (int): Linhas por chunk
+        price_column (str): Coluna de preço dos ticks
+
+    Returns:
+        dict: Candles gravados por timeframe
+    """
+    aggregators = {tf: BarAggregator(tf, price_column) for tf in timeframes}
+    written = {tf: 0 for tf in timeframes}
+    rows = 0
+    start = time.time()
+
+    for chunk in read_source(source, chunksize):
+        rows += len(chunk)
+        for tf, aggregator in aggregators.items():
+            written[tf] += store.append(symbol, tf, aggregator.update(chunk))
+        print(f"{rows:,} linhas processadas ({time.time() - start:.1f}s)")
+
+    for tf, aggregator in aggregators.items():
+        written[tf] += store.append(symbol, tf, aggregator.flush())
+        if aggregator.late:
+            print(f"{tf}: {aggregator.late} linhas fora de ordem descartadas")
+    return written
+
+
+def main():
+    """Ingestão de ticks/candles t1 no store de candles"""
+    parser = argparse.ArgumentParser(description='Agrega ticks em candles por timeframe')
+    parser.add_argument('--source', required=True, help='CSV/parquet de ticks ou candles t1')
+    parser.add_argument('--symbol', required=True)
+    parser.add_argument('--timeframes', nargs='+', default=['t1', 't2', 't5'])
+    parser.add_argument('--store', default='data/candles')
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    parser.add_argument('--price-column', default='last')
+    args = parser.parse_args()
+
+    for tf in args.timeframes:
+        timeframe_minutes(tf)
+
+    written = aggregate_file(args.source, args.symbol, args.timeframes, CandleStore(args.store),
+                             chunksize=args.chunksize, price_column=args.price_column)
+    for tf, n in written.items():
+        print(f"{args.symbol} {tf}: {n} candles gravados em {args.store}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Registro único dos instrumentos: custos, valor do lote, tick, sessão,
+fuso e local dos dados.
+
+factory/config/dicts_params.py e os dois drivers de backtest do controle
+tinham cópias próprias de dict_custos, dict_valor_lot e dict_path, que
+divergiam entre si. Todos passam a consultar INSTRUMENTS:
+
+    instrument = INSTRUMENTS.get('WINQ25')      # contrato -> WIN@N
+    bt = Backtester(symbol=..., tc=instrument.tc, valor_lote=instrument.valor_lote,
+                    path_base=instrument.path_base, ...)
+
+Os dados continuam sendo carregados pelo Backtester a partir de path_base.
+"""
+
+import re
+from collections import namedtuple
+
+
+PATH_B3 = 'C:/Users/User/OneDrive/Documentos/rnt/Finance/Trading Projects/00.database/candlestick data/futuros/'
+PATH_TICKMILL = 'C:/Users/User/OneDrive/Documentos/rnt/Finance/Trading Projects/00.database/tickmill/forex/'
+
+# Valores usados pelos drivers para símbolos fora do registro
+DEFAULT_TC = 0.5
+DEFAULT_VALOR_LOTE = 100000
+DEFAULT_PATH = './data/'
+
+# Contrato de futuro da B3 (ex: WINQ25, WDON25) -> série contínua (WIN@N, WDO@N)
+B3_CONTRACT = re.compile(r'^([A-Z]{3})[FGHJKMNQUVXZ]\d{2}$')
+
+
+class Instrument(namedtuple('Instrument', [
+        'symbol', 'tc', 'valor_lote', 'tick_size', 'session', 'timezone', 'path_base', 'venue'])):
+    """
+    Parâmetros de um instrumento
+
+    Attributes:
+        symbol (str): Símbolo no factory (ex: WIN@N, EURUSD)
+        tc (float): Custo por lote
+        valor_lote (float): Valor do ponto por lote
+        tick_size (float): Variação mínima de preço (None = não cadastrada)
+        session (tuple): (abertura, fechamento) 'HH:MM' no fuso do instrumento
+                         (None = sem restrição além da sessão do servidor)
+        timezone (str): Fuso dos horários dos candles
+        path_base (str): Pasta dos dados usada pelo Backtester
+        venue (str): b3 ou tickmill
+    """
+
+
+def _b3(symbol, tc, valor_lote, tick_size, session):
+    return Instrument(symbol, tc, valor_lote, tick_size, session, 'America/Sao_Paulo', PATH_B3, 'b3')
+
+
+def _tickmill(symbol, valor_lote=100000, tick_size=None, tc=3):
+    # Servidor da Tickmill: GMT+2 (GMT+3 no horário de verão)
+    return Instrument(symbol, tc, valor_lote, tick_size, None, 'EET', PATH_TICKMILL, 'tickmill')
+
+
+FX_PAIRS = ['USDCAD', 'AUDUSD', 'EURUSD', 'GBPUSD', 'NZDUSD', 'USDCHF', 'USDJPY', 'AUDCAD', 'AUDCHF',
+            'AUDJPY', 'AUDNZD', 'CADCHF', 'CADJPY', 'CHFJPY', 'EURAUD', 'EURCAD', 'EURCHF', 'EURGBP',
+            'EURHKD', 'EURJPY', 'EURMXN', 'EURNZD', 'EURTRY', 'GBPCAD', 'GBPCHF', 'GBPJPY', 'USDCNH',
+            'USDCZK', 'USDMXN', 'USDTRY']
+INDICES = ['STOXX50', 'UK100', 'DE40', 'FRANCE40', 'US500']
+COMMODITIES = ['VIX', 'ALUMINIUM', 'PLATINUM', 'LEAD', 'NICKEL', 'PALLADIUM', 'ZINC', 'COPPER', 'DXY',
+               'COCOA', 'SUGAR', 'WHEAT', 'NAT.GAS', 'BRENT']
+ETFS = ['EEM', 'EWZ', 'IWM', 'TLT', 'SPY', 'DIA']
+
+INSTRUMENT_LIST = (
+    [_b3('WIN@N', 0.2 * 5, 0.2, 5.0, ('09:00', '18:25')),
+     _b3('WDO@N', 2.40 / 2, 10.0, 0.5, ('09:00', '18:30')),
+     _b3('WSP@N', 0.2 * 5, 2.5, 0.25, ('09:00', '18:25')),
+     _b3('BIT@N', 0.2 * 5, 1.0, None, ('09:00', '18:25'))]
+    + [_tickmill(s, tick_size=0.001 if s.endswith('JPY') else 0.00001) for s in FX_PAIRS]
+    + [_tickmill('XAUUSD', tick_size=0.01), _tickmill('XAGUSD', tick_size=0.001)]
+    + [_tickmill(s, valor_lote=1) for s in INDICES]
+    + [_tickmill(s) for s in COMMODITIES + ETFS]
+)
+
+
+class InstrumentRegistry:
+    """
+    Consulta de instrumentos por símbolo
+
+    Args:
+        instruments (list): Instrumentos do registro
+    """
+
+    def __init__(self, instruments):
+        self.instruments = {i.symbol: i for i in instruments}
+
+    def __contains__(self, symbol):
+        return self.find(symbol) is not None
+
+    def __iter__(self):
+        return iter(self.instruments.values())
+
+    def find(self, symbol):
+        """Instrumento do símbolo ou do contrato da B3 (WINQ25 -> WIN@N); None se não cadastrado"""
+        instrument = self.instruments.get(symbol)
+        if instrument is None:
+            match = B3_CONTRACT.match(symbol)
+            if match:
+                instrument = self.instruments.get(f"{match.group(1)}@N")
+        return instrument
+
+    def get(self, symbol, fallback=False):
+        """
+        Instrumento de um símbolo
+
+        Args:
+            symbol (str): Símbolo ou contrato
+            fallback (bool): Para símbolos não cadastrados, retorna os padrões antigos
+                             dos drivers (DEFAULT_TC, DEFAULT_VALOR_LOTE, DEFAULT_PATH)
+
+        Raises:
+            KeyError: Símbolo não cadastrado (sem fallback)
+        """
+        instrument = self.find(symbol)
+        if instrument is not None:
+            return instrument
+        if fallback:
+            return Instrument(symbol, DEFAULT_TC, DEFAULT_VALOR_LOTE, None, None, None, DEFAULT_PATH, None)
+        raise KeyError(f"Instrumento não cadastrado: {symbol}")
+
+    def as_dict(self, field):
+        """Dicionário símbolo -> campo (formato dos antigos dict_custos/dict_valor_lot/dict_path)"""
+        return {symbol: getattr(i, field) for symbol, i in self.instruments.items()}
+
+
+INSTRUMENTS = InstrumentRegistry(INSTRUMENT_LIST)
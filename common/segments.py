@@ -0,0 +1,48 @@
+"""
+Leitura e gravação dos segmentos (arquivos de um DataFrame) dos stores locais.
+
+Os segmentos são gravados em parquet quando há engine instalada (pyarrow ou
+fastparquet) e em pickle caso contrário; SEGMENT_EXT indica o formato em
+uso e a extensão de cada arquivo define como ele é lido, então stores
+gravados nos dois formatos continuam legíveis.
+
+Usado por common/candle_store.py e controle/deal_store.py.
+"""
+
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    SEGMENT_EXT = 'parquet'
+except ImportError:
+    try:
+        import fastparquet  # noqa: F401
+        SEGMENT_EXT = 'parquet'
+    except ImportError:
+        SEGMENT_EXT = 'pkl'
+
+
+def write_segment(df, path, index=True):
+    """
+    Grava um segmento de forma atômica (arquivo .tmp + rename) no formato da extensão
+
+    Args:
+        df (pandas.DataFrame): Dados do segmento
+        path (str): Caminho final (.parquet ou .pkl)
+        index (bool): Grava o índice (só faz diferença no parquet)
+    """
+    tmp_path = f"{path}.tmp"
+    if path.endswith('.parquet'):
+        df.to_parquet(tmp_path, index=index)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def read_segment(path):
+    """Lê um segmento gravado por write_segment"""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
@@ -0,0 +1,287 @@
+"""
+Candles OHLCV em memória compartilhada para processos worker.
+
+Com ProcessPoolExecutor, passar um DataFrame para cada tarefa serializa os
+candles inteiros (pickle) a cada envio. Aqui o processo pai copia os
+candles de cada símbolo uma única vez para um bloco de memória
+compartilhada (multiprocessing.shared_memory) e envia aos workers só a
+descrição do bloco (SharedFrameSpec: nome, linhas e colunas). O worker
+abre o bloco pelo nome e monta views NumPy sobre a mesma memória, sem
+cópia.
+
+Layout de cada bloco: índice de tempo (int64, ns) seguido dos valores
+(float64, uma coluna contígua após a outra).
+
+Ciclo de vida:
+    - pai: SharedOHLC cria os blocos e os mantém abertos (no Windows o bloco
+      some quando o último handle fecha); close() (ou o fim do with, ou a
+      saída do interpretador) fecha e remove todos eles
+    - worker: attach/attach_all abrem os blocos uma vez por processo;
+      detach_all fecha as views ao final
+
+Exemplo:
+
+    with SharedOHLC() as plane:
+        plane.publish_symbols(['WIN@N', 'WDO@N'], 't5', '2024-01-01', '2025-06-30')
+        with ProcessPoolExecutor(4, initializer=attach_all, initargs=(plane.specs(),)) as executor:
+            ...
+
+    # no worker
+    df = shared_frame(('WIN@N', 't5')).to_frame()
+"""
+
+import time
+import pickle
+import weakref
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'tick_volume', 'volume']
+
+SharedFrameSpec = namedtuple('SharedFrameSpec', ['shm_name', 'key', 'nrows', 'columns'])
+
+
+def _open_block(name):
+    """Abre um bloco existente sem registrá-lo para remoção neste processo"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: o bloco é registrado no resource_tracker, que é o mesmo do pai
+        return shared_memory.SharedMemory(name=name)
+
+
+def _release(blocks):
+    """Fecha e remove blocos (chamado por close e na saída do interpretador)"""
+    for shm in blocks.values():
+        try:
+            shm.close()
+        except BufferError:
+            pass
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+    blocks.clear()
+
+
+class SharedFrame:
+    """
+    Views NumPy sobre um bloco compartilhado
+
+    Args:
+        spec (SharedFrameSpec): Descrição do bloco
+        shm (SharedMemory): Bloco aberto
+        readonly (bool): Bloqueia escrita nas views (padrão nos workers)
+    """
+
+    def __init__(self, spec, shm, readonly=True):
+        self.spec = spec
+        self.shm = shm
+        n, k = spec.nrows, len(spec.columns)
+        self.index_ns = np.ndarray((n,), dtype=np.int64, buffer=shm.buf)
+        self.values = np.ndarray((n, k), dtype=np.float64, buffer=shm.buf, offset=n * 8, order='F')
+        if readonly:
+            self.index_ns.flags.writeable = False
+            self.values.flags.writeable = False
+
+    def __len__(self):
+        return self.spec.nrows
+
+    @property
+    def index(self):
+        return pd.DatetimeIndex(self.index_ns.view('datetime64[ns]'), name='time')
+
+    def column(self, name):
+        """View de uma coluna (sem cópia)"""
+        return self.values[:, self.spec.columns.index(name)]
+
+    def arrays(self):
+        """Dicionário coluna -> view"""
+        return {c: self.values[:, i] for i, c in enumerate(self.spec.columns)}
+
+    def to_frame(self):
+        """DataFrame sobre as views (as funções de entrada que acrescentam colunas não alteram o bloco)"""
+        return pd.DataFrame(self.values, index=self.index, columns=list(self.spec.columns), copy=False)
+
+    def close(self):
+        self.index_ns = self.values = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # Ainda há DataFrames/views vivos apontando para o bloco; o pai remove o bloco no fim
+            pass
+
+
+class SharedOHLC:
+    """
+    Blocos compartilhados criados pelo processo pai
+
+    Os blocos são removidos em close(), no fim do with ou, se nada disso
+    acontecer, na saída do interpretador.
+    """
+
+    def __init__(self):
+        self.blocks = {}
+        self._specs = {}
+        self._finalizer = weakref.finalize(self, _release, self.blocks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def publish(self, key, df, columns=None):
+        """
+        Copia os candles para um bloco compartilhado
+
+        Args:
+            key: Chave do bloco (ex: ('WIN@N', 't5'))
+            df (pandas.DataFrame): Candles com índice de tempo
+            columns (list): Colunas publicadas (padrão: as de OHLCV_COLUMNS presentes)
+
+        Returns:
+            SharedFrameSpec: Descrição enviada aos workers
+        """
+        if key in self._specs:
+            raise ValueError(f"Bloco já publicado: {key}")
+        columns = tuple(columns or [c for c in OHLCV_COLUMNS if c in df])
+        n, k = len(df), len(columns)
+        shm = shared_memory.SharedMemory(create=True, size=max(n * 8 * (k + 1), 1))
+        self.blocks[shm.name] = shm
+
+        # O pai mantém o bloco aberto até close(): no Windows a memória nomeada deixa
+        # de existir assim que o último handle é fechado, e os workers não a encontrariam
+        index = np.ndarray((n,), dtype=np.int64, buffer=shm.buf)
+        index[:] = df.index.values.astype('datetime64[ns]').view(np.int64)
+        values = np.ndarray((n, k), dtype=np.float64, buffer=shm.buf, offset=n * 8, order='F')
+        values[:] = df[list(columns)].to_numpy(dtype=np.float64)
+        del index, values
+
+        spec = SharedFrameSpec(shm.name, key, n, columns)
+        self._specs[key] = spec
+        return spec
+
+    def publish_symbols(self, symbols, timeframe, data_ini=None, data_fim=None, cache=None):
+        """
+        Publica os candles de vários símbolos lidos do store local de candles
+
+        Args:
+            cache (TimeframeCache): Origem dos candles (padrão: CandleStore em data/candles)
+
+        Returns:
+            dict: (símbolo, timeframe) -> SharedFrameSpec
+        """
+        if cache is None:
+            from common.candle_store import CandleStore
+            from common.timeframe_cache import TimeframeCache
+            cache = TimeframeCache(CandleStore())
+        return {(s, timeframe): self.publish((s, timeframe), cache.get(s, timeframe, data_ini, data_fim))
+                for s in symbols}
+
+    def specs(self):
+        """Descrições de todos os blocos publicados"""
+        return dict(self._specs)
+
+    def nbytes(self):
+        """Memória compartilhada alocada (bytes)"""
+        return sum(shm.size for shm in self.blocks.values())
+
+    def close(self):
+        """Fecha e remove todos os blocos"""
+        self._finalizer()
+        self._specs.clear()
+
+
+# Blocos abertos neste processo (worker): shm_name -> SharedFrame
+_ATTACHED = {}
+
+
+def attach(spec):
+    """Abre um bloco pelo nome (uma vez por processo) e retorna suas views"""
+    frame = _ATTACHED.get(spec.shm_name)
+    if frame is None:
+        frame = SharedFrame(spec, _open_block(spec.shm_name))
+        _ATTACHED[spec.shm_name] = frame
+    return frame
+
+
+def attach_all(specs):
+    """Initializer dos workers: abre todos os blocos recebidos"""
+    for spec in (specs.values() if isinstance(specs, dict) else specs):
+        attach(spec)
+
+
+def shared_frame(key):
+    """Bloco já aberto neste processo pela chave de publicação"""
+    for frame in _ATTACHED.values():
+        if frame.spec.key == key:
+            return frame
+    raise KeyError(f"Bloco não aberto neste processo: {key}")
+
+
+def detach_all():
+    """Fecha as views de todos os blocos abertos neste processo"""
+    for frame in _ATTACHED.values():
+        frame.close()
+    _ATTACHED.clear()
+
+
+def _task_frame(df, window):
+    return float(df['close'].rolling(window).mean().iloc[-1])
+
+
+def _task_shared(key, window):
+    return float(pd.Series(shared_frame(key).column('close')).rolling(window).mean().iloc[-1])
+
+
+def benchmark(rows, tasks, workers):
+    """
+    Compara DataFrame serializado por tarefa com o bloco compartilhado
+
+    Returns:
+        list: Um dicionário por modo (seconds, bytes enviados por tarefa)
+    """
+    index = pd.date_range('2020-01-01', periods=rows, freq='min', name='time')
+    close = 100000 + np.cumsum(np.random.default_rng(0).normal(0, 5, rows))
+    df = pd.DataFrame({'open': close, 'high': close + 5, 'low': close - 5, 'close': close,
+                       'tick_volume': 1.0, 'volume': 1.0}, index=index)
+    windows = [10 + i for i in range(tasks)]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers) as executor:
+        pickled = list(executor.map(_task_frame, [df] * tasks, windows))
+    rows_out = [{'mode': 'pickle', 'seconds': time.perf_counter() - start,
+                 'bytes_per_task': len(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))}]
+
+    start = time.perf_counter()
+    with SharedOHLC() as plane:
+        spec = plane.publish('bench', df)
+        with ProcessPoolExecutor(workers, initializer=attach_all, initargs=([spec],)) as executor:
+            shared = list(executor.map(_task_shared, ['bench'] * tasks, windows))
+    rows_out.append({'mode': 'shared', 'seconds': time.perf_counter() - start,
+                     'bytes_per_task': len(pickle.dumps(('bench', 0)))})
+
+    if not np.allclose(pickled, shared):
+        raise RuntimeError("Resultados diferentes entre os modos")
+    return rows_out
+
+
+def main():
+    """Benchmark: DataFrame por tarefa x memória compartilhada"""
+    parser = argparse.ArgumentParser(description='Candles em memória compartilhada')
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--tasks', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    print(pd.DataFrame(benchmark(args.rows, args.tasks, args.workers)).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""
+Plano compilado de uma combined_strategy.
+
+Os JSONs de selected/ e controle/ repetem o dicionário completo de
+parâmetros em cada hora (com floats como length_rsi: 9.0 e allowed_hours
+redundante). load_plan valida o arquivo uma única vez e o compila em um
+StrategyPlan imutável:
+
+    - parâmetros tipados (9.0 -> 9) como tuplas ordenadas por nome
+    - horas com parâmetros, tp e sl idênticos agrupadas em um HourGroup,
+      que calcula o sinal uma única vez com allowed_hours = horas do grupo
+      (GroupSignal fatia esse sinal por hora para os backtests por hora)
+    - função de entrada resolvida no módulo de estratégias (entries.py),
+      com os argumentos conferidos contra a assinatura
+
+O plano é consumido pelos drivers de backtest e pelo monitor de controle/
+e pelo host de deploy/.
+
+Exemplo:
+
+    import entries
+    from common.strategy_plan import load_plan
+
+    plan = load_plan('selected/combined_strategy_1.json', entries)
+    for group in plan.groups:
+        position = plan.signal_function(df, **group.signal_args())
+"""
+
+import os
+import json
+import glob
+import inspect
+from collections import namedtuple
+from types import MappingProxyType
+
+
+REQUIRED_KEYS = ['symbol', 'timeframe', 'strategy', 'hours', 'hour_params']
+
+# Chaves de hour_params que não são argumentos da função de entrada
+RESERVED_PARAMS = ('tp', 'sl', 'allowed_hours')
+
+
+class HourGroup(namedtuple('HourGroup', ['hours', 'tp', 'sl', 'params'])):
+    """
+    Horas que compartilham parâmetros, tp e sl
+
+    Campos:
+        hours (tuple): Horas do grupo, ordenadas
+        tp (int/float): Take profit
+        sl (int/float): Stop loss
+        params (tuple): Pares (nome, valor) dos argumentos da função de entrada
+    """
+
+    __slots__ = ()
+
+    def signal_args(self):
+        """Argumentos da função de entrada, com allowed_hours = horas do grupo"""
+        return dict(self.params, allowed_hours=list(self.hours))
+
+
+class StrategyPlan(namedtuple('StrategyPlan', [
+        'path', 'symbol', 'timeframe', 'strategy', 'magic_number', 'hours', 'groups', 'by_hour',
+        'lote', 'valor_lote', 'tc', 'daytrade', 'data_ini', 'data_fim', 'signal_function'])):
+    """
+    combined_strategy validada e compilada
+
+    Campos opcionais do JSON ausentes (magic_number, lote, valor_lote, tc,
+    daytrade, data_ini, data_fim) ficam None; cada consumidor aplica o seu
+    padrão. by_hour mapeia hora -> HourGroup (somente leitura).
+    """
+
+    __slots__ = ()
+
+    @property
+    def name(self):
+        return os.path.basename(self.path) if self.path else self.strategy
+
+    def hour_group(self, hour):
+        """HourGroup da hora, ou None se a hora não estiver ativa"""
+        return self.by_hour.get(hour)
+
+
+class GroupSignal:
+    """
+    Sinal de um HourGroup calculado uma vez e fatiado por hora
+
+    As funções de entrada aplicam allowed_hours zerando a posição fora das
+    horas no fim do cálculo; a posição do grupo restrita a uma hora é,
+    portanto, igual à chamada com allowed_hours=[hora]. Os drivers rodam um
+    backtest por hora (cada hora com sua própria simulação, como antes) e
+    todos usam o mesmo cálculo de indicadores do grupo.
+
+    Args:
+        signal_function (callable): Função de entrada
+        group (HourGroup): Grupo de horas
+    """
+
+    def __init__(self, signal_function, group):
+        self.signal_function = signal_function
+        self.group = group
+        self.calls = 0
+        self._key = None
+        self._position = None
+
+    def position(self, df):
+        """Posição do grupo (recalculada só quando o intervalo de candles muda)"""
+        key = (len(df), df.index[0], df.index[-1])
+        if key != self._key:
+            self._position = self.signal_function(df, **self.group.signal_args())
+            self._key = key
+            self.calls += 1
+        return self._position
+
+    def for_hour(self, hour):
+        """Função de entrada equivalente a allowed_hours=[hour]"""
+        def signal(df, **signal_args):
+            position = self.position(df).copy()
+            position[position.index.hour != hour] = 0
+            return position
+        signal.__name__ = f"{getattr(self.signal_function, '__name__', 'signal')}_h{hour:02d}"
+        return signal
+
+
+def typed_value(value):
+    """
+    Normaliza um valor do JSON
+
+    Floats inteiros viram int (length_rsi 9.0 -> 9); listas viram tuplas.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, list):
+        return tuple(typed_value(v) for v in value)
+    return value
+
+
+def _optional(config, key, cast):
+    value = config.get(key)
+    return cast(value) if value is not None else None
+
+
+def check_signature(function, group, strategy):
+    """
+    Confere os argumentos de um grupo contra a assinatura da função de entrada
+
+    Raises:
+        ValueError: Se algum argumento faltar ou não existir na função
+    """
+    try:
+        inspect.signature(function).bind(None, **group.signal_args())
+    except TypeError as e:
+        raise ValueError(f"Parâmetros das horas {list(group.hours)} incompatíveis com {strategy}: {e}")
+
+
+def compile_plan(config, path=None, strategies_module=None):
+    """
+    Valida e compila o conteúdo de um JSON de combined_strategy
+
+    Args:
+        config (dict): Conteúdo do JSON
+        path (str): Caminho de origem (mensagens de erro e nome do plano)
+        strategies_module: Módulo com as funções de entrada (None = não resolve a função)
+
+    Returns:
+        StrategyPlan: Plano imutável
+
+    Raises:
+        ValueError: Se o JSON estiver incompleto ou inconsistente
+    """
+    source = path or 'config'
+    missing = [key for key in REQUIRED_KEYS if key not in config]
+    if missing:
+        raise ValueError(f"{source}: campos obrigatórios ausentes: {missing}")
+
+    hours = tuple(sorted({int(h) for h in config['hours']}))
+    if not hours:
+        raise ValueError(f"{source}: lista de horas vazia")
+
+    # Agrupa horas com parâmetros idênticos (mantendo a ordem da primeira hora)
+    grouped = {}
+    for hour in hours:
+        raw = config['hour_params'].get(str(hour))
+        if raw is None:
+            raise ValueError(f"{source}: hora {hour} sem hour_params")
+        if 'tp' not in raw or 'sl' not in raw:
+            raise ValueError(f"{source}: hora {hour} sem tp/sl")
+
+        params = tuple(sorted((name, typed_value(value)) for name, value in raw.items()
+                              if name not in RESERVED_PARAMS))
+        key = (typed_value(raw['tp']), typed_value(raw['sl']), params)
+        grouped.setdefault(key, []).append(hour)
+
+    groups = tuple(HourGroup(tuple(group_hours), tp, sl, params)
+                   for (tp, sl, params), group_hours in grouped.items())
+    by_hour = MappingProxyType({hour: group for group in groups for hour in group.hours})
+
+    signal_function = None
+    if strategies_module is not None:
+        signal_function = getattr(strategies_module, config['strategy'], None)
+        if signal_function is None:
+            raise ValueError(f"{source}: estratégia '{config['strategy']}' não encontrada em "
+                             f"{getattr(strategies_module, '__file__', strategies_module)}")
+        for group in groups:
+            check_signature(signal_function, group, config['strategy'])
+
+    return StrategyPlan(
+        path=path,
+        symbol=config['symbol'],
+        timeframe=config['timeframe'],
+        strategy=config['strategy'],
+        magic_number=_optional(config, 'magic_number', int),
+        hours=hours,
+        groups=groups,
+        by_hour=by_hour,
+        lote=_optional(config, 'lote', float),
+        valor_lote=_optional(config, 'valor_lote', float),
+        tc=_optional(config, 'tc', float),
+        daytrade=_optional(config, 'daytrade', bool),
+        data_ini=config.get('data_ini'),
+        data_fim=config.get('data_fim'),
+        signal_function=signal_function
+    )
+
+
+def load_plan(path, strategies_module=None):
+    """
+    Lê e compila um JSON de combined_strategy
+
+    Raises:
+        ValueError: Se o JSON for inválido
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{path}: JSON inválido ({e})")
+    return compile_plan(config, path, strategies_module)
+
+
+def load_plans(files, strategies_module=None):
+    """
+    Compila vários JSONs (lista de caminhos ou glob)
+
+    Raises:
+        ValueError: Se algum JSON for inválido ou dois usarem o mesmo magic number
+    """
+    if isinstance(files, str):
+        files = sorted(glob.glob(files))
+
+    plans = []
+    magics = {}
+    for path in files:
+        plan = load_plan(path, strategies_module)
+        if plan.magic_number is not None:
+            if plan.magic_number in magics:
+                raise ValueError(f"Magic number {plan.magic_number} repetido em {magics[plan.magic_number]} e {path}")
+            magics[plan.magic_number] = path
+        plans.append(plan)
+    return plans
@@ -0,0 +1,201 @@
+"""
+Cache de timeframes derivados de uma única carga de t1.
+
+Testar a mesma estratégia em t2, t5, t10 e t15 exigia carregar e preparar
+os dados uma vez por timeframe. O cache carrega o t1 do símbolo uma única
+vez e deriva os timeframes maiores sob demanda (resample_bars, com as
+regras de fronteira de common/bars.py):
+
+    - memória: os timeframes derivados ficam em um LRU limitado por bytes
+      (o t1 base fica fixo enquanto o símbolo estiver em uso)
+    - disco: cada timeframe derivado é gravado no CandleStore junto com a
+      impressão digital do t1 de origem (hash do índice e dos valores) e, na
+      próxima execução, só é lido de lá se o t1 atual tiver a mesma impressão
+      digital; senão é derivado de novo e o gravado é substituído
+    - derivação em cascata: um timeframe é derivado do maior timeframe já
+      em memória que o divide (t10 a partir do t5, t15 a partir do t5),
+      em vez de partir sempre do t1
+
+Exemplo:
+
+    cache = TimeframeCache(CandleStore('data/candles'))
+    for timeframe in ['t2', 't5', 't10', 't15']:
+        df = cache.get('WIN@N', timeframe, '2024-01-01', '2025-06-30')
+        ...
+    print(cache.stats())
+
+Quem usa: SharedOHLC.publish_symbols (common/shared_ohlc.py).
+
+Pendente: as varreduras multi-timeframe do factory (scheduler, session,
+walk_forward) e os drivers do controle não usam este cache. O Backtester
+do futures_backtester carrega os candles a partir de path_base e não
+recebe um DataFrame pronto, então cada timeframe continua sendo carregado
+pelo próprio Backtester. Ligar o cache às varreduras depende de o
+Backtester aceitar candles pré-carregados.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from common.bars import resample_bars, bar_starts, timeframe_minutes
+
+
+def frame_bytes(df):
+    """Memória ocupada por um DataFrame (bytes)"""
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+
+def frame_fingerprint(df):
+    """Hash SHA1 do índice e dos valores de um DataFrame de candles"""
+    digest = hashlib.sha1(np.ascontiguousarray(df.index.asi8).tobytes())
+    for column in sorted(df.columns):
+        digest.update(str(column).encode('utf-8'))
+        digest.update(np.ascontiguousarray(df[column].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+class TimeframeCache:
+    """
+    Timeframes derivados de t1 em memória (LRU) e em disco
+
+    Args:
+        store (CandleStore): Origem do t1 e destino dos timeframes derivados
+                             (None = sem disco; exige loader)
+        loader (callable): loader(symbol) -> DataFrame t1, no lugar de store.load
+        base_timeframe (str): Timeframe base carregado uma vez por símbolo
+        max_bytes (int): Limite de memória dos timeframes derivados
+        persist (bool): Grava os timeframes derivados no store
+    """
+
+    def __init__(self, store=None, loader=None, base_timeframe='t1', max_bytes=512 * 1024**2, persist=True):
+        if store is None and loader is None:
+            raise ValueError("Informe um store ou um loader para o timeframe base")
+        self.store = store
+        self.loader = loader
+        self.base_timeframe = base_timeframe
+        self.base_minutes = timeframe_minutes(base_timeframe)
+        self.max_bytes = max_bytes
+        self.persist = persist and store is not None
+
+        self.bases = {}
+        self.base_fingerprints = {}
+        self.frames = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.derived = 0
+        self.evictions = 0
+
+    def base(self, symbol):
+        """Timeframe base do símbolo (carregado na primeira chamada)"""
+        df = self.bases.get(symbol)
+        if df is None:
+            df = self.loader(symbol) if self.loader is not None else self.store.load(symbol, self.base_timeframe)
+            if df is None or df.empty:
+                raise ValueError(f"Sem candles {self.base_timeframe} para {symbol}")
+            self.bases[symbol] = df
+        return df
+
+    def base_fingerprint(self, symbol):
+        """Impressão digital do base do símbolo (calculada uma vez por carga)"""
+        fingerprint = self.base_fingerprints.get(symbol)
+        if fingerprint is None:
+            fingerprint = frame_fingerprint(self.base(symbol))
+            self.base_fingerprints[symbol] = fingerprint
+        return fingerprint
+
+    def _source(self, symbol, minutes):
+        """Maior timeframe em memória do símbolo que divide o destino (ou o base)"""
+        best, best_minutes = self.base(symbol), self.base_minutes
+        for (sym, timeframe), df in self.frames.items():
+            tf_minutes = timeframe_minutes(timeframe)
+            if sym == symbol and best_minutes < tf_minutes < minutes and minutes % tf_minutes == 0:
+                best, best_minutes = df, tf_minutes
+        return best
+
+    def _covers(self, df, symbol, timeframe):
+        """True se o timeframe gravado foi derivado do base atual (mesma impressão digital)"""
+        if df is None or df.empty:
+            return False
+        meta = self.store.read_meta(symbol, timeframe)
+        if (meta is None or meta.get('base_timeframe') != self.base_timeframe
+                or meta.get('base_fingerprint') != self.base_fingerprint(symbol) or meta.get('rows') != len(df)):
+            return False
+        base = self.base(symbol)
+        expected = bar_starts(base.index[[0, -1]], timeframe)
+        return df.index[0] == expected[0] and df.index[-1] == expected[1]
+
+    def _put(self, key, df):
+        self.frames[key] = df
+        self.bytes += frame_bytes(df)
+        while self.bytes > self.max_bytes and len(self.frames) > 1:
+            _, evicted = self.frames.popitem(last=False)
+            self.bytes -= frame_bytes(evicted)
+            self.evictions += 1
+
+    def get(self, symbol, timeframe, data_ini=None, data_fim=None):
+        """
+        Candles de um timeframe, derivados do base na primeira vez
+
+        Args:
+            symbol (str): Símbolo
+            timeframe (str): Timeframe (múltiplo do base)
+            data_ini (str): Início opcional (inclusivo)
+            data_fim (str): Fim opcional (inclusivo)
+
+        Returns:
+            pandas.DataFrame: Candles do período (fatia do frame em cache; não modificar)
+        """
+        minutes = timeframe_minutes(timeframe)
+        if minutes % self.base_minutes:
+            raise ValueError(f"{timeframe} não é múltiplo do timeframe base {self.base_timeframe}")
+
+        key = (symbol, timeframe)
+        if minutes == self.base_minutes:
+            df = self.base(symbol)
+        elif key in self.frames:
+            self.frames.move_to_end(key)
+            self.hits += 1
+            df = self.frames[key]
+        else:
+            df = self.store.load(symbol, timeframe) if self.persist else None
+            if self._covers(df, symbol, timeframe):
+                self.disk_hits += 1
+            else:
+                df = resample_bars(self._source(symbol, minutes), timeframe)
+                self.derived += 1
+                if self.persist:
+                    # Substitui o que estava gravado (candles de um base antigo não podem sobrar)
+                    self.store.drop(symbol, timeframe)
+                    self.store.append(symbol, timeframe, df)
+                    self.store.write_meta(symbol, timeframe, {
+                        'base_timeframe': self.base_timeframe,
+                        'base_fingerprint': self.base_fingerprint(symbol),
+                        'rows': len(df)
+                    })
+            self._put(key, df)
+
+        if data_ini is None and data_fim is None:
+            return df
+        return df.loc[data_ini:data_fim]
+
+    def release(self, symbol):
+        """Libera o base e os timeframes derivados de um símbolo"""
+        self.bases.pop(symbol, None)
+        self.base_fingerprints.pop(symbol, None)
+        for key in [k for k in self.frames if k[0] == symbol]:
+            self.bytes -= frame_bytes(self.frames.pop(key))
+
+    def stats(self):
+        """Estatísticas de uso do cache"""
+        return {
+            'symbols': len(self.bases),
+            'frames': len(self.frames),
+            'megabytes': self.bytes / 1024**2,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'derived': self.derived,
+            'evictions': self.evictions
+        }
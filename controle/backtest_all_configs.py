@@ -4,237 +4,29 @@ gerados pelo strategy_generator.py
 """
 
 import os
+import sys
 import json
 import pandas as pd
 from datetime import datetime
+from pathlib import Path
 from futures_backtester import Backtester
 import entries
 import glob
 
-# Dicionários de configuração (ajuste conforme necessário)
-path_b3 = 'C:/Users/User/OneDrive/Documentos/rnt/Finance/Trading Projects/00.database/candlestick data/futuros/'
-path_tickmill = 'C:/Users/User/OneDrive/Documentos/rnt/Finance/Trading Projects/00.database/tickmill/forex/'
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.strategy_plan import load_plan, GroupSignal
+from common.instruments import INSTRUMENTS
 
-dict_custos = {'WIN@N':0.2*5, 'WDO@N':2.40/2,
-                                     'AUDUSD': 3,
-                                     'EURUSD': 3,
-                                     'GBPUSD': 3,
-                                     'NZDUSD': 3,
-                                     'USDCHF': 3,
-                                     'USDJPY': 3,
-                                     'AUDCAD': 3,
-                                     'AUDCHF': 3,
-                                     'AUDJPY': 3,
-                                     'AUDNZD': 3,
-                                     'CADCHF': 3,
-                                     'CADJPY': 3,
-                                     'CHFJPY': 3,
-                                     'EURAUD': 3,
-                                     'EURCAD': 3,
-                                     'EURCHF': 3,
-                                     'EURGBP': 3,
-                                     'EURHKD': 3,
-                                     'EURJPY': 3,
-                                     'EURMXN': 3,
-                                     'EURNZD': 3,
-                                     'EURTRY': 3,
-                                     'GBPCAD': 3,
-                                     'GBPCHF': 3,
-                                     'GBPJPY': 3,
-                                     'USDCNH': 3,
-                                     'USDCZK': 3,
-                                     'USDMXN': 3,
-                                     'USDTRY': 3,
-                                     'XAGUSD': 3,
-                                     'XAUUSD': 3,
-                                     'STOXX50': 3,
-                                     'UK100': 3,
-                                     'FRANCE40': 3,
-                                     'VIX': 3,
-                                     'ALUMINIUM': 3,
-                                     'PLATINUM': 3,
-                                     'LEAD': 3,
-                                     'NICKEL': 3,
-                                     'PALLADIUM': 3,
-                                     'ZINC': 3,
-                                     'COPPER': 3,
-                                     'DXY': 3,
-                                     'COCOA': 3,
-                                     'SUGAR': 3,
-                                     'WHEAT': 3,
-                                     'US500': 3,
-                                     'NAT.GAS': 3,
-                                     'BRENT': 3,
-                                     'EEM': 3,
-                                     'EWZ': 3,
-                                     'IWM': 3,
-                                     'TLT': 3,
-                                     'SPY': 3,
-                                     'DIA': 3}
 
-dict_valor_lot = {'WIN@N':0.2, 'WDO@N':10.0,
-                                'USDCAD': 100000,
-                                 'AUDUSD': 100000,
-                                 'EURUSD': 100000,
-                                 'GBPUSD': 100000,
-                                 'NZDUSD': 100000,
-                                 'USDCHF': 100000,
-                                 'USDJPY': 100000,
-                                 'AUDCAD': 100000,
-                                 'AUDCHF': 100000,
-                                 'AUDJPY': 100000,
-                                 'AUDNZD': 100000,
-                                 'CADCHF': 100000,
-                                 'CADJPY': 100000,
-                                 'CHFJPY': 100000,
-                                 'EURAUD': 100000,
-                                 'EURCAD': 100000,
-                                 'EURCHF': 100000,
-                                 'EURGBP': 100000,
-                                 'EURHKD': 100000,
-                                 'EURJPY': 100000,
-                                 'EURMXN': 100000,
-                                 'EURNZD': 100000,
-                                 'EURTRY': 100000,
-                                 'GBPCAD': 100000,
-                                 'GBPCHF': 100000,
-                                 'GBPJPY': 100000,
-                                 'USDCNH': 100000,
-                                 'USDCZK': 100000,
-                                 'USDMXN': 100000,
-                                 'USDTRY': 100000,
-                                 'XAGUSD': 100000,
-                                 'XAUUSD': 100000,
-                                 'STOXX50': 100000,
-                                 'UK100': 100000,
-                                 'FRANCE40': 100000,
-                                 'VIX': 100000,
-                                 'ALUMINIUM': 100000,
-                                 'PLATINUM': 100000,
-                                 'LEAD': 100000,
-                                 'NICKEL': 100000,
-                                 'PALLADIUM': 100000,
-                                 'ZINC': 100000,
-                                 'COPPER': 100000,
-                                 'DXY': 100000,
-                                 'COCOA': 100000,
-                                 'SUGAR': 100000,
-                                 'WHEAT': 100000,
-                                 'US500': 100000,
-                                 'NAT.GAS': 100000,
-                                 'BRENT': 100000,
-                                 'EEM': 100000,
-                                 'EWZ': 100000,
-                                 'IWM': 100000,
-                                 'TLT': 100000,
-                                 'SPY': 100000,
-                                 'DIA': 100000}
-
-dict_path = {'WIN@N':path_b3, 'WDO@N':path_b3, 
-                              'USDCAD': path_tickmill,
-                             'AUDUSD': path_tickmill,
-                             'EURUSD': path_tickmill,
-                             'GBPUSD': path_tickmill,
-                             'NZDUSD': path_tickmill,
-                             'USDCHF': path_tickmill,
-                             'USDJPY': path_tickmill,
-                             'AUDCAD': path_tickmill,
-                             'AUDCHF': path_tickmill,
-                             'AUDJPY': path_tickmill,
-                             'AUDNZD': path_tickmill,
-                             'CADCHF': path_tickmill,
-                             'CADJPY': path_tickmill,
-                             'CHFJPY': path_tickmill,
-                             'EURAUD': path_tickmill,
-                             'EURCAD': path_tickmill,
-                             'EURCHF': path_tickmill,
-                             'EURGBP': path_tickmill,
-                             'EURHKD': path_tickmill,
-                             'EURJPY': path_tickmill,
-                             'EURMXN': path_tickmill,
-                             'EURNZD': path_tickmill,
-                             'EURTRY': path_tickmill,
-                             'GBPCAD': path_tickmill,
-                             'GBPCHF': path_tickmill,
-                             'GBPJPY': path_tickmill,
-                             'USDCNH': path_tickmill,
-                             'USDCZK': path_tickmill,
-                             'USDMXN': path_tickmill,
-                             'USDTRY': path_tickmill,
-                             'XAGUSD': path_tickmill,
-                             'XAUUSD': path_tickmill,
-                             'STOXX50': path_tickmill,
-                             'UK100': path_tickmill,
-                             'FRANCE40': path_tickmill,
-                             'VIX': path_tickmill,
-                             'ALUMINIUM': path_tickmill,
-                             'PLATINUM': path_tickmill,
-                             'LEAD': path_tickmill,
-                             'NICKEL': path_tickmill,
-                             'PALLADIUM': path_tickmill,
-                             'ZINC': path_tickmill,
-                             'COPPER': path_tickmill,
-                             'DXY': path_tickmill,
-                             'COCOA': path_tickmill,
-                             'SUGAR': path_tickmill,
-                             'WHEAT': path_tickmill,
-                             'US500': path_tickmill,
-                             'NAT.GAS': path_tickmill,
-                             'BRENT': path_tickmill,
-                             'EEM': path_tickmill,
-                             'EWZ': path_tickmill,
-                             'IWM': path_tickmill,
-                             'TLT': path_tickmill,
-                             'SPY': path_tickmill,
-                             'DIA': path_tickmill}
-
-def load_strategy_json(json_path):
-    """
-    Carrega um arquivo JSON de estratégia
-    
-    Args:
-        json_path (str): Caminho para o arquivo JSON
-        
-    Returns:
-        dict: Dados da estratégia
-    """
-    with open(json_path, 'r') as f:
-        return json.load(f)
-
-def get_strategy_function(strategy_name):
-    """
-    Retorna a função de estratégia baseada no nome
-    
-    Args:
-        strategy_name (str): Nome da estratégia
-        
-    Returns:
-        callable: Função de estratégia
-    """
-    # Mapear nomes de estratégias para funções em entries.py
-    strategy_map = {
-        'pattern_rsi_trend': entries.pattern_rsi_trend,
-        'pattern_rsi_anti_trend': entries.pattern_rsi_anti_trend,
-        'bb_trend': entries.bb_trend,
-        'bb_anti_trend': entries.bb_anti_trend,
-        'gold_rsi_trend': entries.gold_rsi_trend,
-        # Adicione outras estratégias conforme necessário
-    }
-    
-    if strategy_name in strategy_map:
-        return strategy_map[strategy_name]
-    else:
-        raise ValueError(f"Estratégia '{strategy_name}' não encontrada no mapeamento")
-
-def execute_backtest_for_hour(symbol, timeframe, strategy_data, hour_params, data_ini, data_fim, output_dir):
+def execute_backtest_for_hour(symbol, plan, hour, signal, data_ini, data_fim, output_dir):
     """
     Executa backtest para uma hora específica
     
     Args:
         symbol (str): Símbolo do ativo
-        timeframe (str): Timeframe
-        strategy_data (dict): Dados gerais da estratégia
-        hour_params (dict): Parâmetros específicos da hora
+        plan (StrategyPlan): Plano compilado da estratégia
+        hour (int): Hora do backtest
+        signal (GroupSignal): Sinal do grupo da hora (calculado uma vez para o grupo)
         data_ini (str): Data inicial do backtest
         data_fim (str): Data final do backtest
         output_dir (str): Diretório de saída
@@ -242,37 +34,28 @@ def execute_backtest_for_hour(symbol, timeframe, strategy_data, hour_params, dat
     Returns:
         pd.DataFrame: Resultados do backtest
     """
-    # Extrair tp e sl dos parâmetros
-    tp = hour_params.get('tp', 0.15)
-    sl = hour_params.get('sl', 0.15)
-    
-    # Configurar o backtester
+    # Configurar o backtester (tp e sl do grupo da hora)
+    instrument = INSTRUMENTS.get(symbol, fallback=True)
     bt = Backtester(
         symbol=symbol,
-        timeframe=timeframe,
+        timeframe=plan.timeframe,
         data_ini=data_ini,
         data_fim=data_fim,
-        tp=tp,
-        sl=sl,
+        tp=signal.group.tp,
+        sl=signal.group.sl,
         slippage=0,
-        tc=dict_custos.get(symbol, 0.5),
-        lote=strategy_data.get('lote', 0.01),
-        valor_lote=dict_valor_lot.get(symbol, 100000),
+        tc=instrument.tc,
+        lote=plan.lote if plan.lote is not None else 0.01,
+        valor_lote=instrument.valor_lote,
         initial_cash=30000,
-        path_base=dict_path.get(symbol, './data/'),
-        daytrade=strategy_data.get('daytrade', False)
+        path_base=instrument.path_base,
+        daytrade=bool(plan.daytrade)
     )
     
-    # Obter função de estratégia
-    strategy_function = get_strategy_function(strategy_data['strategy'])
-    
-    # Preparar argumentos da estratégia (remover tp e sl pois já foram passados ao backtester)
-    signal_args = {k: v for k, v in hour_params.items() if k not in ['tp', 'sl']}
-    
-    # Executar backtest
+    # Executar backtest (sinal do grupo restrito à hora, equivalente a allowed_hours=[hour])
     results, _ = bt.run(
-        signal_function=strategy_function,
-        signal_args=signal_args
+        signal_function=signal.for_hour(hour),
+        signal_args={}
     )
     
     return results
@@ -289,43 +72,38 @@ def process_combined_strategy(json_path, data_ini, data_fim, output_dir):
     """
     print(f"\nProcessando estratégia: {json_path}")
     
-    # Carregar dados da estratégia
-    strategy_data = load_strategy_json(json_path)
+    # Validar e compilar a estratégia (horas com parâmetros idênticos agrupadas)
+    plan = load_plan(json_path, entries)
     
     # Extrair informações básicas
-    if 'WIN' in strategy_data['symbol']:
+    if 'WIN' in plan.symbol:
         symbol = 'WIN@N'
     else:
-        symbol = strategy_data['symbol']
-    timeframe = strategy_data['timeframe']
-    hours = strategy_data['hours']
-    hour_params = strategy_data['hour_params']
-    magic_number = strategy_data.get('magic_number', 'NO_MAGIC')  # Pegar magic_number ou usar padrão
+        symbol = plan.symbol
+    timeframe = plan.timeframe
+    magic_number = plan.magic_number if plan.magic_number is not None else 'NO_MAGIC'
     
     print(f"Símbolo: {symbol}")
     print(f"Timeframe: {timeframe}")
-    print(f"Horas ativas: {hours}")
-    print(f"Estratégia: {strategy_data['strategy']}")
+    print(f"Horas ativas: {list(plan.hours)}")
+    print(f"Estratégia: {plan.strategy}")
     print(f"Magic Number: {magic_number}")
     
     # Dicionário para armazenar resultados de cada hora
     all_results = {}
     
-    # Executar backtest para cada hora
-    for hour in hours:
-        str_hour = str(hour)
-        if str_hour in hour_params:
+    # Executar um backtest por hora; horas do mesmo grupo compartilham o cálculo do sinal
+    for group in plan.groups:
+        signal = GroupSignal(plan.signal_function, group)
+        for hour in group.hours:
             print(f"\nExecutando backtest para hora {hour:02d}...")
             
-            params = hour_params[str_hour]
-            params['allowed_hours'] = [hour]  # Adicionar hora permitida
-            
             try:
                 results = execute_backtest_for_hour(
                     symbol=symbol,
-                    timeframe=timeframe,
-                    strategy_data=strategy_data,
-                    hour_params=params,
+                    plan=plan,
+                    hour=hour,
+                    signal=signal,
                     data_ini=data_ini,
                     data_fim=data_fim,
                     output_dir=output_dir
@@ -372,7 +150,7 @@ def process_combined_strategy(json_path, data_ini, data_fim, output_dir):
         combined_df['equity'] = 30000 + combined_df['cstrategy']  # Initial cash = 30000
         
         # Salvar CSV combinado com magic_number no nome
-        combined_csv_filename = f"backtest_{symbol}_{timeframe}_{strategy_data['strategy']}_magic_{magic_number}.csv"
+        combined_csv_filename = f"backtest_{symbol}_{timeframe}_{plan.strategy}_magic_{magic_number}.csv"
         combined_csv_path = os.path.join(output_dir, combined_csv_filename)
         combined_df.to_csv(combined_csv_path)
         
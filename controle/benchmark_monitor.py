@@ -0,0 +1,157 @@
+"""
+Benchmark de ponta a ponta do monitor contra o MetaTrader5 local (fake_mt5).
+
+Para cada escala de deals, gera deals sintéticos para N configurações
+(clones dos JSONs de controle/ com magics distintos) e mede o tempo de
+process_all_configs em quatro cenários:
+
+    - full: busca completa sem store
+    - store_cold: primeira execução com o store vazio
+    - store_warm: nova execução sem deals novos
+    - store_incremental: nova execução com 1% de deals novos
+
+Tudo roda em uma pasta temporária (real_results/ e deal_store/ não são tocados).
+
+Exemplo:
+
+    python controle/benchmark_monitor.py --deals 100000 1000000 --configs 20
+"""
+
+import os
+import io
+import sys
+import json
+import glob
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+
+import pandas as pd
+
+import fake_mt5
+
+# O monitor importa MetaTrader5; o substituto entra no lugar do módulo real
+sys.modules['MetaTrader5'] = fake_mt5
+os.environ.setdefault('MT5_LOGIN', '1')
+os.environ.setdefault('MT5_PASSWORD', 'benchmark')
+os.environ.setdefault('MT5_SERVER', 'fake')
+
+import monitor_all_configs_mt5 as monitor
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def write_configs(work_dir, n_configs):
+    """
+    Cria n_configs JSONs clonando os de controle/ com magics distintos
+
+    Returns:
+        tuple: (lista de caminhos, dict magic -> símbolo)
+    """
+    templates = []
+    for path in sorted(glob.glob(os.path.join(SCRIPT_DIR, '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            templates.append(json.load(f))
+
+    os.makedirs(os.path.join(work_dir, 'controle'), exist_ok=True)
+    files, magics = [], {}
+    for i in range(n_configs):
+        config = dict(templates[i % len(templates)])
+        config['magic_number'] = 10000 + i
+        config['data_ini'] = '2025-01-01'
+        path = os.path.join(work_dir, 'controle', f"combined_strategy_{i + 1}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=4)
+        files.append(path)
+        magics[config['magic_number']] = config['symbol']
+
+    return files, magics
+
+
+def extra_deals(deals, magics, n_deals):
+    """Gera deals novos posteriores aos existentes (tickets sem colisão)"""
+    last = pd.to_datetime(deals['time'].max(), unit='s')
+    extra = fake_mt5.generate_deals(n_deals, magics, start=(last + pd.Timedelta(days=1)).strftime('%Y-%m-%d'),
+                                    seed=7)
+    offset = int(deals['ticket'].max()) + 2
+    for column in ['ticket', 'order', 'position_id']:
+        extra[column] += offset
+    return pd.concat([deals, extra], ignore_index=True)
+
+
+def timed_run(data_fim, use_store, store_dir, verbose=False):
+    """Executa process_all_configs e retorna o tempo em segundos"""
+    output = sys.stdout if verbose else io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        monitor.process_all_configs(data_fim=data_fim, use_store=use_store, store_dir=store_dir)
+    return time.perf_counter() - start
+
+
+def benchmark(n_deals, n_configs, partial_prob=0.0, verbose=False):
+    """
+    Roda os cenários para uma escala
+
+    Returns:
+        list: Uma linha (dict) por cenário
+    """
+    work_dir = tempfile.mkdtemp(prefix='bench_monitor_')
+    cwd = os.getcwd()
+    try:
+        files, magics = write_configs(work_dir, n_configs)
+        monitor.find_json_configs = lambda: files
+
+        start = time.perf_counter()
+        deals = fake_mt5.generate_deals(n_deals, magics, start='2025-01-02', partial_prob=partial_prob)
+        gen_time = time.perf_counter() - start
+        fake_mt5.set_deals(deals)
+        data_fim = (pd.to_datetime(deals['time'].max(), unit='s') + pd.Timedelta(days=30)).strftime('%Y-%m-%d')
+
+        os.chdir(work_dir)
+        store_dir = os.path.join(work_dir, 'deal_store')
+
+        rows = [{'scenario': 'full', 'seconds': timed_run(data_fim, False, store_dir, verbose)},
+                {'scenario': 'store_cold', 'seconds': timed_run(data_fim, True, store_dir, verbose)},
+                {'scenario': 'store_warm', 'seconds': timed_run(data_fim, True, store_dir, verbose)}]
+
+        fake_mt5.set_deals(extra_deals(deals, magics, max(n_deals // 100, 2)))
+        rows.append({'scenario': 'store_incremental', 'seconds': timed_run(data_fim, True, store_dir, verbose)})
+
+        for row in rows:
+            row.update({'deals': len(deals), 'configs': n_configs, 'generation_s': gen_time})
+        return rows
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    """Executa o benchmark nas escalas pedidas"""
+    parser = argparse.ArgumentParser(description='Benchmark do monitor contra o MT5 local')
+    parser.add_argument('--deals', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--configs', type=int, default=5)
+    parser.add_argument('--partial-prob', type=float, default=0.0,
+                        help='Fração de posições com fechamento parcial')
+    parser.add_argument('--output', help='CSV opcional com os tempos')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    rows = []
+    for n_deals in args.deals:
+        print(f"Benchmark: {n_deals} deals, {args.configs} configurações...")
+        rows.extend(benchmark(n_deals, args.configs, args.partial_prob, args.verbose))
+
+    df = pd.DataFrame(rows)
+    df['deals_per_s'] = df['deals'] / df['seconds']
+    print(df[['deals', 'configs', 'scenario', 'seconds', 'deals_per_s']].to_string(index=False))
+
+    if args.output:
+        df.to_csv(args.output, index=False)
+        print(f"Tempos salvos em: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+Armazenamento local e incremental dos deals do MT5 usados pelo monitor.
+
+Cada execução do monitor baixava todos os deals desde data_ini. O store
+guarda os deals já baixados em segmentos append-only (um arquivo por
+busca, em parquet; pickle se não houver engine de parquet instalada),
+chaveados pelo ticket do deal, e mantém por conta a marca d'água
+(último horário armazenado) de cada máscara de símbolo. Assim, a próxima
+execução busca no MT5 apenas os deals depois da marca d'água.
+
+Layout (em controle/deal_store/{login}/):
+    - deals_{timestamp}.parquet: segmentos de deals
+    - state.json: período coberto por máscara de símbolo
+
+Exemplo:
+
+    from deal_store import DealStore
+
+    store = DealStore('controle/deal_store', account=12345678)
+    new_deals = store.sync(fetch_function, ['*WIN*', '*WDO*'], data_ini, data_fim)
+    deals = store.load()
+"""
+
+import os
+import sys
+import json
+import glob
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.segments import SEGMENT_EXT, read_segment, write_segment
+
+# Margem de segurança ao retomar da marca d'água (duplicatas são removidas pelo ticket)
+DEFAULT_OVERLAP = pd.Timedelta(minutes=5)
+
+
+class DealStore:
+    """
+    Store append-only de deals do MT5 de uma conta
+
+    Args:
+        base_dir (str): Pasta base do store
+        account (int|str): Login da conta (cada conta tem sua pasta e marca d'água)
+        overlap (pandas.Timedelta): Margem ao retomar da marca d'água
+    """
+
+    def __init__(self, base_dir='controle/deal_store', account='default', overlap=DEFAULT_OVERLAP):
+        self.path = os.path.join(base_dir, str(account))
+        self.account = account
+        self.overlap = overlap
+        os.makedirs(self.path, exist_ok=True)
+
+        self.state_path = os.path.join(self.path, 'state.json')
+        self.state = self._load_state()
+        self._cache = None
+
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'account': str(self.account), 'groups': {}}
+
+    def _save_state(self):
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=4)
+        os.replace(tmp_path, self.state_path)
+
+    def segments(self):
+        """Lista os segmentos em ordem de gravação"""
+        return sorted(p for p in glob.glob(os.path.join(self.path, 'deals_*.*')) if not p.endswith('.tmp'))
+
+    def fetch_start(self, group, data_ini):
+        """
+        Data a partir da qual a máscara precisa ser buscada no MT5
+
+        Retorna data_ini se a máscara nunca foi buscada ou se o período
+        pedido começa antes do que já está coberto; senão, a marca d'água
+        menos a margem de segurança.
+        """
+        covered = self.state['groups'].get(group)
+        if covered is None or pd.Timestamp(data_ini) < pd.Timestamp(covered['from']):
+            return pd.Timestamp(data_ini)
+        return pd.Timestamp(covered['high_water_mark']) - self.overlap
+
+    def append(self, deals):
+        """
+        Grava os deals novos (os tickets já armazenados são descartados)
+
+        Returns:
+            pandas.DataFrame: Deals efetivamente adicionados
+        """
+        if deals.empty:
+            return deals
+
+        stored = self.load()
+        if not stored.empty:
+            deals = deals[~deals['ticket'].isin(stored['ticket'])]
+        deals = deals.drop_duplicates('ticket')
+        if deals.empty:
+            return deals
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        write_segment(deals.reset_index(drop=True),
+                      os.path.join(self.path, f"deals_{timestamp}.{SEGMENT_EXT}"), index=False)
+
+        self._cache = pd.concat([stored, deals], ignore_index=True) if not stored.empty else deals.copy()
+        self._cache = self._cache.sort_values(['time', 'ticket']).reset_index(drop=True)
+        return deals
+
+    def mark(self, group, data_ini, high_water_mark):
+        """Atualiza o período coberto de uma máscara"""
+        covered = self.state['groups'].get(group, {})
+        start = pd.Timestamp(data_ini)
+        if covered.get('from'):
+            start = min(start, pd.Timestamp(covered['from']))
+        hwm = pd.Timestamp(high_water_mark)
+        if covered.get('high_water_mark'):
+            hwm = max(hwm, pd.Timestamp(covered['high_water_mark']))
+
+        self.state['groups'][group] = {'from': start.isoformat(), 'high_water_mark': hwm.isoformat()}
+
+    def sync(self, fetch_function, groups, data_ini, data_fim):
+        """
+        Traz para o store os deals que faltam de cada máscara
+
+        Máscaras com a mesma data de início são buscadas em uma única
+        chamada (máscaras separadas por vírgula).
+
+        Args:
+            fetch_function (callable): fetch(group, data_ini, data_fim) -> DataFrame de deals
+            groups (iterable): Máscaras de símbolo (ex: '*WIN*')
+            data_ini (Timestamp): Início do período pedido
+            data_fim (Timestamp): Fim do período pedido
+
+        Returns:
+            pandas.DataFrame: Deals novos adicionados ao store
+        """
+        by_start = {}
+        for group in sorted(set(groups)):
+            by_start.setdefault(self.fetch_start(group, data_ini), []).append(group)
+
+        added = []
+        for start, batch in sorted(by_start.items()):
+            deals = fetch_function(",".join(batch), start, data_fim)
+            new = self.append(deals)
+            if not new.empty:
+                added.append(new)
+            print(f"Store: {','.join(batch)} desde {start} -> {len(new)} deals novos")
+
+            # Marca d'água = horário do último deal recebido (o relógio do servidor
+            # do MT5 não é o local, então não se avança além do que foi visto)
+            hwm = deals['time'].max() if not deals.empty else start
+            for group in batch:
+                self.mark(group, data_ini, hwm)
+
+        self._save_state()
+        return pd.concat(added, ignore_index=True) if added else pd.DataFrame()
+
+    def load(self):
+        """
+        Carrega todos os deals armazenados (um por ticket, ordenados por tempo)
+
+        Returns:
+            pandas.DataFrame: Deals (vazio se o store estiver vazio)
+        """
+        if self._cache is not None:
+            return self._cache
+
+        segments = self.segments()
+        if not segments:
+            return pd.DataFrame()
+
+        deals = pd.concat([read_segment(p) for p in segments], ignore_index=True)
+        deals = deals.drop_duplicates('ticket', keep='last')
+        self._cache = deals.sort_values(['time', 'ticket']).reset_index(drop=True)
+        return self._cache
+
+    def compact(self):
+        """Junta todos os segmentos em um só (reduz a quantidade de arquivos)"""
+        segments = self.segments()
+        if len(segments) <= 1:
+            return
+
+        deals = self.load()
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        write_segment(deals, os.path.join(self.path, f"deals_{timestamp}.{SEGMENT_EXT}"), index=False)
+        for path in segments:
+            os.remove(path)
+        print(f"Store compactado: {len(segments)} segmentos -> 1 ({len(deals)} deals)")
@@ -0,0 +1,313 @@
+"""
+Substituto local do módulo MetaTrader5 para testes e benchmarks do monitor.
+
+O pacote MetaTrader5 só funciona com o terminal no Windows. Este módulo
+expõe as funções usadas pelo monitor (initialize, account_info,
+history_deals_get, last_error, shutdown) servindo deals gravados (CSV,
+parquet ou pickle exportados do MT5) ou sintéticos, em qualquer escala.
+
+Uso com o monitor (Linux):
+
+    MT5_FAKE=1 MT5_FAKE_N_DEALS=1000000 python controle/monitor_all_configs_mt5.py
+
+Variáveis de ambiente:
+    - MT5_FAKE: ativa o substituto no monitor
+    - MT5_FAKE_DEALS: arquivo de deals gravados (senão, deals sintéticos)
+    - MT5_FAKE_N_DEALS: quantidade de deals sintéticos (padrão: 10000)
+    - MT5_FAKE_MAGICS: magic:símbolo separados por vírgula
+                       (padrão: os magics dos JSONs de controle/)
+
+Uso direto (benchmark):
+
+    import sys, fake_mt5
+    fake_mt5.set_deals(fake_mt5.generate_deals(1_000_000, {1111: 'WINQ25'}))
+    sys.modules['MetaTrader5'] = fake_mt5
+"""
+
+import os
+import glob
+import json
+import fnmatch
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+# Mesmos campos e ordem do TradeDeal do MetaTrader5
+DEAL_FIELDS = ['ticket', 'order', 'time', 'time_msc', 'type', 'entry', 'magic', 'position_id',
+               'reason', 'volume', 'price', 'commission', 'swap', 'profit', 'fee', 'symbol',
+               'comment', 'external_id']
+TradeDeal = namedtuple('TradeDeal', DEAL_FIELDS)
+AccountInfo = namedtuple('AccountInfo', ['login', 'server', 'balance', 'currency'])
+
+# Constantes do MetaTrader5 usadas nos deals
+DEAL_TYPE_BUY = 0
+DEAL_TYPE_SELL = 1
+DEAL_ENTRY_IN = 0
+DEAL_ENTRY_OUT = 1
+DEAL_REASON_EXPERT = 3
+DEAL_REASON_SL = 4
+DEAL_REASON_TP = 5
+
+RES_S_OK = 1
+RES_E_FAIL = -1
+
+# Preço e tamanho do ponto aproximados por ativo (para deals sintéticos)
+SYMBOL_PRICES = {'WIN': (130000.0, 5.0, 0.2), 'WDO': (5500.0, 0.5, 10.0)}
+
+_state = {'deals': None, 'initialized': False, 'login': 0, 'server': '', 'last_error': (RES_S_OK, 'Success')}
+
+
+def _symbol_profile(symbol):
+    """(preço base, tick, valor do ponto por lote) de um símbolo"""
+    for prefix, profile in SYMBOL_PRICES.items():
+        if symbol.upper().startswith(prefix):
+            return profile
+    return (1.1, 0.00001, 100000.0)
+
+
+def generate_deals(n_deals, magics, start='2025-06-25', trades_per_day=None, partial_prob=0.0, seed=42):
+    """
+    Gera deals sintéticos no formato do MT5
+
+    Cada posição tem um deal de entrada (magic da estratégia, sem comentário)
+    e um de saída por SL/TP (magic 0, comentário "[sl ...]" ou "[tp ...]"),
+    como as ordens enviadas pelo deployer.
+
+    Args:
+        n_deals (int): Quantidade aproximada de deals (2 por posição)
+        magics (dict): magic_number -> símbolo (ex: {1111: 'WINQ25'})
+        start (str): Data do primeiro deal
+        trades_per_day (int): Posições por dia (padrão: distribui em ~1 ano)
+        partial_prob (float): Fração das posições com mais de 1 lote fechadas em
+                              duas vezes (parcial pela estratégia + SL/TP)
+        seed (int): Semente
+
+    Returns:
+        pandas.DataFrame: Deals com as colunas de DEAL_FIELDS, ordenados por tempo
+    """
+    rng = np.random.default_rng(seed)
+    n_positions = max(n_deals // 2, 1)
+    trades_per_day = trades_per_day or max(n_positions // 250, 1)
+
+    # Entradas em dias úteis, entre 9h05 e 17h30
+    day = np.arange(n_positions) // trades_per_day
+    dates = pd.bdate_range(start, periods=int(day[-1]) + 1)
+    minute = rng.integers(0, 505, n_positions)
+    time_ent = np.sort(dates.values[day] + pd.to_timedelta(545 + minute, unit='m').values)
+    holding = rng.integers(1, 90, n_positions) * 60
+    time_ext = time_ent + holding.astype('timedelta64[s]')
+
+    magic_list = np.array(list(magics.keys()))
+    symbol_list = np.array(list(magics.values()))
+    choice = rng.integers(0, len(magic_list), n_positions)
+    magic = magic_list[choice]
+    symbol = symbol_list[choice]
+
+    profiles = {s: _symbol_profile(s) for s in set(magics.values())}
+    base = np.array([profiles[s][0] for s in symbol])
+    tick = np.array([profiles[s][1] for s in symbol])
+    point_value = np.array([profiles[s][2] for s in symbol])
+
+    side = rng.integers(0, 2, n_positions)                       # 0 = compra, 1 = venda
+    volume = rng.integers(1, 4, n_positions).astype(float)
+    price_ent = np.round(base * (1 + rng.normal(0, 0.02, n_positions)) / tick) * tick
+    win = rng.random(n_positions) < 0.5
+    pts = np.where(win, rng.integers(50, 300, n_positions), -rng.integers(50, 300, n_positions)) * tick
+    direction = np.where(side == 0, 1, -1)
+    price_ext = price_ent + direction * pts
+    profit = np.round(pts * point_value * volume, 2)
+
+    position_id = np.arange(1, n_positions + 1) * 2
+    entries = pd.DataFrame({
+        'ticket': position_id, 'order': position_id, 'time': time_ent,
+        'type': side, 'entry': DEAL_ENTRY_IN, 'magic': magic, 'position_id': position_id,
+        'reason': DEAL_REASON_EXPERT, 'volume': volume, 'price': price_ent, 'profit': 0.0,
+        'symbol': symbol, 'comment': ''
+    })
+    exits = pd.DataFrame({
+        'ticket': position_id + 1, 'order': position_id + 1, 'time': time_ext,
+        'type': 1 - side, 'entry': DEAL_ENTRY_OUT, 'magic': 0, 'position_id': position_id,
+        'reason': np.where(win, DEAL_REASON_TP, DEAL_REASON_SL), 'volume': volume, 'price': price_ext,
+        'profit': profit, 'symbol': symbol,
+        'comment': np.where(win, '[tp ', '[sl ') + pd.Series(price_ext).round(2).astype(str).values + ']'
+    })
+
+    parts = [entries, exits]
+
+    # Fechamento parcial: 1 lote sai antes pela estratégia (magic da entrada, sem colchete)
+    partial = (rng.random(n_positions) < partial_prob) & (volume > 1)
+    if partial.any():
+        ratio = 1.0 / volume[partial]
+        exits.loc[partial, 'volume'] -= 1.0
+        exits.loc[partial, 'profit'] = np.round(profit[partial] * (1 - ratio), 2)
+        parts.append(pd.DataFrame({
+            'ticket': position_id[partial] + 2 * n_positions + 2, 'order': position_id[partial] + 2 * n_positions + 2,
+            'time': time_ent[partial] + (holding[partial] // 2).astype('timedelta64[s]'),
+            'type': 1 - side[partial], 'entry': DEAL_ENTRY_OUT, 'magic': magic[partial],
+            'position_id': position_id[partial], 'reason': DEAL_REASON_EXPERT, 'volume': 1.0,
+            'price': price_ext[partial], 'profit': np.round(profit[partial] * ratio, 2),
+            'symbol': symbol[partial], 'comment': ''
+        }))
+
+    deals = pd.concat(parts, ignore_index=True)
+    return _normalize(deals.sort_values(['time', 'ticket']))
+
+
+def _normalize(deals):
+    """Completa colunas e converte tempo para segundos, como o MT5 devolve"""
+    deals = deals.copy()
+    if not np.issubdtype(deals['time'].dtype, np.number):
+        deals['time'] = pd.to_datetime(deals['time']).astype('datetime64[s]').astype('int64')
+    if 'time_msc' not in deals:
+        deals['time_msc'] = deals['time'] * 1000
+    for column in ['commission', 'swap', 'fee']:
+        if column not in deals:
+            deals[column] = 0.0
+    if 'external_id' not in deals:
+        deals['external_id'] = ''
+    deals['comment'] = deals['comment'].fillna('').astype(str)
+
+    deals = deals[DEAL_FIELDS].sort_values(['time', 'ticket']).reset_index(drop=True)
+    return deals
+
+
+def load_deals(path):
+    """
+    Lê deals gravados (ex: pd.DataFrame(mt5.history_deals_get(...)) salvo em disco)
+
+    Args:
+        path (str): Arquivo .csv, .parquet ou .pkl
+
+    Returns:
+        pandas.DataFrame: Deals normalizados
+    """
+    if path.endswith('.parquet'):
+        deals = pd.read_parquet(path)
+    elif path.endswith('.pkl'):
+        deals = pd.read_pickle(path)
+    else:
+        deals = pd.read_csv(path)
+    return _normalize(deals)
+
+
+def set_deals(deals):
+    """Define os deals servidos por history_deals_get"""
+    _state['deals'] = _normalize(deals)
+
+
+def magics_from_configs(pattern=None):
+    """magic_number -> símbolo dos JSONs de controle/ (padrão dos deals sintéticos)"""
+    pattern = pattern or os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.json')
+    magics = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        if 'magic_number' in config:
+            magics[int(config['magic_number'])] = config.get('symbol', 'WIN')
+    return magics
+
+
+def _default_deals():
+    """Deals configurados pelas variáveis de ambiente"""
+    path = os.getenv('MT5_FAKE_DEALS')
+    if path:
+        return load_deals(path)
+
+    spec = os.getenv('MT5_FAKE_MAGICS')
+    if spec:
+        magics = {int(m): s for m, s in (item.split(':') for item in spec.split(','))}
+    else:
+        magics = magics_from_configs() or {2: 'WINQ25'}
+    return generate_deals(int(os.getenv('MT5_FAKE_N_DEALS', 10000)), magics)
+
+
+def _to_seconds(value):
+    """Converte datetime/Timestamp/int para segundos desde a época"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(pd.Timestamp(value).timestamp())
+
+
+def _group_filter(symbols, group):
+    """
+    Aplica a máscara de grupo do MT5 ("*WIN*,*WDO*", "!" para excluir)
+
+    Args:
+        symbols (pandas.Series): Símbolos dos deals
+        group (str): Máscaras separadas por vírgula
+
+    Returns:
+        numpy.ndarray: Máscara booleana
+    """
+    unique = symbols.unique()
+    masks = [m.strip() for m in group.split(',') if m.strip()]
+    include = [m for m in masks if not m.startswith('!')]
+    exclude = [m[1:] for m in masks if m.startswith('!')]
+
+    allowed = {
+        s for s in unique
+        if any(fnmatch.fnmatchcase(s, m) for m in include) and not any(fnmatch.fnmatchcase(s, m) for m in exclude)
+    }
+    return symbols.isin(allowed).values
+
+
+#################################
+###   API do MetaTrader5      ###
+#################################
+
+def initialize(path=None, login=None, password=None, server=None, timeout=None, portable=False):
+    """Simula a conexão com o terminal"""
+    if _state['deals'] is None:
+        set_deals(_default_deals())
+    _state.update(initialized=True, login=login or 0, server=server or '',
+                  last_error=(RES_S_OK, 'Success'))
+    return True
+
+
+def shutdown():
+    """Simula a desconexão"""
+    _state['initialized'] = False
+    return True
+
+
+def last_error():
+    """Último erro (código, descrição)"""
+    return _state['last_error']
+
+
+def account_info():
+    """Informações da conta conectada"""
+    if not _state['initialized']:
+        return None
+    return AccountInfo(_state['login'], _state['server'], 30000.0, 'BRL')
+
+
+def history_deals_get(date_from=None, date_to=None, group=None, ticket=None, position=None):
+    """
+    Deals do histórico no período (e grupo), como no MetaTrader5
+
+    Returns:
+        tuple: TradeDeal ordenados por tempo; None se não estiver conectado
+    """
+    if not _state['initialized']:
+        _state['last_error'] = (RES_E_FAIL, 'Terminal: Call failed')
+        return None
+
+    deals = _state['deals']
+    if ticket is not None:
+        deals = deals[deals['ticket'] == ticket]
+    elif position is not None:
+        deals = deals[deals['position_id'] == position]
+    else:
+        # Tempo ordenado: recorte por busca binária
+        times = deals['time'].values
+        ini = np.searchsorted(times, _to_seconds(date_from), side='left')
+        fim = np.searchsorted(times, _to_seconds(date_to), side='right')
+        deals = deals.iloc[ini:fim]
+        if group:
+            deals = deals[_group_filter(deals['symbol'], group)]
+
+    _state['last_error'] = (RES_S_OK, 'Success')
+    return tuple(TradeDeal._make(row) for row in deals.itertuples(index=False, name=None))
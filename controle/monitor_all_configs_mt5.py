@@ -6,17 +6,33 @@ e gerar arquivos .csv com os resultados de trading do MT5
 import os
 import sys
 import glob
-import json
+import time
+import hashlib
+import queue
+import argparse
+import threading
+import fnmatch
 import datetime as dt
 from pathlib import Path
 import pandas as pd
 import numpy as np
-import MetaTrader5 as mt5
 from dotenv import load_dotenv
 
 # Carregar variáveis do arquivo .env
 load_dotenv()
 
+# MT5_FAKE=1 usa o substituto local (Linux, testes e benchmarks; ver fake_mt5.py)
+if os.getenv('MT5_FAKE'):
+    import fake_mt5 as mt5
+else:
+    import MetaTrader5 as mt5
+
+from deal_store import DealStore
+from trade_matching import match_trades
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.strategy_plan import load_plan
+
 
 #################################
 ###   Funções Importadas      ###
@@ -33,16 +49,14 @@ def get_mt5_credentials():
 
 
 def load_config(config_file):
-    """Carrega todas as configurações do arquivo JSON"""
+    """Carrega e valida o JSON da estratégia (StrategyPlan compilado)"""
     try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        return config
+        return load_plan(config_file)
     except FileNotFoundError:
         print(f"Arquivo {config_file} não encontrado!")
         return None
-    except json.JSONDecodeError:
-        print(f"Erro ao decodificar JSON do arquivo {config_file}")
+    except ValueError as e:
+        print(f"Erro na configuração: {e}")
         return None
     except Exception as e:
         print(f"Erro ao carregar {config_file}: {e}")
@@ -103,137 +117,300 @@ def trade_report(symbol, data_ini, data_fim, cost_per_lot):
 
 
 def process_trades_data(dfmt5, magic_number, cost_per_lot, timeframe='t5'):
-    """Processa dados de trades separando entradas e saídas"""
+    """
+    Processa dados de trades casando entradas e saídas (ver trade_matching.py)
+
+    Fechamentos parciais da mesma posição viram um único trade, com preço
+    de saída médio ponderado pelo volume (n_exits e volume_ext informam
+    quantas saídas e quanto volume já foi fechado).
+    """
 
     if dfmt5.empty:
         print("DataFrame vazio - nenhum trade para processar")
         return pd.DataFrame()
     
-    # Dataframe com entradas (trades com magic number correto)
-    filtro_ent = (dfmt5['magic']==magic_number) & (~dfmt5['comment'].str.contains('\['))
-    dfmt5_ent = dfmt5[filtro_ent][['time', 'type', 'position_id', 'magic', 'price', 'volume']].copy()
-
-
-    dfmt5_ent.rename(columns={'price': 'price_ent', 'time': 'time_ent'}, inplace=True)
-    dfmt5_ent.loc[dfmt5_ent['type'] == 1, 'posi'] = 'short'
-    dfmt5_ent.loc[dfmt5_ent['type'] == 0, 'posi'] = 'long'
-
-    # Dataframe com saídas
-    filtro_ext = (dfmt5['magic']==0) | ((dfmt5['magic']==magic_number) & (dfmt5['comment'].str.contains('\[')))
-    dfmt5_ext = dfmt5[filtro_ext][['time', 'position_id', 'price', 'profit', 'comment']].copy()
+    dfmt5_2 = match_trades(dfmt5, magic_numbers=[magic_number])
     
-    if dfmt5_ext.empty:
-        print("Nenhuma saída encontrada")
+    if dfmt5_2.empty:
+        print(f"Nenhum trade encontrado para magic number {magic_number}")
         return pd.DataFrame()
     
-    dfmt5_ext.rename(columns={'price': 'price_ext', 'time': 'time_ext'}, inplace=True)
-    
-    # Unindo entradas e saídas
-    dfmt5_2 = pd.merge(dfmt5_ent, dfmt5_ext, on="position_id", how='left')
-    
-    if dfmt5_2.empty:
-        print("Nenhum trade completo encontrado após merge")
+    if dfmt5_2['time_ext'].isna().all():
+        print("Nenhuma saída encontrada")
         return pd.DataFrame()
     
     # Calculando métricas
     dfmt5_2['delta_t'] = (dfmt5_2['time_ext'] - dfmt5_2['time_ent']).dt.total_seconds() / 60
-    dfmt5_2['pts_final_demo'] = abs(dfmt5_2['price_ext'] - dfmt5_2['price_ent'])
+    dfmt5_2['pts_final_demo'] = (dfmt5_2['price_ext'] - dfmt5_2['price_ent']).abs()
     
     # Pontos finais considerando direção
-    dfmt5_2.loc[dfmt5_2['posi'] == 'long', 'pts_final_real'] = dfmt5_2['price_ext'] - dfmt5_2['price_ent']
-    dfmt5_2.loc[dfmt5_2['posi'] == 'short', 'pts_final_real'] = dfmt5_2['price_ent'] - dfmt5_2['price_ext']
+    direction = np.select([dfmt5_2['posi'] == 'long', dfmt5_2['posi'] == 'short'], [1.0, -1.0], np.nan)
+    dfmt5_2['pts_final_real'] = (dfmt5_2['price_ext'] - dfmt5_2['price_ent']) * direction
     
     # Ajustando tempo para comparação com candles baseado no timeframe
     timeframe_offset = get_timeframe_offset(timeframe)
-    dfmt5_2['time'] = dfmt5_2['time_ent'] - pd.Timedelta(minutes=timeframe_offset)
-    dfmt5_2['time'] = dfmt5_2['time'].dt.round('min')
+    dfmt5_2['time'] = (dfmt5_2['time_ent'] - pd.Timedelta(minutes=timeframe_offset)).dt.round('min')
     dfmt5_2.set_index("time", inplace=True)
     
     # Lucro com custo
     dfmt5_2['lucro'] = dfmt5_2['profit'] - dfmt5_2['volume'] * cost_per_lot
     
-    # Filtrando por magic number
-    dfmt5_2 = dfmt5_2[dfmt5_2['magic'] == magic_number].copy()
-    
-    if dfmt5_2.empty:
-        print(f"Nenhum trade encontrado para magic number {magic_number}")
-        return pd.DataFrame()
-    
     # Lucro acumulado
     dfmt5_2['cstrategy'] = dfmt5_2['lucro'].cumsum()
-
     
     return dfmt5_2
 
 
-def base_trades(config_file, data_fim=None, symbol_override=None):
-    """Função principal para extrair e processar dados de trading do MT5"""
-    
-    # Carregar configurações
-    config = load_config(config_file)
-    if config is None:
-        return pd.DataFrame()
-    
+def resolve_monitor_config(config_file, data_fim=None, symbol_override=None):
+    """
+    Lê um JSON de estratégia e resolve os parâmetros usados pelo monitor
+
+    Args:
+        config_file (str): Caminho do JSON
+        data_fim (str): Data final (padrão: do config ou data atual)
+        symbol_override (str): Símbolo a usar no lugar do config
+
+    Returns:
+        dict: group (máscara MT5), symbol2, magic_number, cost_per_lot, timeframe,
+              strategy, data_ini, data_fim e config_file; None se o JSON for inválido
+    """
+    plan = load_config(config_file)
+    if plan is None:
+        return None
+
     # Extrair parâmetros de data do config
-    data_ini = config.get('data_ini', '2025-06-25')
-    
+    data_ini = plan.data_ini or '2025-06-25'
+
     # Usar data fim fornecida, do config ou data atual
     if data_fim is None:
-        data_fim = config.get('data_fim', dt.datetime.now().strftime('%Y-%m-%d'))
-    
-    print(f"Período de análise: {data_ini} a {data_fim}")
-    
-    # Determinar símbolo e normalizar para WIN
-    symbol = symbol_override if symbol_override else config.get('symbol', 'WIN')
-    
+        data_fim = plan.data_fim or dt.datetime.now().strftime('%Y-%m-%d')
+
+    # Determinar símbolo e normalizar para WIN/WDO
+    symbol = symbol_override if symbol_override else plan.symbol
+    symbol2 = symbol.upper()
+
     # SOLUÇÃO SIMPLES: Se contém WIN, usar *WIN*
     if "WIN" in symbol.upper():
-        symbol2 = symbol.upper()
-        symbol = "*WIN*"      
+        symbol = "*WIN*"
     if "WDO" in symbol.upper():
-        symbol2 = symbol.upper()
-        symbol = "*WDO*"     
+        symbol = "*WDO*"
     elif not symbol.startswith('*'):
         symbol = f"*{symbol}*"
+
+    return {
+        'config_file': config_file,
+        'group': symbol,
+        'symbol2': symbol2,
+        'magic_number': plan.magic_number if plan.magic_number is not None else 2,
+        'cost_per_lot': plan.tc if plan.tc is not None else 0.5,
+        'timeframe': plan.timeframe,
+        'strategy': plan.strategy,
+        'data_ini': pd.Timestamp(data_ini),
+        'data_fim': pd.Timestamp(data_fim) + dt.timedelta(days=1)
+    }
+
+
+def results_path(spec):
+    """Caminho do CSV de resultados reais de uma configuração"""
+    return (f"controle/real_results/results_{spec['symbol2']}_{spec['timeframe']}_"
+            f"{spec['strategy']}_magic_{spec['magic_number']}.csv")
+
+
+def spec_fingerprint(spec):
+    """
+    Impressão digital da configuração que gerou um CSV de resultados
+
+    Combina o conteúdo do JSON com os parâmetros resolvidos (custo, período,
+    máscara de símbolos), para que alterar o JSON ou o período force o
+    reprocessamento mesmo sem deals novos.
+    """
+    digest = hashlib.sha1()
+    with open(spec['config_file'], 'rb') as f:
+        digest.update(f.read())
+    fields = ['group', 'symbol2', 'magic_number', 'cost_per_lot', 'timeframe', 'strategy', 'data_ini', 'data_fim']
+    digest.update(repr([(k, str(spec.get(k))) for k in fields]).encode())
+    return digest.hexdigest()
+
+
+def fingerprint_path(spec):
+    """Arquivo com a impressão digital da configuração do CSV de resultados"""
+    return f"{results_path(spec)}.fingerprint"
+
+
+def results_current(spec):
+    """True se o CSV de resultados existe e foi gerado com a configuração atual"""
+    try:
+        with open(fingerprint_path(spec)) as f:
+            saved = f.read().strip()
+    except OSError:
+        return False
+    return os.path.exists(results_path(spec)) and saved == spec_fingerprint(spec)
+
+
+def save_results(spec, result_df):
+    """Salva os trades processados de uma configuração em controle/real_results/"""
+    output_file = results_path(spec)
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
+    # Escrita atômica: quem lê o CSV (reconciliação, notebooks) nunca vê arquivo pela metade
+    tmp_file = f"{output_file}.tmp"
+    result_df.to_csv(tmp_file, index=True)
+    os.replace(tmp_file, output_file)
+
+    # Impressão digital gravada depois do CSV: se a gravação parar no meio, o CSV é refeito
+    with open(f"{fingerprint_path(spec)}.tmp", 'w') as f:
+        f.write(spec_fingerprint(spec))
+    os.replace(f"{fingerprint_path(spec)}.tmp", fingerprint_path(spec))
+    print(f"Resultados salvos em: {output_file}")
+    return output_file
+
+
+def base_trades(config_file, data_fim=None, symbol_override=None):
+    """Função principal para extrair e processar dados de trading do MT5"""
     
-    magic_number = config.get('magic_number', 2)
-    cost_per_lot = config.get('tc', 0.5)
-    timeframe = config.get('timeframe', 't5')
-    strategy_name = config['strategy']
+    # Carregar configurações
+    spec = resolve_monitor_config(config_file, data_fim, symbol_override)
+    if spec is None:
+        return pd.DataFrame()
     
-    print(f"Símbolo: {symbol}")
-    print(f"Magic Number: {magic_number}")
-    print(f"Custo por lote: {cost_per_lot}")
-    print(f"Timeframe: {timeframe}")
+    print(f"Período de análise: {spec['data_ini'].date()} a {spec['data_fim'].date()}")
+    print(f"Símbolo: {spec['group']}")
+    print(f"Magic Number: {spec['magic_number']}")
+    print(f"Custo por lote: {spec['cost_per_lot']}")
+    print(f"Timeframe: {spec['timeframe']}")
     
     # Extrair dados do MT5
-    dfmt5 = trade_report(
-        symbol, 
-        pd.Timestamp(data_ini), 
-        pd.Timestamp(data_fim) + dt.timedelta(days=1),
-        cost_per_lot
-    )
+    dfmt5 = trade_report(spec['group'], spec['data_ini'], spec['data_fim'], spec['cost_per_lot'])
     
     if dfmt5.empty:
         print("Nenhum dado encontrado no MT5")
         return pd.DataFrame()
     
     # Processar dados
-    result_df = process_trades_data(dfmt5, magic_number, cost_per_lot, timeframe)
+    result_df = process_trades_data(dfmt5, spec['magic_number'], spec['cost_per_lot'], spec['timeframe'])
     
     if not result_df.empty:
-        # Criar diretório se não existir
-        os.makedirs("real_results", exist_ok=True)
-        
-        # Para o nome do arquivo, usar apenas WIN se for contrato WIN
-        file_symbol = "WIN" if "*WIN*" in symbol else symbol.replace('*', '')
-        output_file = f"controle/real_results/results_{symbol2}_{timeframe}_{strategy_name}_magic_{magic_number}.csv"
-        result_df.to_csv(output_file, index=True)
-        print(f"Resultados salvos em: {output_file}")
+        save_results(spec, result_df)
     
     return result_df
 
 
+def fetch_deals(group, data_ini, data_fim):
+    """
+    Busca deals no MT5 e converte para DataFrame
+
+    Args:
+        group (str): Máscara(s) de símbolo separadas por vírgula (ex: "*WIN*,*WDO*")
+        data_ini (Timestamp): Início do período
+        data_fim (Timestamp): Fim do período
+
+    Returns:
+        pandas.DataFrame: Deals (vazio se não houver deals)
+    """
+    print(f"Buscando deals de {group} entre {data_ini} e {data_fim}")
+    deals = mt5.history_deals_get(data_ini, data_fim, group=group)
+
+    if deals is None or len(deals) == 0:
+        print(f"Nenhum deal encontrado para {group} no período especificado")
+        return pd.DataFrame()
+
+    print(f"Encontrados {len(deals)} deals para {group}")
+
+    df = pd.DataFrame(list(deals), columns=deals[0]._asdict().keys())
+    df['time'] = pd.to_datetime(df['time'], unit='s')
+    return df
+
+
+def fetch_all_deals(specs):
+    """
+    Busca no MT5, em uma única chamada, os deals de todas as configurações
+
+    O período é a união dos períodos das configurações e o filtro de
+    símbolos junta as máscaras (ex: "*WIN*,*WDO*").
+
+    Args:
+        specs (list): Saídas de resolve_monitor_config
+
+    Returns:
+        pandas.DataFrame: Tabela única de deals (vazia se não houver deals)
+    """
+    group = ",".join(sorted({spec['group'] for spec in specs}))
+    data_ini = min(spec['data_ini'] for spec in specs)
+    data_fim = max(spec['data_fim'] for spec in specs)
+    return fetch_deals(group, data_ini, data_fim)
+
+
+def open_deal_store(store_dir):
+    """Abre o store local de deals da conta conectada"""
+    account_info = mt5.account_info()
+    account = account_info.login if account_info is not None else get_mt5_credentials()['login']
+    return DealStore(store_dir, account)
+
+
+def sync_deal_store(specs, store):
+    """
+    Atualiza o store local com os deals que faltam e carrega a tabela completa
+
+    Args:
+        specs (list): Saídas de resolve_monitor_config
+        store (DealStore): Store da conta (ver open_deal_store)
+
+    Returns:
+        tuple: (todos os deals do store, deals novos desta execução)
+    """
+    new_deals = store.sync(
+        fetch_deals,
+        [spec['group'] for spec in specs],
+        min(spec['data_ini'] for spec in specs),
+        max(spec['data_fim'] for spec in specs)
+    )
+    deals = store.load()
+    print(f"Store da conta {store.account}: {len(deals)} deals ({len(new_deals)} novos)")
+    return deals, new_deals
+
+
+def changed_magics(deals_by_magic, new_deals):
+    """Magic numbers com deals novos (inclui saídas com magic 0 das suas posições)"""
+    if new_deals.empty:
+        return set()
+    new_positions = set(new_deals['position_id'])
+    return {magic for magic, df in deals_by_magic.items() if not new_positions.isdisjoint(df['position_id'])}
+
+
+def split_deals_by_magic(deals, magic_numbers):
+    """
+    Separa a tabela de deals por magic number
+
+    As saídas por SL/TP chegam com magic 0, então cada deal é atribuído ao
+    magic da entrada da sua posição (position_id).
+
+    Args:
+        deals (pandas.DataFrame): Tabela de fetch_all_deals
+        magic_numbers (iterable): Magic numbers das configurações
+
+    Returns:
+        dict: magic_number -> DataFrame com os deals das posições desse magic
+    """
+    if deals.empty:
+        return {}
+
+    owners = deals.loc[deals['magic'].isin(list(magic_numbers)), ['position_id', 'magic']]
+    owners = owners.drop_duplicates('position_id').rename(columns={'magic': 'owner_magic'})
+    owned = deals.merge(owners, on='position_id', how='inner')
+
+    return {magic: group.drop(columns='owner_magic') for magic, group in owned.groupby('owner_magic')}
+
+
+def filter_deals(deals, spec):
+    """Restringe os deals de um magic ao símbolo e período da configuração"""
+    symbols = deals['symbol'].str.upper()
+    masks = [m.upper() for m in spec['group'].split(',')]
+    matched = {s: any(fnmatch.fnmatchcase(s, m) for m in masks) for s in symbols.unique()}
+
+    filtro = symbols.map(matched) & (deals['time'] >= spec['data_ini']) & (deals['time'] < spec['data_fim'])
+    return deals[filtro]
+
+
 #################################
 ###   Funções do Monitor      ###
 #################################
@@ -283,21 +460,19 @@ def find_json_configs():
     return sorted(current_json_files)
 
 
-def process_all_configs(data_fim=None):
-    """Processa todos os arquivos .json encontrados no diretório atual"""
-    
-    print("="*50)
-    print("MONITOR DE CONFIGURAÇÕES")
-    print("="*50)
-    print(f"Diretório de trabalho: {os.getcwd()}")
-    print(f"Buscando arquivos JSON em: controle/")
-    
+def load_specs(data_fim=None):
+    """
+    Encontra os JSONs e resolve as configurações do monitor
+
+    Returns:
+        tuple: (lista de configurações válidas, quantidade de falhas)
+    """
     # Encontrar todos os arquivos .json no diretório atual
     json_files = find_json_configs()
     
     if not json_files:
         print("Nenhum arquivo .json encontrado no diretório atual")
-        return
+        return [], 0
     
     print(f"\nEncontrados {len(json_files)} arquivo(s) .json:")
     for i, file in enumerate(json_files, 1):
@@ -305,24 +480,69 @@ def process_all_configs(data_fim=None):
     
     print("\n" + "-"*50)
     
-    # Conectar ao MT5
-    print("Conectando ao MT5...")
-    if not connect_mt5():
-        print("Erro: Não foi possível conectar ao MT5")
-        return
-    
-    # Processar cada arquivo
+    specs = []
+    falhas = 0
+    for config_file in json_files:
+        try:
+            spec = resolve_monitor_config(config_file, data_fim)
+        except Exception as e:
+            print(f"[ERRO] {config_file}: {str(e)}")
+            spec = None
+        if spec is None:
+            falhas += 1
+        else:
+            specs.append(spec)
+
+    return specs, falhas
+
+
+def update_results(specs, deals_by_magic, changed, writer=None, verbose=True, failed=None):
+    """
+    Processa e salva os resultados das configurações com deals novos ou
+    cuja configuração mudou desde a última gravação (spec_fingerprint)
+
+    Args:
+        specs (list): Saídas de resolve_monitor_config
+        deals_by_magic (dict): Saída de split_deals_by_magic
+        changed (set): Magic numbers com deals novos
+        writer (ResultsWriter): Gravação em segundo plano (None = grava direto)
+        verbose (bool): Mostra também as configurações sem alteração
+        failed (set): Recebe os magic numbers cujo processamento levantou erro
+
+    Returns:
+        tuple: (sucessos, falhas)
+    """
     sucessos = 0
     falhas = 0
     
-    for i, config_file in enumerate(json_files, 1):
-        print(f"\n[{i}/{len(json_files)}] Processando: {config_file}")
+    for i, spec in enumerate(specs, 1):
+        config_file = spec['config_file']
+        unchanged = spec['magic_number'] not in changed and results_current(spec)
+        
+        if unchanged:
+            if verbose:
+                print(f"\n[{i}/{len(specs)}] Processando: {config_file}")
+                print(f"[OK] {config_file} - sem deals novos nem mudança de configuração, resultados mantidos")
+            sucessos += 1
+            continue
+        
+        print(f"\n[{i}/{len(specs)}] Processando: {config_file}")
+        print(f"Magic Number: {spec['magic_number']} | Símbolo: {spec['group']} | Timeframe: {spec['timeframe']}")
         print("-" * 40)
         
         try:
-            df_results = base_trades(config_file=config_file, data_fim=data_fim)
+            dfmt5 = deals_by_magic.get(spec['magic_number'], pd.DataFrame())
+            if not dfmt5.empty:
+                dfmt5 = filter_deals(dfmt5, spec)
+
+            df_results = process_trades_data(dfmt5, spec['magic_number'], spec['cost_per_lot'],
+                                             spec['timeframe'])
             
             if not df_results.empty:
+                if writer is not None:
+                    writer.submit(spec, df_results)
+                else:
+                    save_results(spec, df_results)
                 print(f"[OK] {config_file} - {len(df_results)} trades processados")
                 sucessos += 1
             else:
@@ -332,6 +552,53 @@ def process_all_configs(data_fim=None):
         except Exception as e:
             print(f"[ERRO] {config_file}: {str(e)}")
             falhas += 1
+            if failed is not None:
+                failed.add(spec['magic_number'])
+
+    return sucessos, falhas
+
+
+def process_all_configs(data_fim=None, use_store=True, store_dir='controle/deal_store'):
+    """
+    Processa todos os arquivos .json encontrados no diretório atual
+
+    Args:
+        data_fim (str): Data final (padrão: do config ou data atual)
+        use_store (bool): Usa o store local de deals (busca só deals novos e
+                          regrava apenas os resultados dos magics alterados)
+        store_dir (str): Pasta base do store
+    """
+    
+    print("="*50)
+    print("MONITOR DE CONFIGURAÇÕES")
+    print("="*50)
+    print(f"Diretório de trabalho: {os.getcwd()}")
+    print(f"Buscando arquivos JSON em: controle/")
+    
+    # Carregar todas as configurações antes de consultar o MT5
+    specs, falhas = load_specs(data_fim)
+
+    if not specs:
+        print("Nenhuma configuração válida encontrada")
+        return
+
+    # Conectar ao MT5
+    print("Conectando ao MT5...")
+    if not connect_mt5():
+        print("Erro: Não foi possível conectar ao MT5")
+        return
+    
+    # Uma única busca de deals para todas as configurações
+    if use_store:
+        deals, new_deals = sync_deal_store(specs, open_deal_store(store_dir))
+    else:
+        deals = fetch_all_deals(specs)
+    deals_by_magic = split_deals_by_magic(deals, {spec['magic_number'] for spec in specs})
+    changed = changed_magics(deals_by_magic, new_deals) if use_store else set(deals_by_magic)
+    
+    # Processar cada configuração
+    sucessos, falhas_proc = update_results(specs, deals_by_magic, changed)
+    falhas += falhas_proc
     
     # Resumo
     print("\n" + "="*50)
@@ -345,10 +612,185 @@ def process_all_configs(data_fim=None):
     print("Desconectado do MT5")
 
 
+#################################
+###   Modo Daemon             ###
+#################################
+
+class ResultsWriter:
+    """
+    Grava os CSVs de resultados em uma thread separada
+
+    O polling só enfileira o DataFrame; se o disco estiver lento e o mesmo
+    arquivo for atualizado de novo antes de ser gravado, apenas a versão
+    mais recente é escrita (a fila nunca cresce além de um item por arquivo).
+    Os magics cuja gravação falhou ficam em take_failed() para o próximo ciclo.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._failed = set()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self.written = 0
+        self.errors = 0
+        self._thread = threading.Thread(target=self._run, name='results-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, spec, result_df):
+        """Agenda a gravação dos resultados de uma configuração"""
+        path = results_path(spec)
+        with self._lock:
+            is_new = path not in self._pending
+            self._pending[path] = (spec, result_df)
+        if is_new:
+            self._queue.put(path)
+
+    def pending(self):
+        """Quantidade de arquivos aguardando gravação"""
+        with self._lock:
+            return len(self._pending)
+
+    def take_failed(self):
+        """Magic numbers com gravação falha desde a última chamada"""
+        with self._lock:
+            failed, self._failed = self._failed, set()
+        return failed
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            if path is None:
+                break
+            with self._lock:
+                spec, result_df = self._pending.pop(path)
+            try:
+                save_results(spec, result_df)
+                self.written += 1
+                with self._lock:
+                    self._failed.discard(spec['magic_number'])
+            except Exception as e:
+                print(f"[ERRO] Gravação de {path}: {e}")
+                self.errors += 1
+                with self._lock:
+                    self._failed.add(spec['magic_number'])
+
+    def close(self):
+        """Grava o que estiver pendente e encerra a thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+
+def refresh_period(specs, data_fim=None):
+    """Avança o fim do período para o dia seguinte (daemon rodando após a meia-noite)"""
+    if data_fim is not None:
+        return
+    tomorrow = pd.Timestamp.now().normalize() + dt.timedelta(days=1)
+    for spec in specs:
+        spec['data_fim'] = max(spec['data_fim'], tomorrow)
+
+
+def run_daemon(interval=60, data_fim=None, store_dir='controle/deal_store', compact_every=360,
+               max_cycles=None):
+    """
+    Mantém a conexão com o MT5 aberta e atualiza os resultados periodicamente
+
+    A cada ciclo busca apenas os deals novos (store local), reprocessa os
+    magics alterados e entrega os CSVs ao ResultsWriter, que grava em
+    segundo plano. O store avança antes do processamento, então magics cujo
+    processamento ou gravação falhou ficam pendentes e são refeitos nos
+    ciclos seguintes mesmo sem deals novos. Novos JSONs exigem reiniciar o
+    daemon.
+
+    Args:
+        interval (float): Segundos entre consultas ao MT5
+        data_fim (str): Data final fixa (padrão: acompanha a data atual)
+        store_dir (str): Pasta base do store de deals
+        compact_every (int): Compacta os segmentos do store a cada N ciclos
+        max_cycles (int): Encerra após N ciclos (None = até Ctrl+C)
+    """
+    print("="*50)
+    print("MONITOR DE CONFIGURAÇÕES (DAEMON)")
+    print("="*50)
+    print(f"Intervalo de polling: {interval}s")
+
+    specs, _ = load_specs(data_fim)
+    if not specs:
+        print("Nenhuma configuração válida encontrada")
+        return
+
+    print("Conectando ao MT5...")
+    if not connect_mt5():
+        print("Erro: Não foi possível conectar ao MT5")
+        return
+
+    store = open_deal_store(store_dir)
+    writer = ResultsWriter()
+    magic_numbers = {spec['magic_number'] for spec in specs}
+    # Magics a reprocessar mesmo sem deals novos (primeiro ciclo: todos)
+    pending = set(magic_numbers)
+    cycle = 0
+
+    try:
+        while max_cycles is None or cycle < max_cycles:
+            cycle += 1
+            started = time.perf_counter()
+
+            # Reconecta se o terminal caiu
+            if mt5.account_info() is None:
+                print("Conexão com o MT5 perdida, reconectando...")
+                if not connect_mt5():
+                    time.sleep(interval)
+                    continue
+
+            try:
+                refresh_period(specs, data_fim)
+                deals, new_deals = sync_deal_store(specs, store)
+                pending |= writer.take_failed()
+                if not new_deals.empty or pending:
+                    try:
+                        deals_by_magic = split_deals_by_magic(deals, magic_numbers)
+                        changed = changed_magics(deals_by_magic, new_deals) | pending
+                        failed = set()
+                        update_results(specs, deals_by_magic, changed, writer, verbose=False, failed=failed)
+                        pending = failed
+                    except Exception:
+                        # Os deals novos já estão no store: refaz todos os magics no próximo ciclo
+                        pending = set(magic_numbers)
+                        raise
+                if compact_every and cycle % compact_every == 0:
+                    store.compact()
+            except Exception as e:
+                print(f"[ERRO] Ciclo {cycle}: {e}")
+
+            elapsed = time.perf_counter() - started
+            print(f"[{dt.datetime.now():%H:%M:%S}] Ciclo {cycle}: {elapsed:.2f}s | "
+                  f"gravações pendentes: {writer.pending()} | gravados: {writer.written}")
+
+            if max_cycles is None or cycle < max_cycles:
+                time.sleep(max(interval - elapsed, 0))
+
+    except KeyboardInterrupt:
+        print("\nDaemon interrompido pelo usuário")
+    finally:
+        writer.close()
+        mt5.shutdown()
+        print(f"Desconectado do MT5 ({writer.written} arquivos gravados, {writer.errors} erros)")
+
+
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description='Monitor de configurações do MT5')
+    parser.add_argument('--daemon', action='store_true', help='Mantém o monitor rodando em polling')
+    parser.add_argument('--interval', type=float, default=60, help='Segundos entre consultas (daemon)')
+    parser.add_argument('--data-fim', default=None)
+    parser.add_argument('--no-store', action='store_true', help='Busca completa, sem o store local')
+    args = parser.parse_args()
+
     print("Iniciando monitor de configurações...")
-    process_all_configs()
+    if args.daemon:
+        run_daemon(interval=args.interval, data_fim=args.data_fim)
+    else:
+        process_all_configs(data_fim=args.data_fim, use_store=not args.no_store)
 
 
 if __name__ == "__main__":
@@ -365,4 +807,4 @@ if __name__ == "__main__":
         try:
             mt5.shutdown()
         except:
-            pass
\ No newline at end of file
+            pass
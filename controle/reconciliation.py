@@ -0,0 +1,256 @@
+"""
+Reconciliação vetorizada entre trades reais (MT5) e o backtest das estratégias.
+
+Substitui a comparação manual do notebook "tentando comparar": os trades
+reais de controle/real_results/ (gerados pelo monitor) são casados com os
+sinais dos CSVs de controle/backtest_results/ (gerados por
+backtest_all_configs.py) com um único merge_asof por magic number sobre
+índices de tempo ordenados, para todas as estratégias de uma vez.
+
+Cada trade é classificado como:
+    - ok: real e backtest no mesmo candle (dentro da tolerância) e mesma direção
+    - mismatched: casados no tempo, mas com direção diferente
+    - extra: trade real sem sinal correspondente no backtest
+    - missed: sinal do backtest que não foi operado
+
+Para os casados são calculados o slippage de entrada (em pontos, positivo =
+pior que o backtest, que entra na abertura do candle seguinte ao sinal) e a
+divergência de pontos e de resultado financeiro.
+
+Exemplo:
+
+    python controle/reconciliation.py --tolerance 5
+
+    from reconciliation import reconcile_all
+    trades, summary = reconcile_all('controle/real_results', 'controle/backtest_results')
+"""
+
+import os
+import re
+import glob
+import argparse
+
+import numpy as np
+import pandas as pd
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MAGIC_PATTERN = re.compile(r'_magic_(\d+)\.csv$')
+
+
+def _magic_from_path(path):
+    match = MAGIC_PATTERN.search(os.path.basename(path))
+    return int(match.group(1)) if match else None
+
+
+def load_real_trades(real_dir):
+    """
+    Lê todos os results_*_magic_*.csv do monitor
+
+    Returns:
+        pandas.DataFrame: Um trade por linha com time (candle do sinal), magic,
+                          direction, price_ent, pts_real, pnl_real, time_ent
+    """
+    frames = []
+    for path in sorted(glob.glob(os.path.join(real_dir, 'results_*_magic_*.csv'))):
+        df = pd.read_csv(path, parse_dates=['time', 'time_ent'])
+        if df.empty:
+            continue
+        frames.append(pd.DataFrame({
+            'time': df['time'],
+            'magic': _magic_from_path(path),
+            'direction': np.where(df['posi'] == 'long', 1, -1),
+            'time_ent': df['time_ent'],
+            'price_ent': df['price_ent'],
+            'volume': df['volume'],
+            'pts_real': df['pts_final_real'],
+            'pnl_real': df['lucro']
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=['time', 'magic', 'direction', 'time_ent', 'price_ent',
+                                     'volume', 'pts_real', 'pnl_real'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_backtest_trades(backtest_dir):
+    """
+    Lê todos os backtest_*_magic_*.csv e extrai os candles com sinal
+
+    O preço de entrada do backtest é a abertura do candle seguinte ao sinal.
+
+    Returns:
+        pandas.DataFrame: Um sinal por linha com time, magic, direction_bt,
+                          price_ent_bt, pts_bt, pnl_bt
+    """
+    frames = []
+    for path in sorted(glob.glob(os.path.join(backtest_dir, 'backtest_*_magic_*.csv'))):
+        df = pd.read_csv(path, index_col=0, parse_dates=True)
+        next_open = df['open'].shift(-1)
+        signal = df['position'].fillna(0) != 0
+        if not signal.any():
+            continue
+        frames.append(pd.DataFrame({
+            'time': df.index[signal],
+            'magic': _magic_from_path(path),
+            'direction_bt': np.sign(df.loc[signal, 'position'].to_numpy()).astype(int),
+            'price_ent_bt': next_open[signal].to_numpy(),
+            'pts_bt': df.loc[signal, 'pts_final'].to_numpy(),
+            'pnl_bt': df.loc[signal, 'strategy'].to_numpy()
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=['time', 'magic', 'direction_bt', 'price_ent_bt', 'pts_bt', 'pnl_bt'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def reconcile(real, backtest, tolerance=pd.Timedelta(minutes=5), restrict_period=True):
+    """
+    Casa trades reais e sinais do backtest de todas as estratégias
+
+    Args:
+        real (pandas.DataFrame): Saída de load_real_trades
+        backtest (pandas.DataFrame): Saída de load_backtest_trades
+        tolerance (pandas.Timedelta): Distância máxima entre o candle real e o do backtest
+        restrict_period (bool): Considera "missed" apenas sinais do backtest dentro do
+                                período operado de cada magic (primeiro ao último trade real)
+
+    Returns:
+        pandas.DataFrame: Uma linha por trade real ou sinal do backtest, com status,
+                          time_diff, slippage, pts_diff e pnl_diff
+    """
+    magics = real['magic'].unique()
+    backtest = backtest[backtest['magic'].isin(magics)].copy()
+    real = real.sort_values('time').reset_index(drop=True)
+    backtest = backtest.sort_values('time').reset_index(drop=True)
+    backtest['bt_id'] = np.arange(len(backtest))
+    backtest['time_bt'] = backtest['time']
+
+    # Sinal do backtest mais próximo por magic (índices ordenados por tempo)
+    merged = pd.merge_asof(real, backtest, on='time', by='magic', direction='nearest', tolerance=tolerance)
+
+    # Um sinal só pode casar com um trade real: fica o mais próximo, os demais viram extra
+    merged['time_diff'] = (merged['time'] - merged['time_bt']).abs()
+    ranked = merged.sort_values(['bt_id', 'time_diff'], kind='stable')
+    duplicated = ranked['bt_id'].notna() & ranked.duplicated('bt_id')
+    merged.loc[ranked.index[duplicated], ['bt_id', 'time_bt', 'direction_bt', 'price_ent_bt',
+                                          'pts_bt', 'pnl_bt', 'time_diff']] = np.nan
+
+    matched = merged['bt_id'].notna()
+    merged['status'] = np.select(
+        [~matched, merged['direction'] == merged['direction_bt']],
+        ['extra', 'ok'],
+        'mismatched'
+    )
+
+    # Sinais do backtest não operados
+    missed = backtest[~backtest['bt_id'].isin(merged.loc[matched, 'bt_id'])]
+    if restrict_period and not missed.empty:
+        period = real.groupby('magic')['time'].agg(['min', 'max'])
+        bounds = period.reindex(missed['magic'])
+        inside = ((missed['time'].to_numpy() >= bounds['min'].to_numpy()) &
+                  (missed['time'].to_numpy() <= bounds['max'].to_numpy()))
+        missed = missed[inside]
+    missed = missed.assign(status='missed')
+
+    trades = pd.concat([merged, missed], ignore_index=True)
+    trades = trades.drop(columns='bt_id').sort_values(['magic', 'time']).reset_index(drop=True)
+
+    # Slippage de entrada (pontos, positivo = pior) e divergências
+    trades['slippage'] = (trades['price_ent'] - trades['price_ent_bt']) * trades['direction']
+    trades['pts_diff'] = trades['pts_real'] - trades['pts_bt']
+    trades['pnl_diff'] = trades['pnl_real'] - trades['pnl_bt']
+
+    return trades
+
+
+def _quantiles(series, prefix):
+    values = series.dropna()
+    if values.empty:
+        return {f'{prefix}_mean': np.nan, f'{prefix}_p05': np.nan, f'{prefix}_p50': np.nan, f'{prefix}_p95': np.nan}
+    q = values.quantile([0.05, 0.5, 0.95]).to_numpy()
+    return {f'{prefix}_mean': values.mean(), f'{prefix}_p05': q[0], f'{prefix}_p50': q[1], f'{prefix}_p95': q[2]}
+
+
+def summarize(trades):
+    """
+    Resume a reconciliação por magic number
+
+    Returns:
+        pandas.DataFrame: Contagens por status, taxa de casamento, distribuição do
+                          slippage e das divergências, e resultado real x backtest
+    """
+    counts = trades.pivot_table(index='magic', columns='status', values='time', aggfunc='count', fill_value=0)
+    counts = counts.reindex(columns=['ok', 'mismatched', 'extra', 'missed'], fill_value=0)
+
+    rows = []
+    for magic, group in trades.groupby('magic'):
+        matched = group[group['status'].isin(['ok', 'mismatched'])]
+        row = {'magic': magic}
+        row.update(_quantiles(matched['slippage'], 'slippage'))
+        row.update(_quantiles(matched['pts_diff'], 'pts_diff'))
+        row.update(_quantiles(matched['pnl_diff'], 'pnl_diff'))
+        row['pnl_real'] = group['pnl_real'].sum()
+        row['pnl_bt'] = group['pnl_bt'].sum()
+        rows.append(row)
+
+    summary = counts.join(pd.DataFrame(rows).set_index('magic'))
+    signals = summary['ok'] + summary['mismatched'] + summary['missed']
+    summary['match_rate'] = (summary['ok'] / signals.replace(0, np.nan))
+    return summary
+
+
+def reconcile_all(real_dir=None, backtest_dir=None, output_dir=None, tolerance_minutes=5):
+    """
+    Reconcilia todas as estratégias e salva trades e resumo
+
+    Args:
+        real_dir (str): Pasta com os results_*.csv (padrão: controle/real_results)
+        backtest_dir (str): Pasta com os backtest_*.csv (padrão: controle/backtest_results)
+        output_dir (str): Pasta de saída (padrão: controle/reconciliation; None = não salva)
+        tolerance_minutes (int): Tolerância do casamento em minutos
+
+    Returns:
+        tuple: (trades, summary)
+    """
+    real_dir = real_dir or os.path.join(SCRIPT_DIR, 'real_results')
+    backtest_dir = backtest_dir or os.path.join(SCRIPT_DIR, 'backtest_results')
+
+    real = load_real_trades(real_dir)
+    backtest = load_backtest_trades(backtest_dir)
+    print(f"Trades reais: {len(real)} | Sinais do backtest: {len(backtest)}")
+
+    if real.empty:
+        print("Nenhum trade real encontrado")
+        return pd.DataFrame(), pd.DataFrame()
+
+    trades = reconcile(real, backtest, pd.Timedelta(minutes=tolerance_minutes))
+    summary = summarize(trades)
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        trades.to_csv(os.path.join(output_dir, 'reconciliation_trades.csv'), index=False)
+        summary.to_csv(os.path.join(output_dir, 'reconciliation_summary.csv'))
+        print(f"Reconciliação salva em: {output_dir}")
+
+    return trades, summary
+
+
+def main():
+    """Reconcilia todas as estratégias de controle/"""
+    parser = argparse.ArgumentParser(description='Reconciliação entre trades reais e backtest')
+    parser.add_argument('--real', default=os.path.join(SCRIPT_DIR, 'real_results'))
+    parser.add_argument('--backtest', default=os.path.join(SCRIPT_DIR, 'backtest_results'))
+    parser.add_argument('--output', default=os.path.join(SCRIPT_DIR, 'reconciliation'))
+    parser.add_argument('--tolerance', type=int, default=5, help='Tolerância em minutos')
+    args = parser.parse_args()
+
+    _, summary = reconcile_all(args.real, args.backtest, args.output, args.tolerance)
+    if not summary.empty:
+        columns = ['ok', 'mismatched', 'extra', 'missed', 'match_rate', 'slippage_mean',
+                   'pts_diff_mean', 'pnl_real', 'pnl_bt']
+        print(summary[columns].to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+"""
+Casamento vetorizado de deals de entrada e saída do MT5 em trades.
+
+Os deals são classificados em uma única passada (flags de comentário
+calculadas sobre as categorias, não sobre cada linha; magic/type/entry
+como inteiros). Entradas e saídas são agrupadas por position_id com uma
+ordenação e somas por segmento (np.add.reduceat), e unidas por busca
+binária no índice ordenado de position_id. Fechamentos parciais (várias
+saídas para a mesma posição) viram um único trade com preço médio de
+saída ponderado pelo volume.
+
+Viradas (DEAL_ENTRY_INOUT, conta netting) fecham a posição aberta e abrem
+a oposta com o volume restante, sem mudar o position_id. Cada virada é
+separada em uma saída da perna atual e uma entrada da perna seguinte
+(split_reversals), e o casamento é feito por (position_id, leg).
+
+Exemplo:
+
+    from trade_matching import match_trades
+
+    trades = match_trades(dfmt5, magic_numbers=[1111, 1212])
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# ENUM_DEAL_ENTRY do MetaTrader5
+DEAL_ENTRY_IN = 0
+DEAL_ENTRY_OUT = 1
+DEAL_ENTRY_INOUT = 2
+DEAL_ENTRY_OUT_BY = 3
+
+TRADE_COLUMNS = ['time_ent', 'type', 'position_id', 'magic', 'price_ent', 'volume', 'posi',
+                 'time_ext', 'price_ext', 'profit', 'comment', 'n_exits', 'volume_ext', 'leg']
+
+# Custos do deal de virada ficam na saída da perna fechada
+DEAL_COST_COLUMNS = ['profit', 'commission', 'swap', 'fee']
+
+
+def split_reversals(deals):
+    """
+    Separa cada virada (DEAL_ENTRY_INOUT) em saída e entrada
+
+    A saída fica com o volume que estava aberto na perna e com o profit do
+    deal; a entrada, no mesmo horário e preço e com o tipo do deal, fica com
+    o volume restante. As viradas são raras, então só as posições que têm
+    uma são percorridas deal a deal.
+
+    Args:
+        deals (pandas.DataFrame): Deals do MT5
+
+    Returns:
+        pandas.DataFrame: Deals com a coluna leg (0 até a primeira virada da posição)
+    """
+    deals = deals.assign(leg=0)
+    if 'entry' not in deals:
+        return deals
+    inout = deals['entry'].to_numpy(dtype=np.int64) == DEAL_ENTRY_INOUT
+    if not inout.any():
+        return deals
+
+    affected = deals['position_id'].isin(deals.loc[inout, 'position_id'].unique()).to_numpy()
+    rows = []
+    for _, group in deals[affected].sort_values('time', kind='stable').groupby('position_id', sort=False):
+        leg, open_volume = 0, 0.0
+        for deal in group.to_dict('records'):
+            if deal['entry'] == DEAL_ENTRY_INOUT:
+                closed = min(open_volume, deal['volume'])
+                rows.append(dict(deal, entry=DEAL_ENTRY_OUT, volume=closed, leg=leg))
+                leg += 1
+                open_volume = deal['volume'] - closed
+                rows.append(dict(deal, entry=DEAL_ENTRY_IN, volume=open_volume, leg=leg,
+                                 **{c: 0.0 for c in DEAL_COST_COLUMNS if c in deal}))
+            else:
+                rows.append(dict(deal, leg=leg))
+                open_volume += deal['volume'] if deal['entry'] == DEAL_ENTRY_IN else -deal['volume']
+
+    split = pd.DataFrame(rows, columns=deals.columns).astype(deals.dtypes.to_dict())
+    return pd.concat([deals[~affected], split], ignore_index=True)
+
+
+def _position_keys(position_id, leg):
+    """
+    Chave ordenável por (position_id, leg)
+
+    Returns:
+        tuple: (chave de cada deal, pares (position_id, leg) de cada chave); sem
+               viradas a chave é o próprio position_id e os pares são None
+    """
+    if not leg.any():
+        return position_id, None
+    pairs, key = np.unique(np.column_stack([position_id, leg]), axis=0, return_inverse=True)
+    return key.reshape(-1).astype(np.int64), pairs
+
+
+def classify_deals(deals):
+    """
+    Classifica os deals em entradas e saídas
+
+    Saída: deal com colchete no comentário ("[sl ...]", "[tp ...]") ou, quando
+    a coluna entry existe, qualquer deal que não seja DEAL_ENTRY_IN. Sem a
+    coluna entry, vale a regra antiga (magic 0 = saída por SL/TP).
+    Entrada: demais deals com magic diferente de 0.
+
+    Args:
+        deals (pandas.DataFrame): Deals do MT5
+
+    Returns:
+        tuple: (is_entry, is_exit) como arrays booleanos
+    """
+    magic = deals['magic'].to_numpy(dtype=np.int64)
+    if 'entry' in deals:
+        is_exit = deals['entry'].to_numpy(dtype=np.int64) != DEAL_ENTRY_IN
+    else:
+        is_exit = magic == 0
+
+    # O comentário só decide nos deals que ainda podem ser entrada
+    candidates = np.flatnonzero(~is_exit & (magic != 0))
+    if len(candidates):
+        comment = deals['comment'].iloc[candidates].fillna('').astype('category')
+        bracket = np.asarray(comment.cat.categories.str.contains('[', regex=False), dtype=bool)
+        is_exit[candidates[bracket[comment.cat.codes.to_numpy()]]] = True
+
+    is_entry = ~is_exit & (magic != 0)
+
+    return is_entry, is_exit
+
+
+def _segments(position_id, time):
+    """
+    Ordena por (position_id, time) e localiza o início de cada posição
+
+    Returns:
+        tuple: (ordem, position_ids únicos, início de cada segmento, fim de cada segmento)
+    """
+    order = np.lexsort((time, position_id))
+    pid = position_id[order]
+    if len(pid) == 0:
+        empty = np.array([], dtype=np.int64)
+        return order, empty, empty, empty
+    starts = np.flatnonzero(np.r_[True, pid[1:] != pid[:-1]])
+    ends = np.r_[starts[1:], len(pid)]
+    return order, pid[starts], starts, ends
+
+
+def _weighted(values, volume, starts):
+    """Média ponderada pelo volume em cada segmento"""
+    total = np.add.reduceat(volume, starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.add.reduceat(values * volume, starts) / total, total
+
+
+def match_trades(deals, magic_numbers=None):
+    """
+    Une entradas e saídas em uma linha por posição
+
+    Args:
+        deals (pandas.DataFrame): Deals do MT5 (time já em datetime)
+        magic_numbers (iterable): Magics a manter (padrão: todos com magic != 0)
+
+    Returns:
+        pandas.DataFrame: Colunas de TRADE_COLUMNS (+ symbol, se existir), ordenadas
+                          por time_ent; posições sem saída ficam com NaN/NaT na saída.
+                          Posições viradas geram um trade por perna (leg 0, 1, ...)
+    """
+    if deals.empty:
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+
+    deals = split_reversals(deals)
+    is_entry, is_exit = classify_deals(deals)
+    if magic_numbers is not None:
+        is_entry &= np.isin(deals['magic'].to_numpy(dtype=np.int64), np.fromiter(magic_numbers, dtype=np.int64))
+
+    if not is_entry.any():
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+
+    position_key, pairs = _position_keys(deals['position_id'].to_numpy(dtype=np.int64),
+                                         deals['leg'].to_numpy(dtype=np.int64))
+    time = deals['time'].to_numpy()
+    price = deals['price'].to_numpy(dtype=float)
+    volume = deals['volume'].to_numpy(dtype=float)
+
+    # Entradas: uma por posição (aumentos de posição entram no preço médio)
+    ent = np.flatnonzero(is_entry)
+    order, ent_pid, starts, _ = _segments(position_key[ent], time[ent])
+    rows = ent[order]
+    price_ent, volume_ent = _weighted(price[rows], volume[rows], starts)
+    first = rows[starts]
+    if pairs is None:
+        ent_position_id, ent_leg = ent_pid, 0
+    else:
+        ent_position_id, ent_leg = pairs[ent_pid, 0], pairs[ent_pid, 1]
+
+    trades = pd.DataFrame({
+        'time_ent': time[first],
+        'type': deals['type'].to_numpy(dtype=np.int64)[first],
+        'position_id': ent_position_id,
+        'magic': deals['magic'].to_numpy(dtype=np.int64)[first],
+        'price_ent': price_ent,
+        'volume': volume_ent
+    })
+    trades['posi'] = np.select([trades['type'] == 0, trades['type'] == 1], ['long', 'short'], None)
+
+    # Saídas: todas as da posição (fechamentos parciais) viram uma só
+    ext = np.flatnonzero(is_exit)
+    order, ext_pid, starts, ends = _segments(position_key[ext], time[ext])
+    rows = ext[order]
+
+    n = len(trades)
+    time_ext = np.full(n, np.datetime64('NaT'), dtype=time.dtype)
+    price_ext = np.full(n, np.nan)
+    profit = np.full(n, np.nan)
+    volume_ext = np.zeros(n)
+    n_exits = np.zeros(n, dtype=np.int64)
+    comment = np.full(n, None, dtype=object)
+
+    if len(rows):
+        ext_price, ext_volume = _weighted(price[rows], volume[rows], starts)
+        ext_profit = np.add.reduceat(deals['profit'].to_numpy(dtype=float)[rows], starts)
+        last = rows[ends - 1]
+
+        # Busca binária das posições de entrada no índice ordenado de saídas
+        idx = np.searchsorted(ext_pid, ent_pid)
+        idx_clip = np.minimum(idx, len(ext_pid) - 1)
+        found = (idx < len(ext_pid)) & (ext_pid[idx_clip] == ent_pid)
+        src = idx_clip[found]
+
+        time_ext[found] = time[last][src]
+        price_ext[found] = ext_price[src]
+        profit[found] = ext_profit[src]
+        volume_ext[found] = ext_volume[src]
+        n_exits[found] = (ends - starts)[src]
+        comment[found] = deals['comment'].to_numpy(dtype=object)[last][src]
+
+    trades['time_ext'] = time_ext
+    trades['price_ext'] = price_ext
+    trades['profit'] = profit
+    trades['comment'] = comment
+    trades['n_exits'] = n_exits
+    trades['volume_ext'] = volume_ext
+    trades['leg'] = ent_leg
+
+    if 'symbol' in deals:
+        trades['symbol'] = deals['symbol'].to_numpy(dtype=object)[first]
+
+    return trades.sort_values(['time_ent', 'position_id'], kind='stable').reset_index(drop=True)
@@ -0,0 +1,104 @@
+"""
+Estado persistido dos candles do host de deploy.
+
+As funções de entrada (entries.py) recalculam os indicadores (RSI, Bollinger,
+MACD, médias de volume) sobre o DataFrame de candles fechados; o estado que
+importa para o próximo sinal é, portanto, o buffer com os últimos candles de
+cada símbolo/timeframe. O host mantém esse buffer em memória, grava um
+snapshot em disco a cada fechamento e, ao reiniciar, restaura o snapshot e
+busca no MT5 só os candles que faltam, validando a continuidade na
+sobreposição (mesmos OHLC nos candles em comum). Sem continuidade, o
+snapshot é descartado e o histórico completo é buscado.
+
+Exemplo:
+
+    store = BarStateStore('state')
+    store.save(('WINQ25', 't5'), df)
+    df = store.load(('WINQ25', 't5'))
+"""
+
+import os
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+
+
+def merge_bars(buffer, new):
+    """
+    Acrescenta candles novos ao buffer se houver continuidade
+
+    Continuidade: os candles novos começam dentro do buffer (há sobreposição)
+    e os candles em comum têm os mesmos OHLC.
+
+    Args:
+        buffer (pandas.DataFrame): Candles já conhecidos
+        new (pandas.DataFrame): Candles recém-buscados (terminando no último fechado)
+
+    Returns:
+        pandas.DataFrame: Buffer atualizado, ou None se não houver continuidade
+    """
+    if buffer is None or buffer.empty or new.empty:
+        return None
+
+    # Sobreposição = final do buffer a partir do primeiro candle novo (comparação posicional)
+    start = buffer.index.searchsorted(new.index[0])
+    overlap = len(buffer) - start
+    if overlap <= 0 or overlap > len(new) or not buffer.index[start:].equals(new.index[:overlap]):
+        return None
+
+    for column in PRICE_COLUMNS:
+        old = buffer[column].to_numpy(dtype=float)[start:]
+        fresh = new[column].to_numpy(dtype=float)[:overlap]
+        if not (np.abs(old - fresh) <= 1e-9).all():
+            return None
+
+    return pd.concat([buffer.iloc[:start], new])
+
+
+class BarStateStore:
+    """
+    Snapshots do buffer de candles por símbolo/timeframe
+
+    Args:
+        base_dir (str): Pasta dos snapshots (um arquivo por símbolo/timeframe)
+    """
+
+    def __init__(self, base_dir='state'):
+        self.base_dir = base_dir
+
+    def path(self, key):
+        symbol, timeframe = key
+        return os.path.join(self.base_dir, f"bars_{symbol}_{timeframe}.pkl")
+
+    def save(self, key, bars):
+        """Grava o snapshot de forma atômica (arquivo temporário + rename)"""
+        os.makedirs(self.base_dir, exist_ok=True)
+        path = self.path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'bars': bars, 'saved_at': datetime.now()}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def load(self, key):
+        """
+        Lê o snapshot de um símbolo/timeframe
+
+        Returns:
+            pandas.DataFrame: Candles salvos, ou None se não houver snapshot válido
+        """
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+        except Exception as e:
+            print(f"Snapshot inválido em {path}: {e}")
+            return None
+        bars = state.get('bars')
+        return bars if isinstance(bars, pd.DataFrame) and not bars.empty else None
@@ -0,0 +1,233 @@
+"""
+Acesso ao MT5 usado pelo host de deploy: candles fechados e envio de ordens.
+
+O módulo MetaTrader5 é importado só quando necessário (ou recebido pronto),
+para que o host possa rodar com feeds e brokers locais em testes e replays.
+"""
+
+import os
+import time
+
+import pandas as pd
+
+
+# Timeframe do factory -> (constante do MetaTrader5, minutos)
+TIMEFRAMES = {
+    't1': ('TIMEFRAME_M1', 1), 't2': ('TIMEFRAME_M2', 2), 't5': ('TIMEFRAME_M5', 5),
+    't10': ('TIMEFRAME_M10', 10), 't15': ('TIMEFRAME_M15', 15), 't30': ('TIMEFRAME_M30', 30),
+    'h1': ('TIMEFRAME_H1', 60), 'h4': ('TIMEFRAME_H4', 240), 'd1': ('TIMEFRAME_D1', 1440),
+}
+
+
+def timeframe_minutes(timeframe):
+    """Duração do candle em minutos"""
+    return TIMEFRAMES[timeframe.lower()][1]
+
+
+def load_mt5(mt5_module=None):
+    """Retorna o módulo MetaTrader5 (ou o substituto recebido)"""
+    if mt5_module is not None:
+        return mt5_module
+    import MetaTrader5
+    return MetaTrader5
+
+
+def get_mt5_credentials():
+    """Carrega credenciais do MT5 do arquivo .env"""
+    from dotenv import load_dotenv
+    load_dotenv()
+    return {
+        'login': int(os.getenv('MT5_LOGIN', 0)),
+        'password': os.getenv('MT5_PASSWORD', ''),
+        'server': os.getenv('MT5_SERVER', ''),
+        'path': os.getenv('MT5_PATH', r"C:\Program Files\MetaTrader 5\terminal64.exe")
+    }
+
+
+def connect_mt5(mt5, config=None):
+    """Estabelece conexão com MT5"""
+    if config is None:
+        config = get_mt5_credentials()
+
+    if not config['login'] or not config['password'] or not config['server']:
+        print("Erro: Credenciais do MT5 não encontradas no arquivo .env")
+        return False
+
+    if not mt5.initialize(login=config['login'], server=config['server'],
+                          password=config['password'], path=config['path']):
+        print("initialize() failed, error code =", mt5.last_error())
+        return False
+
+    print('Ligado ao MT5 com sucesso!')
+    print(f'Conta: {config["login"]} | Servidor: {config["server"]}')
+    return True
+
+
+def rates_to_frame(rates):
+    """
+    Converte o array de copy_rates_* em DataFrame no formato do backtest
+
+    Returns:
+        pandas.DataFrame: Índice time, colunas open/high/low/close/tick_volume/volume
+    """
+    df = pd.DataFrame(rates)
+    df['time'] = pd.to_datetime(df['time'], unit='s')
+    df = df.set_index('time')
+    if 'real_volume' in df:
+        df = df.rename(columns={'real_volume': 'volume'})
+    elif 'tick_volume' in df:
+        df['volume'] = df['tick_volume']
+    return df[[c for c in ['open', 'high', 'low', 'close', 'tick_volume', 'volume'] if c in df]]
+
+
+class MT5Feed:
+    """
+    Candles fechados do MT5
+
+    Args:
+        mt5_module: Módulo MetaTrader5 (padrão: importa o real)
+    """
+
+    def __init__(self, mt5_module=None):
+        self.mt5 = load_mt5(mt5_module)
+
+    def _timeframe(self, timeframe):
+        return getattr(self.mt5, TIMEFRAMES[timeframe.lower()][0])
+
+    def last_closed_time(self, symbol, timeframe):
+        """Horário (abertura) do último candle fechado, ou None"""
+        rates = self.mt5.copy_rates_from_pos(symbol, self._timeframe(timeframe), 1, 1)
+        if rates is None or len(rates) == 0:
+            return None
+        return pd.Timestamp(int(rates[0]['time']), unit='s')
+
+    def bars(self, symbol, timeframe, count):
+        """
+        Últimos count candles fechados (o candle em formação é ignorado)
+
+        Returns:
+            pandas.DataFrame: Candles (vazio se o MT5 não retornar dados)
+        """
+        rates = self.mt5.copy_rates_from_pos(symbol, self._timeframe(timeframe), 1, count)
+        if rates is None or len(rates) == 0:
+            return pd.DataFrame()
+        return rates_to_frame(rates)
+
+
+class MT5Broker:
+    """
+    Envio de ordens a mercado com TP/SL e magic number
+
+    Args:
+        mt5_module: Módulo MetaTrader5 (padrão: importa o real)
+        deviation (int): Desvio máximo de preço aceito (em pontos)
+    """
+
+    def __init__(self, mt5_module=None, deviation=10):
+        self.mt5 = load_mt5(mt5_module)
+        self.deviation = deviation
+
+    def has_position(self, symbol, magic):
+        """Verifica se o magic já tem posição aberta ou ordem trabalhando no símbolo"""
+        exposure = self.exposure(symbol, magic)
+        return exposure['position_volume'] > 0 or exposure['working_volume'] > 0
+
+    def exposure(self, symbol, magic):
+        """
+        Posição e ordens pendentes do magic no símbolo (reconciliação de envios)
+
+        Returns:
+            dict: position_volume (soma das posições) e working_volume (volume ainda
+                  não executado das ordens abertas)
+        """
+        positions = [p for p in self.mt5.positions_get(symbol=symbol) or () if p.magic == magic]
+        orders = [o for o in self.mt5.orders_get(symbol=symbol) or () if o.magic == magic]
+        return {'position_volume': float(sum(p.volume for p in positions)),
+                'working_volume': float(sum(o.volume_current for o in orders))}
+
+    def _round_price(self, symbol, price):
+        info = self.mt5.symbol_info(symbol)
+        tick = getattr(info, 'trade_tick_size', 0) if info is not None else 0
+        return round(round(price / tick) * tick, 10) if tick else price
+
+    def send_market(self, symbol, direction, volume, tp, sl, magic, comment=''):
+        """
+        Envia ordem a mercado
+
+        Args:
+            symbol (str): Símbolo (ex: WINQ25)
+            direction (int): 1 = compra, -1 = venda
+            volume (float): Lotes
+            tp (float): Take profit em pontos de preço (0 = sem TP)
+            sl (float): Stop loss em pontos de preço (0 = sem SL)
+            magic (int): Magic number da estratégia
+            comment (str): Comentário (sem colchetes, que marcam saídas no monitor)
+
+        Returns:
+            dict: ok, retcode, order, price, volume, comment, build_s (cotação + request)
+                  e send_s (order_send), em segundos
+        """
+        mt5 = self.mt5
+        start = time.perf_counter()
+        tick = mt5.symbol_info_tick(symbol)
+        if tick is None:
+            return {'ok': False, 'retcode': None, 'order': None, 'price': None, 'volume': 0.0,
+                    'comment': f"sem cotação para {symbol}",
+                    'build_s': time.perf_counter() - start, 'send_s': None}
+
+        price = tick.ask if direction > 0 else tick.bid
+        request = {
+            'action': mt5.TRADE_ACTION_DEAL,
+            'symbol': symbol,
+            'volume': float(volume),
+            'type': mt5.ORDER_TYPE_BUY if direction > 0 else mt5.ORDER_TYPE_SELL,
+            'price': price,
+            'deviation': self.deviation,
+            'magic': int(magic),
+            'comment': comment[:31],
+            'type_time': mt5.ORDER_TIME_GTC,
+            'type_filling': mt5.ORDER_FILLING_RETURN,
+        }
+        if sl:
+            request['sl'] = self._round_price(symbol, price - direction * sl)
+        if tp:
+            request['tp'] = self._round_price(symbol, price + direction * tp)
+
+        sent = time.perf_counter()
+        result = mt5.order_send(request)
+        timings = {'build_s': sent - start, 'send_s': time.perf_counter() - sent}
+        if result is None:
+            return {'ok': False, 'retcode': None, 'order': None, 'price': price, 'volume': 0.0,
+                    'comment': str(mt5.last_error()), **timings}
+
+        return {'ok': result.retcode == mt5.TRADE_RETCODE_DONE, 'retcode': result.retcode,
+                'order': result.order, 'price': result.price or price, 'volume': result.volume,
+                'comment': result.comment, **timings}
+
+    def close_positions(self, symbol, magic, comment='daytrade'):
+        """Cancela as ordens trabalhando e fecha a mercado as posições do magic no símbolo"""
+        mt5 = self.mt5
+        results = []
+        # Restos de execuções parciais (ORDER_FILLING_RETURN) não podem abrir posição depois do fechamento
+        for order in self.mt5.orders_get(symbol=symbol) or ():
+            if order.magic == magic:
+                results.append(mt5.order_send({'action': mt5.TRADE_ACTION_REMOVE, 'order': order.ticket}))
+        for position in self.mt5.positions_get(symbol=symbol) or ():
+            if position.magic != magic:
+                continue
+            buy = position.type == mt5.POSITION_TYPE_SELL
+            tick = mt5.symbol_info_tick(symbol)
+            results.append(mt5.order_send({
+                'action': mt5.TRADE_ACTION_DEAL,
+                'symbol': symbol,
+                'volume': position.volume,
+                'type': mt5.ORDER_TYPE_BUY if buy else mt5.ORDER_TYPE_SELL,
+                'position': position.ticket,
+                'price': tick.ask if buy else tick.bid,
+                'deviation': self.deviation,
+                'magic': int(magic),
+                'comment': comment,
+                'type_time': mt5.ORDER_TIME_GTC,
+                'type_filling': mt5.ORDER_FILLING_RETURN,
+            }))
+        return results
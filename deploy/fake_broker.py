@@ -0,0 +1,158 @@
+"""
+Broker local para testar o envio de ordens sem MT5.
+
+Simula a latência do order_send, requotes e execuções parciais, com a mesma
+interface do MT5Broker (has_position, send_market, close_positions), e pode
+ser chamado de várias threads.
+
+O main compara o envio síncrono com o OrderRouter para N sinais no mesmo
+candle:
+
+    python fake_broker.py --orders 5 --latency 0.05 --inflight 1 2 4
+"""
+
+import time
+import argparse
+import threading
+
+import numpy as np
+import pandas as pd
+
+from latency import LatencyTracker
+from order_router import (OrderRouter, RETCODE_DONE, RETCODE_DONE_PARTIAL, RETCODE_REQUOTE,
+                          RETCODE_TOO_MANY_REQUESTS)
+
+
+class FakeBroker:
+    """
+    Broker simulado
+
+    Args:
+        latency (float): Duração média do order_send (segundos)
+        jitter (float): Variação uniforme da latência (segundos)
+        requote_prob (float): Probabilidade de requote por envio
+        partial_prob (float): Probabilidade de execução parcial (metade do volume; o restante
+                              fica como ordem trabalhando, como com ORDER_FILLING_RETURN)
+        no_reply_prob (float): Probabilidade de executar a ordem e perder a resposta (retcode None)
+        max_concurrent (int): Envios simultâneos aceitos; acima disso responde "too many requests"
+        seed (int): Semente
+    """
+
+    def __init__(self, latency=0.02, jitter=0.0, requote_prob=0.0, partial_prob=0.0, no_reply_prob=0.0,
+                 max_concurrent=None, seed=42):
+        self.latency = latency
+        self.jitter = jitter
+        self.requote_prob = requote_prob
+        self.partial_prob = partial_prob
+        self.no_reply_prob = no_reply_prob
+        self.max_concurrent = max_concurrent
+        self.rng = np.random.default_rng(seed)
+        self.positions = {}
+        self.working = {}
+        self.sends = []
+        self._inflight = 0
+        self._ticket = 0
+        self._lock = threading.Lock()
+
+    def has_position(self, symbol, magic):
+        with self._lock:
+            return (symbol, magic) in self.positions or (symbol, magic) in self.working
+
+    def exposure(self, symbol, magic):
+        with self._lock:
+            return {'position_volume': abs(self.positions.get((symbol, magic), 0.0)),
+                    'working_volume': self.working.get((symbol, magic), 0.0)}
+
+    def send_market(self, symbol, direction, volume, tp, sl, magic, comment=''):
+        start = time.perf_counter()
+        with self._lock:
+            self._inflight += 1
+            inflight = self._inflight
+            self._ticket += 1
+            ticket = self._ticket
+            draw = self.rng.random(3)
+            delay = self.latency + self.jitter * self.rng.uniform(-1, 1)
+        build = time.perf_counter() - start
+
+        try:
+            time.sleep(max(delay, 0))
+            if self.max_concurrent and inflight > self.max_concurrent:
+                retcode, executed = RETCODE_TOO_MANY_REQUESTS, 0.0
+            elif draw[0] < self.requote_prob:
+                retcode, executed = RETCODE_REQUOTE, 0.0
+            elif draw[1] < self.partial_prob and volume > 1:
+                retcode, executed = RETCODE_DONE_PARTIAL, float(np.floor(volume / 2))
+            else:
+                retcode, executed = RETCODE_DONE, float(volume)
+
+            with self._lock:
+                if executed:
+                    self.positions[(symbol, magic)] = self.positions.get((symbol, magic), 0.0) + direction * executed
+                if retcode == RETCODE_DONE_PARTIAL:
+                    self.working[(symbol, magic)] = float(volume) - executed
+                self.sends.append({'magic': magic, 'volume': volume, 'executed': executed, 'retcode': retcode,
+                                   'inflight': inflight})
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+        if retcode == RETCODE_DONE and draw[2] < self.no_reply_prob:
+            return {'ok': False, 'retcode': None, 'order': None, 'price': 100.0, 'volume': 0.0,
+                    'comment': 'sem resposta', 'build_s': build, 'send_s': time.perf_counter() - start - build}
+        return {'ok': retcode == RETCODE_DONE, 'retcode': retcode, 'order': ticket, 'price': 100.0,
+                'volume': executed, 'comment': comment, 'build_s': build,
+                'send_s': time.perf_counter() - start - build}
+
+    def close_positions(self, symbol, magic, comment='daytrade'):
+        with self._lock:
+            self.positions.pop((symbol, magic), None)
+            self.working.pop((symbol, magic), None)
+        return []
+
+
+def benchmark(n_orders, latency, inflight, requote_prob=0.0, partial_prob=0.0, volume=2.0):
+    """
+    Tempo para enviar n_orders sinais do mesmo candle
+
+    Args:
+        inflight (int): Envios simultâneos do OrderRouter (0 = síncrono)
+
+    Returns:
+        dict: inflight, seconds, última ordem concluída (ms), queue p99 (ms), tentativas
+    """
+    broker = FakeBroker(latency=latency, requote_prob=requote_prob, partial_prob=partial_prob)
+    requests = [{'symbol': 'WIN', 'direction': 1, 'volume': volume, 'tp': 100, 'sl': 100, 'magic': m}
+                for m in range(n_orders)]
+
+    tracker = LatencyTracker()
+    start = time.perf_counter()
+    router = OrderRouter(broker, max_inflight=inflight, max_queue=max(n_orders, 1), latency=tracker, retry_delay=0.0)
+    for request in requests:
+        router.submit(request)
+    router.close()
+    seconds = time.perf_counter() - start
+    records = router.completed
+
+    queue = tracker.percentiles().loc['queue']
+    return {'inflight': inflight if inflight else 'sync', 'seconds': seconds, 'last_order_ms': seconds * 1000,
+            'queue_p99_ms': queue.get('p99', np.nan), 'filled': sum(r['ok'] for r in records),
+            'attempts': sum(r['attempts'] for r in records)}
+
+
+def main():
+    """Compara envio síncrono e OrderRouter no broker simulado"""
+    parser = argparse.ArgumentParser(description='Envio de ordens no broker simulado')
+    parser.add_argument('--orders', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--inflight', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--requote-prob', type=float, default=0.0)
+    parser.add_argument('--partial-prob', type=float, default=0.0)
+    args = parser.parse_args()
+
+    rows = [benchmark(args.orders, args.latency, 0, args.requote_prob, args.partial_prob)]
+    rows += [benchmark(args.orders, args.latency, n, args.requote_prob, args.partial_prob) for n in args.inflight]
+    print(pd.DataFrame(rows).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
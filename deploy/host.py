@@ -0,0 +1,444 @@
+"""
+Host de deploy multi-estratégia em um único processo.
+
+Em vez de um processo por combined_strategy (script_deploy_1.py ...
+script_deploy_5.py), o host carrega todos os JSONs de selected/, busca os
+candles uma única vez por símbolo/timeframe a cada fechamento de candle,
+avalia todas as estratégias sobre o mesmo DataFrame e envia as ordens
+roteadas pelo magic number de cada estratégia.
+
+A semântica segue o backtest: o sinal é calculado com os candles fechados
+e os parâmetros da hora do último candle (hour_params); com sinal, a
+ordem a mercado sai com o TP/SL da hora. Cada magic tem no máximo uma
+posição aberta por vez.
+
+Cada fluxo mantém um buffer com os últimos history_bars candles; a cada
+fechamento só os candles novos são buscados, e o buffer é gravado em disco
+(bar_state.py) para que um reinício fique pronto já no primeiro candle.
+
+Exemplo (script_deploy_host.py, rodando em deploy/):
+
+    from host import deploy_host
+    deploy_host("../selected/combined_strategy_*.json", strategies_file="entries.py")
+"""
+
+import os
+import sys
+import glob
+import time
+import importlib.util
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.strategy_plan import load_plans
+
+from brokers import MT5Feed, MT5Broker, load_mt5, connect_mt5, timeframe_minutes
+from latency import LatencyTracker
+from bar_state import BarStateStore, merge_bars
+from tick_feed import TickBarFeed
+from order_router import OrderRouter
+
+
+def load_strategies_module(strategies_file):
+    """Importa o arquivo de estratégias (entries.py) pelo caminho"""
+    spec = importlib.util.spec_from_file_location('deploy_entries', strategies_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class LiveStrategy:
+    """
+    Uma combined_strategy em execução
+
+    Args:
+        plan (StrategyPlan): Plano compilado, com a função de entrada resolvida
+    """
+
+    def __init__(self, plan):
+        if plan.magic_number is None:
+            raise ValueError(f"{plan.path}: magic_number obrigatório no deploy")
+
+        self.plan = plan
+        self.path = plan.path
+        self.name = plan.name
+        self.signal_function = plan.signal_function
+
+        self.symbol = plan.symbol
+        self.timeframe = plan.timeframe
+        self.strategy = plan.strategy
+        self.magic_number = plan.magic_number
+        self.lote = plan.lote if plan.lote is not None else 1.0
+        self.daytrade = plan.daytrade if plan.daytrade is not None else True
+        self.hours = list(plan.hours)
+
+        # Hora -> (tp, sl, argumentos do sinal); horas do mesmo grupo dividem os argumentos
+        self.hour_params = {}
+        for group in plan.groups:
+            signal_args = group.signal_args()
+            for hour in group.hours:
+                self.hour_params[hour] = (group.tp, group.sl, signal_args)
+
+    def signal(self, df):
+        """
+        Sinal no último candle fechado
+
+        Returns:
+            tuple: (direção, hora, tp, sl); direção 0 sem sinal ou fora das horas
+        """
+        hour = df.index[-1].hour
+        if hour not in self.hour_params:
+            return 0, hour, None, None
+
+        tp, sl, signal_args = self.hour_params[hour]
+        position = self.signal_function(df, **signal_args)
+        return int(position.iloc[-1]), hour, tp, sl
+
+
+def load_live_strategies(strategy_files, strategies_file='entries.py'):
+    """
+    Compila as combined_strategies e resolve as funções de entrada
+
+    Raises:
+        ValueError: Se algum JSON for inválido ou dois arquivos usarem o mesmo magic number
+    """
+    module = load_strategies_module(strategies_file)
+    return [LiveStrategy(plan) for plan in load_plans(strategy_files, module)]
+
+
+class StrategyHost:
+    """
+    Avalia várias estratégias sobre um único fluxo de candles por símbolo/timeframe
+
+    Args:
+        strategies (list): LiveStrategy carregadas
+        feed: Fonte de candles (MT5Feed ou equivalente)
+        broker: Envio de ordens (MT5Broker ou equivalente)
+        history_bars (int): Candles mantidos no buffer de cada fluxo (aquecimento dos indicadores)
+        daytrade_close (str): Horário (HH:MM) a partir do qual posições daytrade são fechadas
+        latency (LatencyTracker): Medição de latência por etapa (padrão: só em memória)
+        state_dir (str): Pasta dos snapshots do buffer de candles (None = sem persistência)
+        overlap_bars (int): Candles já conhecidos rebuscados para validar a continuidade
+        router (OrderRouter): Envio assíncrono das ordens (None = envio no loop das estratégias)
+    """
+
+    def __init__(self, strategies, feed, broker, history_bars=300, daytrade_close='18:20', latency=None,
+                 state_dir=None, overlap_bars=3, router=None):
+        self.feed = feed
+        self.broker = broker
+        self.history_bars = history_bars
+        self.overlap_bars = overlap_bars
+        self.state = BarStateStore(state_dir) if state_dir else None
+        self.latency = latency or LatencyTracker()
+        self.daytrade_close = pd.Timestamp(daytrade_close).time() if daytrade_close else None
+
+        # (símbolo, timeframe) -> estratégias; magic -> estratégia (roteamento)
+        self.groups = {}
+        self.by_magic = {}
+        for strategy in strategies:
+            self.groups.setdefault((strategy.symbol, strategy.timeframe), []).append(strategy)
+            self.by_magic[strategy.magic_number] = strategy
+
+        # (símbolo, timeframe) -> hora -> estratégias que operam nessa hora
+        self.dispatch = {}
+        for key, group in self.groups.items():
+            table = self.dispatch.setdefault(key, {})
+            for strategy in group:
+                for hour in strategy.hour_params:
+                    table.setdefault(hour, []).append(strategy)
+
+        self.last_bar = {key: None for key in self.groups}
+        self.buffers = {key: None for key in self.groups}
+        self.orders = []
+        self.skipped = []
+
+        self.router = router
+        if router is not None:
+            router.latency = router.latency or self.latency
+            router.on_done = router.on_done or self._order_done
+
+    def route(self, magic, direction, tp, sl, bar_time, hour, closed_at=None):
+        """
+        Envia a ordem de um sinal para o broker, identificada pelo magic
+
+        Com router, o pedido vai para a fila e o registro da ordem é feito ao
+        fim do envio (_order_done).
+
+        Args:
+            closed_at (float): Fechamento do candle (time.time()); mede a latência total
+
+        Returns:
+            dict: Ordem enviada (ou pedido enfileirado); None se ignorada
+        """
+        strategy = self.by_magic[magic]
+        pending = self.router is not None and self.router.is_pending(magic)
+        if pending or self.broker.has_position(strategy.symbol, magic):
+            reason = 'ordem pendente' if pending else 'posição aberta'
+            print(f"[{strategy.name}] sinal {direction:+d} ignorado: {reason} (magic {magic})")
+            self.skipped.append({'bar_time': bar_time, 'magic': magic, 'direction': direction})
+            return None
+
+        request = {'bar_time': bar_time, 'magic': magic, 'symbol': strategy.symbol,
+                   'strategy': strategy.strategy, 'hour': hour, 'direction': direction,
+                   'volume': strategy.lote, 'tp': tp, 'sl': sl, 'comment': f"{strategy.strategy} h{hour}",
+                   'closed_at': closed_at}
+        if self.router is not None:
+            return request if self.router.submit(request) else None
+
+        result = self.broker.send_market(strategy.symbol, direction, strategy.lote, tp, sl, magic,
+                                         comment=request['comment'])
+        self.latency.record('build', result.get('build_s'))
+        self.latency.record('send', result.get('send_s'))
+        if closed_at is not None:
+            result['latency_s'] = time.time() - closed_at
+            self.latency.record('total', result['latency_s'])
+        return self._order_done({**request, **result})
+
+    def _order_done(self, order):
+        """Registra e mostra uma ordem concluída (chamado também pelas threads do router)"""
+        order = dict(order, sent_at=datetime.now())
+        self.orders.append(order)
+        strategy = self.by_magic[order['magic']]
+        status = 'OK' if order['ok'] else f"ERRO {order['retcode']} {order['comment']}"
+        print(f"[{strategy.name}] {order['bar_time']} ordem {order['direction']:+d} {order['symbol']} "
+              f"tp={order['tp']} sl={order['sl']} magic={order['magic']}: {status}")
+        return order
+
+    def on_bar(self, key, df, closed_at=None):
+        """
+        Avalia as estratégias de um símbolo/timeframe ativas na hora do candle fechado
+
+        Só as estratégias da tabela de despacho da hora calculam sinal; fora das
+        horas ativas o candle apenas atualiza o buffer (e o fechamento daytrade).
+
+        Args:
+            key (tuple): (símbolo, timeframe)
+            df (pandas.DataFrame): Candles fechados (último = candle que acabou de fechar)
+            closed_at (float): Fechamento do candle (time.time()), se conhecido
+
+        Returns:
+            list: Ordens enviadas
+        """
+        bar_time = df.index[-1]
+        closed = set()
+        if self.daytrade_close and bar_time.time() >= self.daytrade_close:
+            closed = {s.magic_number for s in self.groups[key] if self._daytrade_closed(s, bar_time)}
+
+        sent = []
+        for strategy in self.dispatch[key].get(bar_time.hour, ()):
+            if strategy.magic_number in closed:
+                continue
+            start = time.perf_counter()
+            try:
+                direction, hour, tp, sl = strategy.signal(df)
+            except Exception as e:
+                print(f"[{strategy.name}] erro no sinal: {e}")
+                continue
+            self.latency.record('signal', time.perf_counter() - start)
+            if direction != 0:
+                order = self.route(strategy.magic_number, direction, tp, sl, bar_time, hour, closed_at)
+                if order is not None:
+                    sent.append(order)
+        return sent
+
+    def _daytrade_closed(self, strategy, bar_time):
+        """Fecha posições daytrade após o horário limite (e bloqueia novas entradas)"""
+        if not (strategy.daytrade and self.daytrade_close):
+            return False
+        if bar_time.time() < self.daytrade_close:
+            return False
+        if self.broker.has_position(strategy.symbol, strategy.magic_number):
+            self.broker.close_positions(strategy.symbol, strategy.magic_number)
+            print(f"[{strategy.name}] posição daytrade encerrada às {bar_time}")
+        return True
+
+    def refresh_bars(self, key, last):
+        """
+        Atualiza o buffer de candles até o último candle fechado
+
+        Com buffer, busca só os candles que faltam (mais overlap_bars para
+        validar a continuidade); sem buffer ou sem continuidade, busca o
+        histórico completo.
+
+        Args:
+            key (tuple): (símbolo, timeframe)
+            last (pandas.Timestamp): Último candle fechado no MT5
+
+        Returns:
+            pandas.DataFrame: Buffer atualizado (vazio se o MT5 não retornar dados)
+        """
+        symbol, timeframe = key
+        buffer = self.buffers[key]
+
+        count = self.history_bars
+        if buffer is not None:
+            missing = int((last - buffer.index[-1]) / pd.Timedelta(minutes=timeframe_minutes(timeframe)))
+            count = min(self.history_bars, max(missing, 0) + self.overlap_bars)
+
+        df = self.feed.bars(symbol, timeframe, count)
+        if count < self.history_bars and not df.empty:
+            merged = merge_bars(buffer, df)
+            if merged is None:
+                print(f"[{symbol} {timeframe}] candles sem continuidade com o buffer; buscando histórico completo")
+                df = self.feed.bars(symbol, timeframe, self.history_bars)
+            else:
+                df = merged
+
+        df = df.iloc[-self.history_bars:]
+        self.buffers[key] = df if not df.empty else None
+        return df
+
+    def restore_state(self):
+        """
+        Restaura os snapshots e completa os buffers com os candles que faltam
+
+        Chamado na partida do host: com snapshot contínuo, só os candles desde
+        o último snapshot são buscados e o primeiro candle já tem sinal válido.
+        """
+        for key in self.groups:
+            symbol, timeframe = key
+            if self.state is not None:
+                self.buffers[key] = self.state.load(key)
+
+            last = self.feed.last_closed_time(symbol, timeframe)
+            if last is None:
+                continue
+            snapshot = self.buffers[key]
+            self.refresh_bars(key, last)
+            self.last_bar[key] = last
+            if snapshot is not None:
+                print(f"  {symbol} {timeframe}: snapshot até {snapshot.index[-1]} restaurado")
+
+    def poll_group(self, key, closed_at=None):
+        """
+        Processa o candle recém-fechado de um símbolo/timeframe, se houver
+
+        Args:
+            key (tuple): (símbolo, timeframe)
+            closed_at (float): Fechamento do candle no relógio local (time.time());
+                               None quando desconhecido (sem latência de chegada/total)
+
+        Returns:
+            bool: True se havia candle novo
+        """
+        symbol, timeframe = key
+        last = self.feed.last_closed_time(symbol, timeframe)
+        if last is None or last == self.last_bar[key]:
+            return False
+        if closed_at is not None:
+            self.latency.record('arrival', time.time() - closed_at)
+
+        start = time.perf_counter()
+        df = self.refresh_bars(key, last)
+        if df.empty:
+            return False
+        self.latency.record('fetch', time.perf_counter() - start)
+        self.last_bar[key] = df.index[-1]
+        # As funções de entrada acrescentam colunas ao DataFrame; o buffer fica limpo
+        self.on_bar(key, df.copy(), closed_at)
+
+        if self.state is not None:
+            self.state.save(key, df)
+        return True
+
+    def poll(self):
+        """Verifica todos os símbolos/timeframes; retorna quantos tinham candle novo"""
+        return sum(self.poll_group(key) for key in self.groups)
+
+    def seconds_to_next_close(self, now=None):
+        """Segundos até o próximo fechamento de candle entre os timeframes do host"""
+        now = now or datetime.now()
+        seconds = now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1e6
+        return min(timeframe_minutes(tf) * 60 - seconds % (timeframe_minutes(tf) * 60)
+                   for _, tf in self.groups)
+
+    def due_groups(self, now=None):
+        """Símbolos/timeframes cujo candle fecha neste minuto"""
+        now = now or datetime.now()
+        minutes = now.hour * 60 + now.minute
+        return [key for key in self.groups if minutes % timeframe_minutes(key[1]) == 0]
+
+    def run(self, poll_interval=0.25, bar_timeout=30, max_bars=None):
+        """
+        Loop principal: dorme até o fechamento e faz polling até o candle novo chegar
+
+        Args:
+            poll_interval (float): Intervalo de polling após o fechamento (segundos)
+            bar_timeout (float): Desiste do candle se ele não chegar nesse tempo (mercado fechado)
+            max_bars (int): Encerra após N candles processados (None = indefinidamente)
+        """
+        print(f"Host iniciado com {len(self.by_magic)} estratégias em {len(self.groups)} fluxos de candles:")
+        for (symbol, timeframe), strategies in self.groups.items():
+            print(f"  {symbol} {timeframe}: {', '.join(s.name for s in strategies)}")
+            hours = sorted(self.dispatch[(symbol, timeframe)])
+            print(f"    horas ativas: {', '.join(f'{h}h' for h in hours)}")
+
+        # Restaura/aquece os buffers e marca os candles já fechados para só reagir aos próximos
+        self.restore_state()
+
+        bars = 0
+        while max_bars is None or bars < max_bars:
+            wait = self.seconds_to_next_close()
+            closed_at = time.time() + wait
+            time.sleep(wait)
+
+            pending = set(self.due_groups())
+            deadline = time.monotonic() + bar_timeout
+            while pending and time.monotonic() < deadline:
+                for key in list(pending):
+                    if self.poll_group(key, closed_at):
+                        pending.discard(key)
+                        bars += 1
+                if pending:
+                    time.sleep(poll_interval)
+
+            # Fora do caminho crítico: exportação periódica dos percentis
+            self.latency.maybe_export()
+
+
+def deploy_host(pattern='../selected/combined_strategy_*.json', strategies_file='entries.py',
+                mt5_module=None, max_inflight=None, tick_bars=False, **kwargs):
+    """
+    Carrega as estratégias, conecta ao MT5 e roda o host
+
+    Args:
+        pattern (str): Glob dos JSONs de estratégia
+        strategies_file (str): Arquivo com as funções de entrada
+        mt5_module: Módulo MetaTrader5 (padrão: importa o real)
+        max_inflight (int): Envia as ordens por um OrderRouter com esse número de envios
+                            simultâneos (None = envio síncrono no loop das estratégias)
+        tick_bars (bool): Monta os candles a partir dos ticks (TickBarFeed) em vez do copy_rates
+        **kwargs: Repassados ao StrategyHost (padrão: latência exportada para latency/ e
+                  snapshots dos candles em state/)
+    """
+    files = sorted(glob.glob(pattern))
+    if not files:
+        print(f"Nenhuma estratégia encontrada em {pattern}")
+        return
+
+    strategies = load_live_strategies(files, strategies_file)
+    mt5 = load_mt5(mt5_module)
+    if not connect_mt5(mt5):
+        return
+
+    kwargs.setdefault('latency', LatencyTracker(export_path=os.path.join('latency', 'latency_stats.csv')))
+    kwargs.setdefault('state_dir', 'state')
+    broker = MT5Broker(mt5)
+    if max_inflight:
+        kwargs.setdefault('router', OrderRouter(broker, max_inflight=max_inflight))
+    feed = TickBarFeed(mt5) if tick_bars else MT5Feed(mt5)
+    host = StrategyHost(strategies, feed, broker, **kwargs)
+    try:
+        host.run()
+    except KeyboardInterrupt:
+        print("\nHost interrompido pelo usuário")
+    finally:
+        if host.router is not None:
+            host.router.close()
+        host.latency.export()
+        print(f"Latência: {host.latency.summary()}")
+        mt5.shutdown()
+        print("Desconectado do MT5")
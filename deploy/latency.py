@@ -0,0 +1,110 @@
+"""
+Medição de latência do caminho fechamento do candle -> ordem enviada.
+
+Cada candle processado pelo host gera amostras por etapa:
+
+    - arrival: fechamento do candle (relógio local) até o candle aparecer no MT5
+    - fetch: busca dos candles (copy_rates_from_pos)
+    - signal: cálculo do sinal com a função de entries.py (por estratégia)
+    - queue: espera na fila do OrderRouter até um envio livre (envio assíncrono)
+    - build: montagem da ordem (cotação + request)
+    - send: order_send
+    - total: fechamento do candle até o retorno do order_send (por ordem)
+
+As amostras ficam em janelas rolantes em memória e os percentis são
+exportados periodicamente (append) para um CSV local, para acompanhar
+quando a latência piora ao longo do dia.
+
+Exemplo:
+
+    tracker = LatencyTracker(export_path='latency/latency_stats.csv', export_every=300)
+    host = StrategyHost(strategies, feed, broker, latency=tracker)
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+STAGES = ['arrival', 'fetch', 'signal', 'queue', 'build', 'send', 'total']
+PERCENTILES = (50, 90, 99)
+# Colunas fixas do CSV exportado (mesmo sem amostras em nenhuma etapa)
+STAT_COLUMNS = ['n', 'total_samples'] + [f'p{p}' for p in PERCENTILES] + ['max']
+
+
+class LatencyTracker:
+    """
+    Janelas rolantes de latência por etapa
+
+    Args:
+        window (int): Amostras mantidas por etapa
+        export_path (str): CSV onde os percentis são acrescentados (None = não exporta)
+        export_every (float): Intervalo mínimo entre exportações (segundos)
+    """
+
+    def __init__(self, window=2000, export_path=None, export_every=300.0):
+        self.window = window
+        self.export_path = export_path
+        self.export_every = export_every
+        self.samples = {stage: deque(maxlen=window) for stage in STAGES}
+        self.counts = {stage: 0 for stage in STAGES}
+        self._lock = threading.Lock()
+        self._last_export = time.monotonic()
+
+    def record(self, stage, seconds):
+        """Registra uma amostra (em segundos)"""
+        if seconds is None:
+            return
+        # Os envios do OrderRouter registram a partir das threads de envio
+        with self._lock:
+            self.samples[stage].append(seconds)
+            self.counts[stage] += 1
+
+    def percentiles(self):
+        """
+        Percentis atuais por etapa, em milissegundos
+
+        Returns:
+            pandas.DataFrame: Índice = etapa; colunas STAT_COLUMNS (NaN nas etapas sem amostras)
+        """
+        rows = []
+        for stage in STAGES:
+            with self._lock:
+                values = np.fromiter(self.samples[stage], dtype=float) * 1000
+            row = {'stage': stage, 'n': len(values), 'total_samples': self.counts[stage]}
+            if len(values):
+                row.update({f'p{p}': v for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))})
+                row['max'] = values.max()
+            rows.append(row)
+        return pd.DataFrame(rows).set_index('stage').reindex(columns=STAT_COLUMNS)
+
+    def export(self):
+        """Acrescenta os percentis atuais ao CSV de exportação"""
+        if not self.export_path:
+            return None
+        df = self.percentiles().reset_index()
+        df.insert(0, 'timestamp', datetime.now().isoformat(timespec='seconds'))
+
+        directory = os.path.dirname(self.export_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        df.to_csv(self.export_path, mode='a', index=False, header=not os.path.exists(self.export_path))
+        self._last_export = time.monotonic()
+        return self.export_path
+
+    def maybe_export(self):
+        """Exporta se o intervalo de exportação já passou (chamado fora do caminho crítico)"""
+        if self.export_path and time.monotonic() - self._last_export >= self.export_every:
+            self.export()
+
+    def summary(self):
+        """Texto curto com p50/p99 por etapa"""
+        df = self.percentiles()
+        parts = [f"{stage} p50={row['p50']:.1f}ms p99={row['p99']:.1f}ms"
+                 for stage, row in df.iterrows() if row['n']]
+        return ' | '.join(parts)
@@ -0,0 +1,225 @@
+"""
+Roteamento assíncrono de ordens com fila limitada.
+
+No host síncrono, quando várias estratégias sinalizam no mesmo candle, cada
+order_send espera o anterior dentro do loop das estratégias. O OrderRouter
+recebe os pedidos de ordem em uma fila limitada e os envia em até
+max_inflight threads (limite de envios simultâneos aceito pelo broker),
+liberando o loop para calcular os próximos sinais.
+
+    - backpressure: com a fila cheia, submit espera até submit_timeout e,
+      esgotado o prazo, descarta o pedido (sinal velho não deve ser enviado)
+    - retries: só retcodes em que o servidor recusou o pedido sem executá-lo
+      (requote, preço mudou, timeout, conexão, excesso de requisições) são
+      reenviados, até max_retries vezes
+    - execução parcial: não há reenvio do restante. As ordens saem com
+      ORDER_FILLING_RETURN, então o MT5 mantém o restante trabalhando no
+      livro; reenviar dobraria a posição
+    - order_send sem resposta (None): a ordem pode ter chegado ao servidor,
+      então também não há reenvio; o estado real vem de broker.exposure
+      (positions_get/orders_get) e fica no registro do pedido
+    - latência: espera na fila (etapa queue), build/send de cada tentativa e
+      total do fechamento do candle ao fim do envio
+
+Exemplo:
+
+    router = OrderRouter(MT5Broker(mt5), max_inflight=2, latency=tracker)
+    host = StrategyHost(strategies, feed, broker, router=router)
+    ...
+    router.close()
+"""
+
+import time
+import queue
+import threading
+
+
+# Retcodes do MT5 (TRADE_RETCODE_*)
+RETCODE_REQUOTE = 10004
+RETCODE_DONE = 10009
+RETCODE_DONE_PARTIAL = 10010
+RETCODE_TIMEOUT = 10012
+RETCODE_PRICE_CHANGED = 10020
+RETCODE_PRICE_OFF = 10021
+RETCODE_TOO_MANY_REQUESTS = 10024
+RETCODE_CONNECTION = 10031
+
+# Recusas sem execução, que podem ser reenviadas. None (order_send sem resposta) fica de fora:
+# não prova que a ordem não chegou ao servidor
+TRANSIENT_RETCODES = {RETCODE_REQUOTE, RETCODE_TIMEOUT, RETCODE_PRICE_CHANGED, RETCODE_PRICE_OFF,
+                      RETCODE_TOO_MANY_REQUESTS, RETCODE_CONNECTION}
+
+VOLUME_EPSILON = 1e-9
+
+
+class OrderRouter:
+    """
+    Fila limitada de ordens enviadas por threads
+
+    Args:
+        broker: Broker com send_market (MT5Broker ou equivalente; precisa aceitar
+                chamadas de várias threads quando max_inflight > 1)
+        max_inflight (int): Envios simultâneos (0 = envio na própria chamada de submit)
+        max_queue (int): Tamanho máximo da fila
+        submit_timeout (float): Espera máxima por espaço na fila (segundos)
+        max_retries (int): Reenvios por pedido (falhas transitórias e restos de parciais)
+        retry_delay (float): Espera entre reenvios (segundos)
+        latency (LatencyTracker): Onde registrar queue/build/send/total (opcional)
+        on_done (callable): Chamado com o registro de cada pedido concluído
+    """
+
+    def __init__(self, broker, max_inflight=2, max_queue=32, submit_timeout=0.5, max_retries=3,
+                 retry_delay=0.05, latency=None, on_done=None):
+        self.broker = broker
+        self.max_inflight = max_inflight
+        self.submit_timeout = submit_timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.latency = latency
+        self.on_done = on_done
+
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.completed = []
+        self.dropped = []
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._workers = [threading.Thread(target=self._run, name=f'order-router-{i}', daemon=True)
+                         for i in range(max_inflight)]
+        for worker in self._workers:
+            worker.start()
+
+    def is_pending(self, magic):
+        """True se o magic tem pedido na fila ou em envio (evita ordens duplicadas)"""
+        with self._lock:
+            return self._pending.get(magic, 0) > 0
+
+    def submit(self, request):
+        """
+        Enfileira um pedido de ordem
+
+        Args:
+            request (dict): symbol, direction, volume, tp, sl, magic, comment e,
+                            opcionalmente, closed_at (time.time() do fechamento do candle)
+
+        Returns:
+            bool: False se a fila continuou cheia até submit_timeout (pedido descartado)
+        """
+        request = dict(request, submitted=time.perf_counter())
+        with self._lock:
+            self._pending[request['magic']] = self._pending.get(request['magic'], 0) + 1
+        if not self._workers:
+            self._complete(request)
+            return True
+        try:
+            self.queue.put(request, timeout=self.submit_timeout)
+        except queue.Full:
+            self._release(request['magic'])
+            self.dropped.append(request)
+            print(f"Fila de ordens cheia: pedido do magic {request['magic']} descartado")
+            return False
+        return True
+
+    def _release(self, magic):
+        with self._lock:
+            self._pending[magic] -= 1
+            if not self._pending[magic]:
+                del self._pending[magic]
+
+    def _record(self, stage, seconds):
+        if self.latency is not None:
+            self.latency.record(stage, seconds)
+
+    def _run(self):
+        while True:
+            request = self.queue.get()
+            if request is None:
+                self.queue.task_done()
+                return
+            try:
+                self._complete(request)
+            finally:
+                self.queue.task_done()
+
+    def _complete(self, request):
+        try:
+            record = self.send(request)
+            self.completed.append(record)
+            if self.on_done is not None:
+                self.on_done(record)
+        except Exception as e:
+            print(f"Erro no envio do magic {request['magic']}: {e}")
+        finally:
+            self._release(request['magic'])
+
+    def _reconcile(self, request):
+        """Posição e ordens pendentes do magic no broker (None se o broker não informa)"""
+        exposure = getattr(self.broker, 'exposure', None)
+        if exposure is None:
+            return None
+        try:
+            return exposure(request['symbol'], request['magic'])
+        except Exception as e:
+            print(f"Erro ao reconciliar o magic {request['magic']}: {e}")
+            return None
+
+    def send(self, request):
+        """
+        Envia um pedido, reenviando só recusas sem execução
+
+        Execuções parciais e envios sem resposta não são reenviados; nesses
+        casos o registro traz a exposição real do magic (reconciled).
+
+        Returns:
+            dict: Pedido + ok, filled, attempts, retcode, order, price, comment, queue_s,
+                  reconciled, latency_s
+        """
+        queue_s = time.perf_counter() - request['submitted']
+        self._record('queue', queue_s)
+
+        volume = float(request['volume'])
+        filled, attempts, result, reconciled = 0.0, 0, None, None
+        while attempts <= self.max_retries:
+            if attempts:
+                time.sleep(self.retry_delay)
+            attempts += 1
+            result = self.broker.send_market(request['symbol'], request['direction'], volume,
+                                             request['tp'], request['sl'], request['magic'],
+                                             comment=request.get('comment', ''))
+            self._record('build', result.get('build_s'))
+            self._record('send', result.get('send_s'))
+
+            if result['ok']:
+                filled = result['volume'] if result['volume'] else volume
+                break
+            if result['retcode'] == RETCODE_DONE_PARTIAL:
+                # O restante continua trabalhando no livro (ORDER_FILLING_RETURN)
+                filled = result['volume'] or 0.0
+                reconciled = self._reconcile(request)
+                break
+            if result['retcode'] is None:
+                reconciled = self._reconcile(request)
+                if reconciled is not None:
+                    filled = reconciled['position_volume']
+                break
+            if result['retcode'] not in TRANSIENT_RETCODES:
+                break
+
+        record = dict(request, ok=volume - filled <= VOLUME_EPSILON, filled=filled, attempts=attempts,
+                      retcode=result['retcode'] if result else None, order=result['order'] if result else None,
+                      price=result['price'] if result else None, volume=filled,
+                      comment=result['comment'] if result else '', queue_s=queue_s, reconciled=reconciled)
+        if request.get('closed_at') is not None:
+            record['latency_s'] = time.time() - request['closed_at']
+            self._record('total', record['latency_s'])
+        return record
+
+    def join(self):
+        """Espera a fila esvaziar"""
+        self.queue.join()
+
+    def close(self):
+        """Envia o que está na fila e encerra as threads"""
+        for _ in self._workers:
+            self.queue.put(None)
+        for worker in self._workers:
+            worker.join()
@@ -0,0 +1,318 @@
+"""
+Replay histórico em alta velocidade pelo caminho de deploy.
+
+Os candles gravados são entregues, candle a candle e sem espera, ao mesmo
+StrategyHost usado em produção (refresh incremental do buffer, despacho por
+hora, cálculo do sinal com entries.py e roteamento por magic), com um feed
+e um broker locais no lugar do MT5. Ao final:
+
+    - throughput (candles/s) e latência por candle (p50/p99), além dos
+      percentis por etapa do LatencyTracker do host
+    - diff das ordens geradas contra os sinais do CSV do backtest
+      (controle/backtest_results/backtest_*_magic_*.csv) de cada estratégia
+
+Os candles vêm do próprio CSV do backtest (colunas open/high/low/close),
+garantindo os mesmos dados dos dois lados.
+
+Status do diff (um por candle com ordem ou sinal):
+    - match: ordem e sinal do backtest no mesmo candle e direção
+    - direction_mismatch: mesmo candle, direção diferente
+    - live_only: ordem sem sinal no backtest
+    - backtest_only: sinal do backtest sem ordem
+    - blocked: sinal do backtest descartado por posição aberta (--simulate-exits)
+
+Exemplo (rodando em deploy/):
+
+    python replay.py --strategies "../selected/combined_strategy_*.json" \\
+        --backtest-dir ../controle/backtest_results
+"""
+
+import os
+import io
+import glob
+import time
+import argparse
+import contextlib
+
+import numpy as np
+import pandas as pd
+
+from host import StrategyHost, load_live_strategies
+
+
+class ReplayFeed:
+    """
+    Feed de candles gravados com cursor controlado pelo replay
+
+    Args:
+        data (dict): (símbolo, timeframe) -> DataFrame de candles
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.cursor = {key: 0 for key in data}
+        self.by_symbol = {}
+        for key in data:
+            self.by_symbol.setdefault(key[0], key)
+
+    def last_closed_time(self, symbol, timeframe):
+        n = self.cursor[(symbol, timeframe)]
+        return self.data[(symbol, timeframe)].index[n - 1] if n else None
+
+    def bars(self, symbol, timeframe, count):
+        n = self.cursor[(symbol, timeframe)]
+        return self.data[(symbol, timeframe)].iloc[max(n - count, 0):n]
+
+    def last_bar(self, symbol):
+        """Último candle fechado do símbolo"""
+        key = self.by_symbol[symbol]
+        return self.data[key].iloc[self.cursor[key] - 1]
+
+    def next_open(self, symbol):
+        """Abertura do candle em formação (preço de execução da ordem a mercado)"""
+        key = self.by_symbol[symbol]
+        df, n = self.data[key], self.cursor[key]
+        return float(df['open'].iat[n]) if n < len(df) else float(df['close'].iat[n - 1])
+
+
+class ReplayBroker:
+    """
+    Broker local do replay
+
+    Args:
+        feed (ReplayFeed): Feed do replay (preços de execução)
+        simulate_exits (bool): Mantém posições abertas até TP/SL/daytrade, como no
+                               live (uma posição por magic); False = toda ordem é aceita
+    """
+
+    def __init__(self, feed, simulate_exits=False):
+        self.feed = feed
+        self.simulate_exits = simulate_exits
+        self.positions = {}
+        self.exits = []
+        self._ticket = 0
+
+    def has_position(self, symbol, magic):
+        return magic in self.positions
+
+    def send_market(self, symbol, direction, volume, tp, sl, magic, comment=''):
+        start = time.perf_counter()
+        price = self.feed.next_open(symbol)
+        self._ticket += 1
+        if self.simulate_exits:
+            self.positions[magic] = {'symbol': symbol, 'direction': direction, 'price': price,
+                                     'tp': price + direction * tp if tp else None,
+                                     'sl': price - direction * sl if sl else None,
+                                     'ticket': self._ticket}
+        build = time.perf_counter() - start
+        return {'ok': True, 'retcode': 10009, 'order': self._ticket, 'price': price,
+                'volume': float(volume), 'comment': comment, 'build_s': build, 'send_s': 0.0}
+
+    def close_positions(self, symbol, magic, comment='daytrade'):
+        position = self.positions.pop(magic, None)
+        if position is not None:
+            bar = self.feed.last_bar(symbol)
+            self.exits.append({'magic': magic, 'time': bar.name, 'price': float(bar['close']), 'reason': comment})
+        return []
+
+    def update(self, symbol, bar):
+        """Fecha por TP/SL as posições do símbolo atingidas no candle (SL primeiro, conservador)"""
+        for magic, position in list(self.positions.items()):
+            if position['symbol'] != symbol:
+                continue
+            direction = position['direction']
+            low, high = (bar['low'], bar['high']) if direction > 0 else (-bar['high'], -bar['low'])
+            sl = position['sl'] * direction if position['sl'] is not None else None
+            tp = position['tp'] * direction if position['tp'] is not None else None
+            if sl is not None and low <= sl:
+                reason, price = 'sl', position['sl']
+            elif tp is not None and high >= tp:
+                reason, price = 'tp', position['tp']
+            else:
+                continue
+            del self.positions[magic]
+            self.exits.append({'magic': magic, 'time': bar.name, 'price': price, 'reason': reason})
+
+
+def backtest_csv_path(strategy, backtest_dir):
+    """CSV do backtest de uma estratégia (mesmo nome gerado por backtest_all_configs.py)"""
+    symbol = 'WIN@N' if 'WIN' in strategy.symbol else strategy.symbol
+    return os.path.join(backtest_dir, f"backtest_{symbol}_{strategy.timeframe}_{strategy.strategy}"
+                                      f"_magic_{strategy.magic_number}.csv")
+
+
+def load_backtest(path):
+    """Lê o CSV do backtest (índice time)"""
+    return pd.read_csv(path, index_col=0, parse_dates=True)
+
+
+def replay(strategies, data, history_bars=300, simulate_exits=False, verbose=False):
+    """
+    Entrega todos os candles ao host o mais rápido possível
+
+    Args:
+        strategies (list): LiveStrategy carregadas
+        data (dict): (símbolo, timeframe) -> DataFrame de candles
+        history_bars (int): Buffer de candles do host
+        simulate_exits (bool): Ver ReplayBroker
+        verbose (bool): Mostra as mensagens do host
+
+    Returns:
+        tuple: (host, stats) com throughput e latência por candle
+    """
+    feed = ReplayFeed(data)
+    broker = ReplayBroker(feed, simulate_exits)
+    host = StrategyHost(strategies, feed, broker, history_bars=history_bars)
+
+    # Linha do tempo única de todos os fluxos (ordem de fechamento)
+    keys = list(data)
+    times = np.concatenate([data[key].index.values for key in keys])
+    owners = np.concatenate([np.full(len(data[key]), i) for i, key in enumerate(keys)])
+    timeline = owners[np.argsort(times, kind='stable')]
+
+    bar_latency = np.empty(len(timeline))
+    output = None if verbose else io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+        for i, owner in enumerate(timeline):
+            key = keys[owner]
+            t0 = time.perf_counter()
+            feed.cursor[key] += 1
+            if simulate_exits:
+                broker.update(key[0], feed.last_bar(key[0]))
+            host.poll_group(key)
+            bar_latency[i] = time.perf_counter() - t0
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        'bars': len(timeline),
+        'seconds': elapsed,
+        'bars_per_s': len(timeline) / elapsed if elapsed else np.nan,
+        'bar_p50_ms': np.percentile(bar_latency, 50) * 1000 if len(timeline) else np.nan,
+        'bar_p99_ms': np.percentile(bar_latency, 99) * 1000 if len(timeline) else np.nan,
+        'bar_max_ms': bar_latency.max() * 1000 if len(timeline) else np.nan,
+        'orders': len(host.orders),
+        'blocked': len(host.skipped)
+    }
+    return host, stats
+
+
+def diff_orders(host, strategy, backtest):
+    """
+    Compara as ordens do replay com os sinais do backtest de uma estratégia
+
+    Returns:
+        pandas.DataFrame: Uma linha por candle com ordem ou sinal (time, direction,
+                          direction_bt, status)
+    """
+    orders = pd.DataFrame([o for o in host.orders if o['magic'] == strategy.magic_number],
+                          columns=['bar_time', 'direction'])
+    live = pd.DataFrame({'time': pd.to_datetime(orders['bar_time']), 'direction': orders['direction']})
+
+    signal = backtest['position'].fillna(0) != 0
+    bt = pd.DataFrame({'time': backtest.index[signal],
+                       'direction_bt': np.sign(backtest.loc[signal, 'position'].to_numpy()).astype(int)})
+
+    diff = live.merge(bt, on='time', how='outer').sort_values('time').reset_index(drop=True)
+    blocked = {s['bar_time'] for s in host.skipped if s['magic'] == strategy.magic_number}
+    diff['status'] = np.select(
+        [diff['direction'].isna() & diff['time'].isin(blocked),
+         diff['direction'].isna(),
+         diff['direction_bt'].isna(),
+         diff['direction'] == diff['direction_bt']],
+        ['blocked', 'backtest_only', 'live_only', 'match'],
+        'direction_mismatch'
+    )
+    return diff
+
+
+def replay_against_backtest(strategy_files, backtest_dir, strategies_file='entries.py', output_dir=None,
+                            history_bars=300, simulate_exits=False, verbose=False):
+    """
+    Replay das estratégias sobre os candles dos seus backtests e diff das ordens
+
+    Args:
+        strategy_files (list ou str): JSONs de combined_strategy (lista ou glob)
+        backtest_dir (str): Pasta com os backtest_*_magic_*.csv
+        strategies_file (str): Arquivo com as funções de entrada
+        output_dir (str): Pasta para os diffs e o resumo (None = não salva)
+        history_bars (int): Buffer de candles do host
+        simulate_exits (bool): Ver ReplayBroker
+        verbose (bool): Mostra as mensagens do host
+
+    Returns:
+        tuple: (stats, summary, diffs) com diffs = magic -> DataFrame
+    """
+    if isinstance(strategy_files, str):
+        strategy_files = sorted(glob.glob(strategy_files))
+    strategies = load_live_strategies(strategy_files, strategies_file)
+
+    # Candles de cada fluxo a partir do primeiro CSV de backtest encontrado
+    data, backtests = {}, {}
+    for strategy in strategies:
+        path = backtest_csv_path(strategy, backtest_dir)
+        if not os.path.exists(path):
+            print(f"[{strategy.name}] backtest não encontrado: {path}")
+            continue
+        backtests[strategy.magic_number] = load_backtest(path)
+        key = (strategy.symbol, strategy.timeframe)
+        if key not in data:
+            candles = backtests[strategy.magic_number]
+            data[key] = candles[[c for c in ['open', 'high', 'low', 'close', 'volume'] if c in candles]]
+
+    strategies = [s for s in strategies if s.magic_number in backtests]
+    if not strategies:
+        print("Nenhuma estratégia com backtest para o replay")
+        return {}, pd.DataFrame(), {}
+
+    host, stats = replay(strategies, data, history_bars, simulate_exits, verbose)
+    print(f"Replay: {stats['bars']} candles em {stats['seconds']:.2f}s "
+          f"({stats['bars_per_s']:.0f} candles/s) | por candle p50={stats['bar_p50_ms']:.2f}ms "
+          f"p99={stats['bar_p99_ms']:.2f}ms | {stats['orders']} ordens")
+    print(f"Etapas: {host.latency.summary()}")
+
+    rows, diffs = [], {}
+    for strategy in strategies:
+        diff = diff_orders(host, strategy, backtests[strategy.magic_number])
+        diffs[strategy.magic_number] = diff
+        counts = diff['status'].value_counts()
+        row = {'magic': strategy.magic_number, 'strategy': strategy.strategy, 'file': strategy.name}
+        row.update({status: int(counts.get(status, 0))
+                    for status in ['match', 'direction_mismatch', 'live_only', 'backtest_only', 'blocked']})
+        signals = (diff['direction_bt'].notna()).sum()
+        row['match_rate'] = row['match'] / signals if signals else np.nan
+        rows.append(row)
+    summary = pd.DataFrame(rows).set_index('magic')
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        for magic, diff in diffs.items():
+            diff.to_csv(os.path.join(output_dir, f"replay_diff_magic_{magic}.csv"), index=False)
+        summary.to_csv(os.path.join(output_dir, 'replay_summary.csv'))
+        host.latency.percentiles().to_csv(os.path.join(output_dir, 'replay_latency.csv'))
+        print(f"Resultados do replay salvos em: {output_dir}")
+
+    return stats, summary, diffs
+
+
+def main():
+    """Replay das estratégias selecionadas contra os CSVs do backtest"""
+    parser = argparse.ArgumentParser(description='Replay histórico pelo caminho de deploy')
+    parser.add_argument('--strategies', default='../selected/combined_strategy_*.json')
+    parser.add_argument('--backtest-dir', default='../controle/backtest_results')
+    parser.add_argument('--entries', default='entries.py', help='Arquivo com as funções de entrada')
+    parser.add_argument('--output', default='replay_results')
+    parser.add_argument('--history-bars', type=int, default=300)
+    parser.add_argument('--simulate-exits', action='store_true',
+                        help='Uma posição por magic até TP/SL, como no live')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    _, summary, _ = replay_against_backtest(args.strategies, args.backtest_dir, args.entries, args.output,
+                                            args.history_bars, args.simulate_exits, args.verbose)
+    if not summary.empty:
+        print(summary.to_string())
+
+
+if __name__ == '__main__':
+    main()
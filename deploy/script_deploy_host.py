@@ -0,0 +1,5 @@
+from host import deploy_host
+
+# Todas as estratégias de selected/ em um único processo
+# (substitui rodar script_deploy_1.py ... script_deploy_5.py separadamente)
+deploy_host("../selected/combined_strategy_*.json", strategies_file="entries.py")
@@ -0,0 +1,150 @@
+"""
+Feed de candles montados a partir dos ticks do MT5.
+
+Alternativa ao MT5Feed com a mesma interface (last_closed_time, bars): o
+histórico de aquecimento vem do copy_rates uma única vez por fluxo e, dali
+em diante, os candles são montados pelo BarAggregator (common/bars.py) com
+os ticks de negócio (copy_ticks_from), com as mesmas regras de fronteira
+usadas na ingestão histórica do factory. Um único fluxo de ticks por
+símbolo alimenta todos os timeframes desse símbolo.
+
+O candle fecha quando chega um negócio do candle seguinte ou quando o
+último tick do símbolo (qualquer cotação, symbol_info_tick) passa do fim
+do candle, como o MT5 faz ao abrir uma barra nova.
+
+Exemplo:
+
+    host = StrategyHost(strategies, TickBarFeed(mt5), MT5Broker(mt5))
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.bars import BarAggregator, timeframe_delta
+
+from brokers import MT5Feed, load_mt5
+
+
+# Máximo de ticks por chamada ao copy_ticks_*
+TICKS_PER_FETCH = 100_000
+
+
+class TickBarFeed:
+    """
+    Candles fechados montados a partir de ticks
+
+    Args:
+        mt5_module: Módulo MetaTrader5 (padrão: importa o real)
+        history_feed: Feed do histórico de aquecimento (padrão: MT5Feed)
+        warmup_bars (int): Candles de histórico carregados por fluxo
+        keep_bars (int): Candles mantidos em memória por fluxo
+        price_column (str): Preço dos ticks usado nos candles (last nos futuros da B3)
+    """
+
+    def __init__(self, mt5_module=None, history_feed=None, warmup_bars=500, keep_bars=5000, price_column='last'):
+        self.mt5 = load_mt5(mt5_module)
+        self.history = history_feed or MT5Feed(self.mt5)
+        self.warmup_bars = warmup_bars
+        self.keep_bars = keep_bars
+        self.price_column = price_column
+
+        self.aggregators = {}
+        self.frames = {}
+        # Por símbolo: (time_msc do último tick lido, ticks já lidos nesse milissegundo)
+        self.cursor = {}
+
+    def _ticks(self, symbol, from_msc, to_msc=None):
+        """Ticks de negócio a partir de from_msc (e até to_msc, exclusivo)"""
+        if to_msc is None:
+            ticks = self.mt5.copy_ticks_from(symbol, from_msc // 1000, TICKS_PER_FETCH, self.mt5.COPY_TICKS_TRADE)
+        else:
+            ticks = self.mt5.copy_ticks_range(symbol, from_msc // 1000, to_msc // 1000 + 1,
+                                              self.mt5.COPY_TICKS_TRADE)
+        if ticks is None or len(ticks) == 0:
+            return pd.DataFrame()
+        df = pd.DataFrame(ticks)
+        df = df[df['time_msc'] >= from_msc]
+        if to_msc is not None:
+            df = df[df['time_msc'] < to_msc]
+        return df
+
+    @staticmethod
+    def _frame(ticks):
+        return ticks.set_index(pd.DatetimeIndex(pd.to_datetime(ticks['time_msc'], unit='ms'), name='time'))
+
+    def _add(self, key, bars):
+        frame = self.frames[key]
+        if not frame.empty:
+            bars = bars[bars.index > frame.index[-1]]
+        if bars.empty:
+            return
+        frame = pd.concat([frame, bars]) if not frame.empty else bars
+        self.frames[key] = frame.iloc[-self.keep_bars:]
+
+    def _ensure(self, symbol, timeframe):
+        """Aquece um fluxo: histórico fechado + ticks do candle em formação"""
+        key = (symbol, timeframe)
+        if key in self.aggregators:
+            return
+
+        history = self.history.bars(symbol, timeframe, self.warmup_bars)
+        if history.empty:
+            return
+        self.frames[key] = history
+        self.aggregators[key] = BarAggregator(timeframe, self.price_column)
+
+        # Os ticks começam na abertura do candle em formação para que ele fique completo
+        start_msc = int((history.index[-1] + timeframe_delta(timeframe)).value // 10**6)
+        if symbol not in self.cursor:
+            self.cursor[symbol] = (start_msc, 0)
+        elif start_msc <= self.cursor[symbol][0]:
+            # Mesmos ticks que os outros timeframes já leram, inclusive os do milissegundo do cursor
+            last_msc, seen = self.cursor[symbol]
+            backfill = self._ticks(symbol, start_msc, last_msc + 1)
+            at_cursor = (backfill['time_msc'] == last_msc).cumsum() if not backfill.empty else None
+            if at_cursor is not None:
+                backfill = backfill[(backfill['time_msc'] < last_msc) | (at_cursor <= seen)]
+            if not backfill.empty:
+                self._add(key, self.aggregators[key].update(self._frame(backfill)))
+
+    def _poll(self, symbol):
+        """Lê os ticks novos do símbolo e fecha os candles completados"""
+        if symbol not in self.cursor:
+            return
+        last_msc, seen = self.cursor[symbol]
+        ticks = self._ticks(symbol, last_msc)
+        if not ticks.empty:
+            # copy_ticks_from inclui o milissegundo do cursor: descarta os ticks já lidos nele
+            at_cursor = (ticks['time_msc'] == last_msc).cumsum()
+            ticks = ticks[(ticks['time_msc'] > last_msc) | (at_cursor > seen)]
+        if not ticks.empty:
+            newest = int(ticks['time_msc'].iloc[-1])
+            count = int((ticks['time_msc'] == newest).sum()) + (seen if newest == last_msc else 0)
+            self.cursor[symbol] = (newest, count)
+            ticks = self._frame(ticks)
+
+        info = self.mt5.symbol_info_tick(symbol)
+        now = pd.Timestamp(int(info.time_msc), unit='ms') if info is not None else None
+        for (sym, timeframe), aggregator in self.aggregators.items():
+            if sym != symbol:
+                continue
+            if not ticks.empty:
+                self._add((sym, timeframe), aggregator.update(ticks))
+            if now is not None:
+                self._add((sym, timeframe), aggregator.close_until(now))
+
+    def last_closed_time(self, symbol, timeframe):
+        """Horário (abertura) do último candle fechado, ou None"""
+        self._ensure(symbol, timeframe)
+        self._poll(symbol)
+        frame = self.frames.get((symbol, timeframe))
+        return frame.index[-1] if frame is not None and not frame.empty else None
+
+    def bars(self, symbol, timeframe, count):
+        """Últimos count candles fechados (até keep_bars)"""
+        self._ensure(symbol, timeframe)
+        frame = self.frames.get((symbol, timeframe))
+        return frame.iloc[-count:] if frame is not None else pd.DataFrame()
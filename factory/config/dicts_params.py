@@ -1,160 +1,19 @@
-path_b3 = 'C:/Users/User/OneDrive/Documentos/rnt/Finance/Trading Projects/00.database/candlestick data/futuros/'
-path_tickmill = 'C:/Users/User/OneDrive/Documentos/rnt/Finance/Trading Projects/00.database/tickmill/forex/'
+"""
+Dicionários de custos, valor do lote e pasta dos dados por símbolo.
 
-dict_custos = {'WIN@N':0.2*5, 'WDO@N':2.40/2, 'WSP@N':0.2*5, 'BIT@N':0.2*5,
-                                     'AUDUSD': 3,
-                                     'EURUSD': 3,
-                                     'GBPUSD': 3,
-                                     'NZDUSD': 3,
-                                     'USDCHF': 3,
-                                     'USDJPY': 3,
-                                     'AUDCAD': 3,
-                                     'AUDCHF': 3,
-                                     'AUDJPY': 3,
-                                     'AUDNZD': 3,
-                                     'CADCHF': 3,
-                                     'CADJPY': 3,
-                                     'CHFJPY': 3,
-                                     'EURAUD': 3,
-                                     'EURCAD': 3,
-                                     'EURCHF': 3,
-                                     'EURGBP': 3,
-                                     'EURHKD': 3,
-                                     'EURJPY': 3,
-                                     'EURMXN': 3,
-                                     'EURNZD': 3,
-                                     'EURTRY': 3,
-                                     'GBPCAD': 3,
-                                     'GBPCHF': 3,
-                                     'GBPJPY': 3,
-                                     'USDCNH': 3,
-                                     'USDCZK': 3,
-                                     'USDMXN': 3,
-                                     'USDTRY': 3,
-                                     'XAGUSD': 3,
-                                     'XAUUSD': 3,
-                                     'STOXX50': 3,
-                                     'UK100': 3,
-                                      'DE40': 3,
-                                     'FRANCE40': 3,
-                                     'VIX': 3,
-                                     'ALUMINIUM': 3,
-                                     'PLATINUM': 3,
-                                     'LEAD': 3,
-                                     'NICKEL': 3,
-                                     'PALLADIUM': 3,
-                                     'ZINC': 3,
-                                     'COPPER': 3,
-                                     'DXY': 3,
-                                     'COCOA': 3,
-                                     'SUGAR': 3,
-                                     'WHEAT': 3,
-                                     'US500': 3,
-                                     'NAT.GAS': 3,
-                                     'BRENT': 3}
+Gerados a partir do registro único em common/instruments.py; mantidos com
+os nomes antigos para os notebooks do factory.
+"""
 
-dict_valor_lot = {'WIN@N':0.2, 'WDO@N':10.0, 'WSP@N':2.5, 'BIT@N':1.0,
-                                'USDCAD': 100000,
-                                 'AUDUSD': 100000,
-                                 'EURUSD': 100000,
-                                 'GBPUSD': 100000,
-                                 'NZDUSD': 100000,
-                                 'USDCHF': 100000,
-                                 'USDJPY': 100000,
-                                 'AUDCAD': 100000,
-                                 'AUDCHF': 100000,
-                                 'AUDJPY': 100000,
-                                 'AUDNZD': 100000,
-                                 'CADCHF': 100000,
-                                 'CADJPY': 100000,
-                                 'CHFJPY': 100000,
-                                 'EURAUD': 100000,
-                                 'EURCAD': 100000,
-                                 'EURCHF': 100000,
-                                 'EURGBP': 100000,
-                                 'EURHKD': 100000,
-                                 'EURJPY': 100000,
-                                 'EURMXN': 100000,
-                                 'EURNZD': 100000,
-                                 'EURTRY': 100000,
-                                 'GBPCAD': 100000,
-                                 'GBPCHF': 100000,
-                                 'GBPJPY': 100000,
-                                 'USDCNH': 100000,
-                                 'USDCZK': 100000,
-                                 'USDMXN': 100000,
-                                 'USDTRY': 100000,
-                                 'XAGUSD': 100000,
-                                 'XAUUSD': 100000,
-                                 'STOXX50': 1,
-                                 'UK100': 1,
-                                  'DE40': 1,
-                                 'FRANCE40': 1,
-                                 'VIX': 100000,
-                                 'ALUMINIUM': 100000,
-                                 'PLATINUM': 100000,
-                                 'LEAD': 100000,
-                                 'NICKEL': 100000,
-                                 'PALLADIUM': 100000,
-                                 'ZINC': 100000,
-                                 'COPPER': 100000,
-                                 'DXY': 100000,
-                                 'COCOA': 100000,
-                                 'SUGAR': 100000,
-                                 'WHEAT': 100000,
-                                 'US500': 1,
-                                 'NAT.GAS': 100000,
-                                 'BRENT': 100000}
+import sys
+from pathlib import Path
 
-dict_path = {'WIN@N':path_b3, 'WDO@N':path_b3, 'WSP@N':path_b3, 'BIT@N':path_b3,
-                              'USDCAD': path_tickmill,
-                             'AUDUSD': path_tickmill,
-                             'EURUSD': path_tickmill,
-                             'GBPUSD': path_tickmill,
-                             'NZDUSD': path_tickmill,
-                             'USDCHF': path_tickmill,
-                             'USDJPY': path_tickmill,
-                             'AUDCAD': path_tickmill,
-                             'AUDCHF': path_tickmill,
-                             'AUDJPY': path_tickmill,
-                             'AUDNZD': path_tickmill,
-                             'CADCHF': path_tickmill,
-                             'CADJPY': path_tickmill,
-                             'CHFJPY': path_tickmill,
-                             'EURAUD': path_tickmill,
-                             'EURCAD': path_tickmill,
-                             'EURCHF': path_tickmill,
-                             'EURGBP': path_tickmill,
-                             'EURHKD': path_tickmill,
-                             'EURJPY': path_tickmill,
-                             'EURMXN': path_tickmill,
-                             'EURNZD': path_tickmill,
-                             'EURTRY': path_tickmill,
-                             'GBPCAD': path_tickmill,
-                             'GBPCHF': path_tickmill,
-                             'GBPJPY': path_tickmill,
-                             'USDCNH': path_tickmill,
-                             'USDCZK': path_tickmill,
-                             'USDMXN': path_tickmill,
-                             'USDTRY': path_tickmill,
-                             'XAGUSD': path_tickmill,
-                             'XAUUSD': path_tickmill,
-                             'STOXX50': path_tickmill,
-                             'UK100': path_tickmill,
-                             'DE40': path_tickmill,
-                             'FRANCE40': path_tickmill,
-                             'VIX': path_tickmill,
-                             'ALUMINIUM': path_tickmill,
-                             'PLATINUM': path_tickmill,
-                             'LEAD': path_tickmill,
-                             'NICKEL': path_tickmill,
-                             'PALLADIUM': path_tickmill,
-                             'ZINC': path_tickmill,
-                             'COPPER': path_tickmill,
-                             'DXY': path_tickmill,
-                             'COCOA': path_tickmill,
-                             'SUGAR': path_tickmill,
-                             'WHEAT': path_tickmill,
-                             'US500': path_tickmill,
-                             'NAT.GAS': path_tickmill,
-                             'BRENT': path_tickmill}
\ No newline at end of file
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.instruments import INSTRUMENTS, PATH_B3, PATH_TICKMILL
+
+path_b3 = PATH_B3
+path_tickmill = PATH_TICKMILL
+
+dict_custos = INSTRUMENTS.as_dict('tc')
+dict_valor_lot = INSTRUMENTS.as_dict('valor_lote')
+dict_path = INSTRUMENTS.as_dict('path_base')
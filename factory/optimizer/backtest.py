@@ -0,0 +1,58 @@
+"""
+Execução de backtests a partir de um dicionário de configuração no
+mesmo formato do config.json gerado pelo StrategyOptimizer.
+"""
+
+from futures_backtester import Backtester
+
+from .params import split_params
+
+
+def make_backtester(config, tp, sl, data_ini=None, data_fim=None):
+    """
+    Cria um Backtester a partir do config do run
+
+    Args:
+        config (dict): Configuração do run (symbol, timeframe, tc, valor_lote, ...)
+        tp (float): Take profit
+        sl (float): Stop loss
+        data_ini (str): Data inicial (padrão: config['data_ini'])
+        data_fim (str): Data final (padrão: config['data_fim'])
+
+    Returns:
+        Backtester: Instância configurada
+    """
+    return Backtester(
+        symbol=config['symbol'],
+        timeframe=config['timeframe'],
+        data_ini=data_ini or config['data_ini'],
+        data_fim=data_fim or config['data_fim'],
+        tp=tp,
+        sl=sl,
+        slippage=config.get('slippage', 0),
+        tc=config['tc'],
+        lote=config.get('lote', 1),
+        valor_lote=config['valor_lote'],
+        initial_cash=config.get('initial_cash', 30000),
+        path_base=config['path_base'],
+        daytrade=config.get('daytrade', True)
+    )
+
+
+def run_backtest(config, signal_function, params, data_ini=None, data_fim=None):
+    """
+    Executa um backtest com os parâmetros de um trial
+
+    Args:
+        config (dict): Configuração do run
+        signal_function (callable): Função de entrada (entries.py)
+        params (dict): Parâmetros completos (tp, sl e argumentos do sinal)
+        data_ini (str): Data inicial opcional
+        data_fim (str): Data final opcional
+
+    Returns:
+        tuple: (results, metrics) retornados por Backtester.run
+    """
+    tp, sl, signal_args = split_params(params)
+    bt = make_backtester(config, tp, sl, data_ini, data_fim)
+    return bt.run(signal_function=signal_function, signal_args=signal_args)
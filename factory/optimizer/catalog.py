@@ -0,0 +1,286 @@
+"""
+Catálogo indexado de todos os resultados de otimização.
+
+Ingere o config.json e os results_hour_*.json de cada run_* em um único
+SQLite local (uma linha por run/hora, com parâmetros e métricas em
+colunas indexadas), para filtrar e ranquear resultados sem abrir os
+arquivos manualmente na hora de montar os combined_strategy selecionados.
+
+A atualização é incremental: só arquivos novos ou modificados desde a
+última ingestão são lidos, e as linhas de runs (ou horas) cujos arquivos
+foram apagados de resultados/ saem do catálogo.
+
+Uso:
+    cd factory
+    python -m optimizer.catalog                       # atualiza e mostra o top 20
+    python -m optimizer.catalog --symbol WDO@N --order-by sharpe_ratio
+
+    from optimizer.catalog import ResultsCatalog
+    catalog = ResultsCatalog()
+    catalog.update()
+    df = catalog.query(symbol='WDO@N', min_trades=500, order_by='calmar_ratio')
+"""
+
+import os
+import re
+import glob
+import json
+import sqlite3
+import argparse
+from datetime import datetime
+
+import pandas as pd
+
+from .results import load_json, hour_result_path
+
+
+DEFAULT_RESULTADOS_DIR = './resultados'
+DEFAULT_CATALOG_NAME = 'catalog.sqlite'
+
+METRIC_COLUMNS = ['sortino_ratio', 'sharpe_ratio', 'calmar_ratio', 'profit_factor',
+                  'win_rate', 'max_drawdown', 'total_return', 'trades']
+
+RUN_TIMESTAMP = re.compile(r'_(\d{8}_\d{6})$')
+
+
+def parse_run_timestamp(run_dir):
+    """Extrai o timestamp do nome run_{symbol}_{strategy}_{tf}_{YYYYmmdd_HHMMSS}"""
+    match = RUN_TIMESTAMP.search(os.path.basename(os.path.normpath(run_dir)))
+    if match is None:
+        return None
+    return datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').isoformat()
+
+
+class ResultsCatalog:
+    """
+    Catálogo SQLite dos resultados em resultados/run_*
+
+    Args:
+        resultados_dir (str): Pasta com os run_*
+        db_path (str): Caminho do SQLite (padrão: resultados_dir/catalog.sqlite)
+    """
+
+    def __init__(self, resultados_dir=DEFAULT_RESULTADOS_DIR, db_path=None):
+        self.resultados_dir = resultados_dir
+        self.db_path = db_path or os.path.join(resultados_dir, DEFAULT_CATALOG_NAME)
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        self.conn = sqlite3.connect(self.db_path)
+        metric_defs = ', '.join(f'{m} REAL' for m in METRIC_COLUMNS)
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS results (
+                run_dir TEXT,
+                hour INTEGER,
+                symbol TEXT,
+                strategy TEXT,
+                timeframe TEXT,
+                run_timestamp TEXT,
+                data_ini TEXT,
+                data_fim TEXT,
+                optimize_metric TEXT,
+                direction TEXT,
+                best_value REAL,
+                {metric_defs},
+                params TEXT,
+                metrics TEXT,
+                PRIMARY KEY (run_dir, hour)
+            );
+            CREATE TABLE IF NOT EXISTS ingested_files (
+                path TEXT PRIMARY KEY,
+                mtime REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_results_key
+                ON results (symbol, strategy, timeframe, hour);
+            CREATE INDEX IF NOT EXISTS idx_results_calmar ON results (calmar_ratio);
+            CREATE INDEX IF NOT EXISTS idx_results_sharpe ON results (sharpe_ratio);
+            CREATE INDEX IF NOT EXISTS idx_results_sortino ON results (sortino_ratio);
+        """)
+        self.conn.commit()
+
+    def _is_ingested(self, path):
+        """Verifica se o arquivo já foi ingerido com o mesmo mtime"""
+        row = self.conn.execute('SELECT mtime FROM ingested_files WHERE path = ?', (path,)).fetchone()
+        return row is not None and row[0] == os.path.getmtime(path)
+
+    def _mark_ingested(self, path):
+        self.conn.execute('INSERT OR REPLACE INTO ingested_files VALUES (?, ?)',
+                          (path, os.path.getmtime(path)))
+
+    def purge_missing(self):
+        """
+        Remove as linhas cujo results_hour_*.json não existe mais (run ou hora apagados)
+
+        Returns:
+            int: Quantidade de linhas removidas
+        """
+        rows = self.conn.execute('SELECT run_dir, hour FROM results').fetchall()
+        missing = [(run_dir, hour) for run_dir, hour in rows
+                   if not os.path.exists(hour_result_path(os.path.join(self.resultados_dir, run_dir), hour))]
+        self.conn.executemany('DELETE FROM results WHERE run_dir = ? AND hour = ?', missing)
+
+        paths = [row[0] for row in self.conn.execute('SELECT path FROM ingested_files').fetchall()]
+        self.conn.executemany('DELETE FROM ingested_files WHERE path = ?',
+                              [(p,) for p in paths if not os.path.exists(p)])
+        self.conn.commit()
+        return len(missing)
+
+    def update(self, verbose=True):
+        """
+        Ingere runs e resultados novos ou modificados e remove os apagados
+
+        Returns:
+            int: Quantidade de linhas (run/hora) inseridas ou atualizadas
+        """
+        removed = self.purge_missing()
+        updated = 0
+
+        for config_path in sorted(glob.glob(os.path.join(self.resultados_dir, 'run_*', 'config.json'))):
+            run_dir = os.path.dirname(config_path)
+            result_paths = sorted(glob.glob(os.path.join(run_dir, 'results_hour_*.json')))
+
+            config_changed = not self._is_ingested(config_path)
+            pending = [p for p in result_paths if config_changed or not self._is_ingested(p)]
+            if not pending:
+                continue
+
+            try:
+                config = load_json(config_path)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Erro ao ler {config_path}: {e}")
+                continue
+
+            for result_path in pending:
+                try:
+                    result = load_json(result_path)
+                except (OSError, json.JSONDecodeError) as e:
+                    print(f"Erro ao ler {result_path}: {e}")
+                    continue
+
+                self._insert(run_dir, config, result)
+                self._mark_ingested(result_path)
+                updated += 1
+
+            self._mark_ingested(config_path)
+            self.conn.commit()
+
+        if verbose:
+            print(f"Catálogo atualizado: {updated} resultado(s) novo(s) ou modificado(s), "
+                  f"{removed} removido(s)")
+        return updated
+
+    def _insert(self, run_dir, config, result):
+        """Insere (ou substitui) a linha de uma hora de um run"""
+        metrics = dict(result.get('metrics') or {})
+        if 'trades' not in metrics and 'total_trades' in metrics:
+            metrics['trades'] = metrics['total_trades']
+
+        row = [
+            os.path.basename(os.path.normpath(run_dir)),
+            result['hour'],
+            config.get('symbol'),
+            config.get('strategy'),
+            config.get('timeframe'),
+            parse_run_timestamp(run_dir),
+            config.get('data_ini'),
+            config.get('data_fim'),
+            result.get('optimize_metric', config.get('optimize_metric')),
+            result.get('direction', config.get('direction')),
+            result.get('best_value'),
+        ]
+        row += [metrics.get(m) for m in METRIC_COLUMNS]
+        row += [json.dumps(result.get('best_params', {})), json.dumps(metrics)]
+
+        placeholders = ', '.join('?' * len(row))
+        self.conn.execute(f'INSERT OR REPLACE INTO results VALUES ({placeholders})', row)
+
+    def query(self, symbol=None, strategy=None, timeframe=None, hours=None, min_trades=None,
+              min_values=None, order_by='calmar_ratio', ascending=False, limit=None,
+              best_per_hour=False):
+        """
+        Filtra e ranqueia os resultados do catálogo
+
+        Args:
+            symbol (str): Filtra por símbolo
+            strategy (str): Filtra por estratégia
+            timeframe (str): Filtra por timeframe
+            hours (list): Filtra por horas
+            min_trades (int): Número mínimo de trades
+            min_values (dict): Valor mínimo por métrica, ex: {'sharpe_ratio': 1.0}
+            order_by (str): Métrica de ordenação
+            ascending (bool): Ordem crescente
+            limit (int): Quantidade máxima de linhas
+            best_per_hour (bool): Mantém só o melhor run de cada símbolo/estratégia/timeframe/hora
+
+        Returns:
+            pandas.DataFrame: Resultados com params como dict
+        """
+        if order_by not in METRIC_COLUMNS + ['best_value', 'run_timestamp']:
+            raise ValueError(f"Coluna de ordenação inválida: {order_by}")
+
+        where, args = [], []
+        for column, value in [('symbol', symbol), ('strategy', strategy), ('timeframe', timeframe)]:
+            if value is not None:
+                where.append(f'{column} = ?')
+                args.append(value)
+        if hours:
+            where.append(f"hour IN ({', '.join('?' * len(hours))})")
+            args += list(hours)
+        if min_trades is not None:
+            where.append('trades >= ?')
+            args.append(min_trades)
+        for metric, value in (min_values or {}).items():
+            if metric not in METRIC_COLUMNS:
+                raise ValueError(f"Métrica inválida: {metric}")
+            where.append(f'{metric} >= ?')
+            args.append(value)
+
+        order = 'ASC' if ascending else 'DESC'
+        sql = 'SELECT * FROM results'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+
+        if best_per_hour:
+            sql = (
+                f"SELECT * FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY symbol, strategy, "
+                f"timeframe, hour ORDER BY {order_by} {order}) AS rank FROM ({sql})) WHERE rank = 1"
+            )
+        sql += f' ORDER BY {order_by} {order}'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            args.append(limit)
+
+        df = pd.read_sql_query(sql, self.conn, params=args)
+        df['params'] = df['params'].apply(json.loads)
+        df['metrics'] = df['metrics'].apply(json.loads)
+        return df.drop(columns=['rank'], errors='ignore')
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    """Atualiza o catálogo e mostra o ranking"""
+    parser = argparse.ArgumentParser(description='Catálogo de resultados de otimização')
+    parser.add_argument('--resultados', default=DEFAULT_RESULTADOS_DIR)
+    parser.add_argument('--symbol')
+    parser.add_argument('--strategy')
+    parser.add_argument('--timeframe')
+    parser.add_argument('--min-trades', type=int)
+    parser.add_argument('--order-by', default='calmar_ratio')
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    catalog = ResultsCatalog(args.resultados)
+    catalog.update()
+
+    df = catalog.query(
+        symbol=args.symbol, strategy=args.strategy, timeframe=args.timeframe,
+        min_trades=args.min_trades, order_by=args.order_by, limit=args.limit
+    )
+    columns = ['run_dir', 'hour', 'symbol', 'strategy', 'timeframe'] + METRIC_COLUMNS
+    print(df[columns].to_string(index=False))
+    catalog.close()
+
+
+if __name__ == '__main__':
+    main()
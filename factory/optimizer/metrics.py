@@ -0,0 +1,86 @@
+"""
+Métricas de desempenho calculadas a partir da coluna 'strategy'
+(resultado financeiro por candle) dos resultados do Backtester.
+
+Usadas quando o resultado é montado em partes (janelas, blocos por ano),
+situação em que as métricas do Backtester não estão disponíveis para o
+período completo. As definições não são idênticas às do Backtester, por
+isso os arquivos gravados indicam a origem de cada valor (metrics_source,
+best_value_source): SOURCE_BACKTESTER ou SOURCE_COMPUTED.
+"""
+
+import numbers
+
+import numpy as np
+
+
+# Origem das métricas gravadas nos results_hour_*.json e config.json
+SOURCE_BACKTESTER = 'backtester'
+SOURCE_COMPUTED = 'compute_metrics'
+
+
+def numeric_metrics(metrics):
+    """Apenas as métricas numéricas (as do Backtester incluem campos não numéricos)"""
+    return {k: float(v) for k, v in metrics.items() if isinstance(v, numbers.Number)}
+
+
+def compute_metrics(pnl, initial_cash=30000, periods_per_year=252):
+    """
+    Calcula as métricas principais a partir do resultado por candle
+
+    Args:
+        pnl (pandas.Series): Resultado financeiro por candle, indexado por tempo
+        initial_cash (float): Capital inicial
+        periods_per_year (int): Dias de pregão por ano para anualização
+
+    Returns:
+        dict: Métricas com as mesmas chaves dos results_hour_*.json
+    """
+    pnl = pnl.fillna(0)
+    trades = pnl[pnl != 0]
+
+    metrics = {
+        'sortino_ratio': 0.0,
+        'sharpe_ratio': 0.0,
+        'calmar_ratio': 0.0,
+        'profit_factor': 0.0,
+        'win_rate': 0.0,
+        'max_drawdown': 0.0,
+        'total_return': float(pnl.sum()),
+        'trades': int(len(trades))
+    }
+
+    if pnl.empty or trades.empty:
+        return metrics
+
+    # Retornos diários sobre o patrimônio
+    daily = pnl.groupby(pnl.index.normalize()).sum()
+    equity_daily = initial_cash + daily.cumsum()
+    prev_equity = equity_daily.shift(1).fillna(initial_cash)
+    returns = daily / prev_equity
+
+    std = returns.std()
+    if std > 0:
+        metrics['sharpe_ratio'] = float(returns.mean() / std * np.sqrt(periods_per_year))
+
+    downside = returns[returns < 0].std()
+    if downside > 0:
+        metrics['sortino_ratio'] = float(returns.mean() / downside * np.sqrt(periods_per_year))
+
+    # Drawdown máximo (fração do pico de patrimônio)
+    equity = initial_cash + pnl.cumsum()
+    peak = equity.cummax()
+    max_dd = float(((peak - equity) / peak).max())
+    metrics['max_drawdown'] = max_dd
+
+    years = max((pnl.index[-1] - pnl.index[0]).days / 365.25, 1 / periods_per_year)
+    annual_return = metrics['total_return'] / initial_cash / years
+    if max_dd > 0:
+        metrics['calmar_ratio'] = float(annual_return / max_dd)
+
+    gains = trades[trades > 0].sum()
+    losses = -trades[trades < 0].sum()
+    metrics['profit_factor'] = float(gains / losses) if losses > 0 else float(gains > 0)
+    metrics['win_rate'] = float((trades > 0).mean())
+
+    return metrics
@@ -0,0 +1,216 @@
+"""
+Teste de robustez por Monte Carlo de uma estratégia.
+
+Antes de promover uma configuração para selected/, a lista de trades é
+perturbada milhares de vezes para medir a fragilidade das métricas:
+
+    - shuffle: reordena os trades (mesmo resultado final, drawdown diferente)
+    - bootstrap: reamostra trades com reposição
+    - skip: descarta cada trade com probabilidade skip_prob (ordens perdidas)
+    - cost: soma um custo/slippage extra aleatório em cada trade
+
+Todas as simulações são feitas como operações matriciais NumPy
+(simulações x trades), em lotes para limitar a memória.
+
+Exemplo:
+
+    from optimizer.monte_carlo import trades_from_results, run_robustness
+
+    trades = trades_from_results(results)          # results do Backtester, um valor por trade
+    ci = run_robustness(trades, n_sims=10000, skip_prob=0.1, cost_shock=2.0)
+"""
+
+import numpy as np
+import pandas as pd
+
+
+SCENARIOS = ['shuffle', 'bootstrap', 'skip', 'cost', 'combined']
+
+
+def trades_from_results(results, column='strategy', position_column='position'):
+    """
+    Extrai a lista de trades (resultado financeiro) dos resultados de um backtest
+
+    Nos resultados do Backtester (e nos CSVs combinados de controle/) a
+    posição só é não nula no candle de sinal, e é nessa linha que fica o
+    resultado do trade. Cada linha com posição não nula é um trade, mesmo
+    quando sinais na mesma direção aparecem em candles seguidos. Sem a
+    coluna de posição, cada candle com resultado conta como um trade.
+
+    Args:
+        results (pandas.DataFrame): Resultados do Backtester ou CSV de backtest_results/
+        column (str): Coluna com o resultado de cada trade
+        position_column (str): Coluna com a posição de cada candle
+
+    Returns:
+        pandas.Series: Resultado de cada trade, indexado pelo tempo do candle de sinal
+    """
+    pnl = results[column].fillna(0)
+    if position_column not in results:
+        return pnl[pnl != 0]
+    return pnl[results[position_column].fillna(0) != 0]
+
+
+def trades_from_backtest_csv(csv_path):
+    """Lê um backtest_*.csv de controle/backtest_results e extrai os trades"""
+    df = pd.read_csv(csv_path, index_col=0, parse_dates=True)
+    return trades_from_results(df)
+
+
+def period_years(trades):
+    """Duração do período dos trades em anos (1.0 se não houver índice de tempo)"""
+    if isinstance(trades, pd.Series) and isinstance(trades.index, pd.DatetimeIndex) and len(trades) > 1:
+        return max((trades.index[-1] - trades.index[0]).days / 365.25, 1 / 252)
+    return 1.0
+
+
+def simulate_paths(pnl, n_sims, rng, scenario='shuffle', skip_prob=0.1, cost_shock=0.0):
+    """
+    Gera a matriz de resultados por trade de cada simulação
+
+    Args:
+        pnl (numpy.ndarray): Resultado de cada trade (1D)
+        n_sims (int): Número de simulações
+        rng (numpy.random.Generator): Gerador aleatório
+        scenario (str): Um dos SCENARIOS
+        skip_prob (float): Probabilidade de um trade ser descartado
+        cost_shock (float): Custo extra máximo por trade (uniforme entre 0 e cost_shock)
+
+    Returns:
+        numpy.ndarray: Matriz (n_sims, n_trades)
+    """
+    n_trades = len(pnl)
+
+    if scenario == 'shuffle':
+        return rng.permuted(np.broadcast_to(pnl, (n_sims, n_trades)), axis=1)
+
+    if scenario == 'bootstrap':
+        return pnl[rng.integers(0, n_trades, size=(n_sims, n_trades))]
+
+    if scenario == 'skip':
+        return np.where(rng.random((n_sims, n_trades)) < skip_prob, 0.0, pnl)
+
+    if scenario == 'cost':
+        return pnl - rng.uniform(0.0, cost_shock, size=(n_sims, n_trades))
+
+    if scenario == 'combined':
+        paths = pnl[rng.integers(0, n_trades, size=(n_sims, n_trades))]
+        paths = paths - rng.uniform(0.0, cost_shock, size=(n_sims, n_trades))
+        return np.where(rng.random((n_sims, n_trades)) < skip_prob, 0.0, paths)
+
+    raise ValueError(f"Cenário inválido: {scenario}. Use um de {SCENARIOS}")
+
+
+def path_metrics(paths, initial_cash=30000, years=1.0):
+    """
+    Calcula métricas de cada simulação (vetorizado nas linhas)
+
+    Args:
+        paths (numpy.ndarray): Matriz (n_sims, n_trades) de resultados por trade
+        initial_cash (float): Capital inicial
+        years (float): Duração do período original em anos (para anualizar)
+
+    Returns:
+        dict: Arrays com total_return, max_drawdown e calmar_ratio por simulação
+    """
+    equity = initial_cash + np.cumsum(paths, axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), initial_cash)
+    max_drawdown = ((peak - equity) / peak).max(axis=1)
+
+    total_return = equity[:, -1] - initial_cash
+    annual_return = total_return / initial_cash / years
+    with np.errstate(divide='ignore', invalid='ignore'):
+        calmar = np.where(max_drawdown > 0, annual_return / max_drawdown, np.nan)
+
+    return {'total_return': total_return, 'max_drawdown': max_drawdown, 'calmar_ratio': calmar}
+
+
+def monte_carlo(trades, n_sims=5000, scenario='shuffle', initial_cash=30000, skip_prob=0.1,
+                cost_shock=0.0, batch_size=2000, seed=None):
+    """
+    Executa as simulações de um cenário
+
+    Args:
+        trades (pandas.Series): Resultado de cada trade, indexado por tempo
+        n_sims (int): Número de simulações
+        scenario (str): Um dos SCENARIOS
+        initial_cash (float): Capital inicial
+        skip_prob (float): Probabilidade de descarte de trade (skip/combined)
+        cost_shock (float): Custo extra máximo por trade (cost/combined)
+        batch_size (int): Simulações por lote (limita memória)
+        seed (int): Semente para reprodutibilidade
+
+    Returns:
+        pandas.DataFrame: Uma linha por simulação com total_return, max_drawdown, calmar_ratio
+    """
+    pnl = np.asarray(trades, dtype=float)
+    if len(pnl) == 0:
+        raise ValueError("Lista de trades vazia")
+
+    years = period_years(trades)
+
+    rng = np.random.default_rng(seed)
+    results = []
+    for start in range(0, n_sims, batch_size):
+        size = min(batch_size, n_sims - start)
+        paths = simulate_paths(pnl, size, rng, scenario, skip_prob, cost_shock)
+        results.append(pd.DataFrame(path_metrics(paths, initial_cash, years)))
+
+    return pd.concat(results, ignore_index=True)
+
+
+def summarize(sims, original=None, quantiles=(0.05, 0.5, 0.95)):
+    """
+    Resume as simulações em intervalos de confiança
+
+    Args:
+        sims (pandas.DataFrame): Saída de monte_carlo
+        original (dict): Métricas da sequência original (opcional)
+        quantiles (tuple): Quantis reportados
+
+    Returns:
+        pandas.DataFrame: Uma linha por métrica com os quantis
+    """
+    summary = sims.quantile(list(quantiles)).T
+    summary.columns = [f'p{int(q * 100):02d}' for q in quantiles]
+    summary['mean'] = sims.mean()
+    if original is not None:
+        summary['original'] = pd.Series(original)
+    return summary
+
+
+def run_robustness(trades, scenarios=None, n_sims=5000, initial_cash=30000, skip_prob=0.1,
+                   cost_shock=0.0, seed=None):
+    """
+    Executa todos os cenários e junta os intervalos de confiança
+
+    Args:
+        trades (pandas.Series): Resultado de cada trade
+        scenarios (list): Cenários a rodar (padrão: todos; 'cost' só com cost_shock > 0)
+        n_sims (int): Simulações por cenário
+        initial_cash (float): Capital inicial
+        skip_prob (float): Probabilidade de descarte de trade
+        cost_shock (float): Custo extra máximo por trade
+        seed (int): Semente
+
+    Returns:
+        pandas.DataFrame: Índice (cenário, métrica) com quantis, média e valor original,
+                          mais prob_loss (fração de simulações com resultado negativo)
+    """
+    if scenarios is None:
+        scenarios = [s for s in SCENARIOS if s != 'cost' or cost_shock > 0]
+
+    pnl = np.asarray(trades, dtype=float)
+    years = period_years(trades)
+    original = {k: float(v[0]) for k, v in path_metrics(pnl[None, :], initial_cash, years).items()}
+
+    tables = []
+    for i, scenario in enumerate(scenarios):
+        sims = monte_carlo(trades, n_sims, scenario, initial_cash, skip_prob, cost_shock,
+                           seed=None if seed is None else seed + i)
+        table = summarize(sims, original)
+        table['prob_loss'] = float((sims['total_return'] < 0).mean())
+        table.index = pd.MultiIndex.from_product([[scenario], table.index], names=['scenario', 'metric'])
+        tables.append(table)
+
+    return pd.concat(tables)
@@ -0,0 +1,50 @@
+"""
+Funções objetivo do Optuna para otimização por hora no período completo.
+"""
+
+from .metrics import numeric_metrics
+from .params import suggest_params
+from .session import OptimizerSession
+from .trial_cache import strategy_fingerprint
+
+
+def make_objective(config, signal_function, param_ranges, hour, fixed_params=None,
+                   optimize_metric='calmar_ratio', cache=None, session=None):
+    """
+    Cria a função objetivo de uma hora (backtest no período completo)
+
+    Args:
+        config (dict): Configuração do run (formato do config.json)
+        signal_function (callable): Função de entrada (entries.py)
+        param_ranges (dict): Ranges dos parâmetros
+        hour (int): Hora otimizada (vira allowed_hours=[hour])
+        fixed_params (dict): Parâmetros fixos
+        optimize_metric (str): Métrica otimizada
+        cache (TrialCache): Cache persistente de trials (opcional)
+        session (OptimizerSession): Sessão com dados/sinais em memória
+            (padrão: uma sessão nova, compartilhada pelos trials deste objetivo)
+
+    Returns:
+        callable: Função objective(trial)
+    """
+    strategy = strategy_fingerprint(signal_function)
+    session = session or OptimizerSession(config, signal_function)
+
+    def objective(trial):
+        params = suggest_params(trial, param_ranges, fixed_params)
+        params['allowed_hours'] = [hour]
+
+        metrics = cache.get(config, strategy, hour, params) if cache is not None else None
+        if metrics is None:
+            _, metrics = session.evaluate(params, config['data_ini'], config['data_fim'])
+            metrics = numeric_metrics(metrics)
+            if cache is not None:
+                cache.put(config, strategy, hour, params, metrics)
+        else:
+            trial.set_user_attr('cached', True)
+
+        trial.set_user_attr('metrics', metrics)
+        return metrics[optimize_metric]
+
+    return objective
+
@@ -0,0 +1,66 @@
+"""
+Utilitários para sugerir e separar parâmetros de estratégia a partir
+dos ranges no mesmo formato usado pelo StrategyOptimizer (param_ranges).
+"""
+
+
+def suggest_params(trial, param_ranges, fixed_params=None):
+    """
+    Sugere um conjunto de parâmetros para um trial do Optuna
+
+    Formatos aceitos em param_ranges (iguais ao config.json dos runs):
+        - (min, max): inteiro se ambos forem int, senão float contínuo
+        - (min, max, step): float (ou int, se todos forem int) discretizado
+        - [a, b, c]: categórico
+
+    Args:
+        trial (optuna.Trial): Trial atual
+        param_ranges (dict): Ranges dos parâmetros
+        fixed_params (dict): Parâmetros fixos (não otimizados)
+
+    Returns:
+        dict: Parâmetros sugeridos (incluindo os fixos)
+    """
+    params = {}
+
+    for name, spec in param_ranges.items():
+        if isinstance(spec, list) and not _is_numeric_range(spec):
+            params[name] = trial.suggest_categorical(name, spec)
+        elif len(spec) == 3:
+            low, high, step = spec
+            if all(isinstance(v, int) for v in spec):
+                params[name] = trial.suggest_int(name, low, high, step=step)
+            else:
+                params[name] = trial.suggest_float(name, low, high, step=step)
+        else:
+            low, high = spec
+            if isinstance(low, int) and isinstance(high, int):
+                params[name] = trial.suggest_int(name, low, high)
+            else:
+                params[name] = trial.suggest_float(name, low, high)
+
+    if fixed_params:
+        params.update(fixed_params)
+
+    return params
+
+
+def _is_numeric_range(spec):
+    """Listas vindas do JSON ([2.0, 32.0, 0.1]) também representam ranges"""
+    return len(spec) in (2, 3) and all(
+        isinstance(v, (int, float)) and not isinstance(v, bool) for v in spec
+    )
+
+
+def split_params(params):
+    """
+    Separa tp/sl (passados ao Backtester) dos argumentos da função de sinal
+
+    Args:
+        params (dict): Parâmetros completos do trial
+
+    Returns:
+        tuple: (tp, sl, signal_args)
+    """
+    signal_args = {k: v for k, v in params.items() if k not in ['tp', 'sl']}
+    return params.get('tp', 0.15), params.get('sl', 0.15), signal_args
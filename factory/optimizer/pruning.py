@@ -0,0 +1,259 @@
+"""
+Otimização por hora com poda (pruning) de trials pouco promissores.
+
+Em vez de rodar o período completo (ex: 2019-2025) antes de o Optuna ver
+um valor, cada trial roda o backtest em blocos consecutivos (por padrão,
+um por ano). Após cada bloco a métrica acumulada é reportada ao Optuna e,
+se o pruner considerar o trial sem chances, ele é interrompido.
+
+Exemplo (no notebook factory):
+
+    from optimizer.pruning import optimize_hours_pruned
+
+    studies = optimize_hours_pruned(
+        config=config,                   # mesmo formato do config.json
+        signal_function=entry,
+        param_ranges=param_ranges,
+        hours=[9, 10, 11],
+        num_trials=65,
+        optimize_metric='calmar_ratio'
+    )
+"""
+
+import optuna
+import pandas as pd
+
+from .metrics import compute_metrics, numeric_metrics, SOURCE_BACKTESTER, SOURCE_COMPUTED
+from .params import suggest_params
+from .session import OptimizerSession
+from .results import create_run_dir, save_json, save_hour_result
+from .trial_cache import strategy_fingerprint
+from .warm_start import prior_params, cached_params, enqueue_prior_trials
+
+
+def build_chunks(data_ini, data_fim, freq='YS'):
+    """
+    Divide o período em blocos consecutivos
+
+    Args:
+        data_ini (str): Data inicial
+        data_fim (str): Data final (inclusive)
+        freq (str): Frequência das fronteiras (pandas), 'YS' = início de cada ano
+
+    Returns:
+        list: Lista de tuplas (ini, fim) como strings 'YYYY-MM-DD'
+    """
+    ini = pd.Timestamp(data_ini)
+    fim = pd.Timestamp(data_fim)
+
+    edges = [ini] + [b for b in pd.date_range(ini, fim, freq=freq) if b > ini]
+    edges.append(fim + pd.Timedelta(days=1))
+
+    return [
+        (edges[i].strftime('%Y-%m-%d'), (edges[i + 1] - pd.Timedelta(days=1)).strftime('%Y-%m-%d'))
+        for i in range(len(edges) - 1)
+    ]
+
+
+def make_pruned_objective(config, signal_function, param_ranges, hour, fixed_params=None,
+                          optimize_metric='calmar_ratio', chunks=None, chunk_freq='YS',
+                          warmup_days=5, cache=None, session=None):
+    """
+    Cria a função objetivo de uma hora com relatório intermediário por bloco
+
+    Cada bloco é rodado com alguns dias de aquecimento antes do início, para
+    que os indicadores já estejam estáveis; os candles de aquecimento são
+    descartados. Com daytrade=True não há trades atravessando blocos, então o
+    resultado concatenado equivale ao do período completo.
+
+    Args:
+        config (dict): Configuração do run (formato do config.json)
+        signal_function (callable): Função de entrada (entries.py)
+        param_ranges (dict): Ranges dos parâmetros
+        hour (int): Hora otimizada (vira allowed_hours=[hour])
+        fixed_params (dict): Parâmetros fixos
+        optimize_metric (str): Métrica reportada/otimizada
+        chunks (list): Blocos (ini, fim); se None, usa build_chunks
+        chunk_freq (str): Frequência dos blocos quando chunks é None
+        warmup_days (int): Dias de aquecimento antes de cada bloco
+        cache (TrialCache): Cache persistente de trials (opcional); só
+            trials completos são armazenados
+        session (OptimizerSession): Sessão com dados/sinais em memória
+            (padrão: uma sessão nova, com um Backtester por bloco reaproveitado
+            por todos os trials)
+
+    Returns:
+        callable: Função objective(trial)
+    """
+    if chunks is None:
+        chunks = build_chunks(config['data_ini'], config['data_fim'], chunk_freq)
+    initial_cash = config.get('initial_cash', 30000)
+    strategy = strategy_fingerprint(signal_function)
+    session = session or OptimizerSession(config, signal_function)
+
+    def objective(trial):
+        params = suggest_params(trial, param_ranges, fixed_params)
+        params['allowed_hours'] = [hour]
+
+        if cache is not None:
+            metrics = cache.get(config, strategy, hour, params, source='chunked')
+            if metrics is not None:
+                trial.set_user_attr('cached', True)
+                trial.set_user_attr('metrics', metrics)
+                return metrics[optimize_metric]
+
+        parts = []
+        metrics = compute_metrics(pd.Series(dtype=float), initial_cash)
+
+        for step, (ini, fim) in enumerate(chunks):
+            warmup_ini = (pd.Timestamp(ini) - pd.Timedelta(days=warmup_days)).strftime('%Y-%m-%d')
+            results, _ = session.evaluate(params, warmup_ini, fim)
+
+            parts.append(results['strategy'].loc[ini:])
+            metrics = compute_metrics(pd.concat(parts), initial_cash)
+
+            trial.report(metrics[optimize_metric], step)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+
+        if cache is not None:
+            cache.put(config, strategy, hour, params, metrics, source='chunked')
+
+        trial.set_user_attr('metrics', metrics)
+        return metrics[optimize_metric]
+
+    return objective
+
+
+def final_run_metrics(session, params):
+    """
+    Métricas do Backtester no período completo para os parâmetros escolhidos
+
+    O valor otimizado com poda vem de compute_metrics sobre os blocos; o
+    results_hour_XX.json grava as métricas do Backtester (mesma definição dos
+    runs sem poda) e guarda as dos blocos em chunked_metrics.
+    """
+    _, metrics = session.evaluate(params)
+    return numeric_metrics(metrics)
+
+
+def create_pruned_study(direction='maximize', n_startup_trials=10, n_warmup_steps=1, pruner=None):
+    """
+    Cria um study com MedianPruner (padrão)
+
+    Args:
+        direction (str): 'maximize' ou 'minimize'
+        n_startup_trials (int): Trials completos antes de começar a podar
+        n_warmup_steps (int): Blocos mínimos antes de um trial poder ser podado
+        pruner (optuna.pruners.BasePruner): Pruner alternativo
+
+    Returns:
+        optuna.Study: Study configurado
+    """
+    if pruner is None:
+        pruner = optuna.pruners.MedianPruner(
+            n_startup_trials=n_startup_trials,
+            n_warmup_steps=n_warmup_steps
+        )
+    return optuna.create_study(direction=direction, pruner=pruner)
+
+
+def optimize_hours_pruned(config, signal_function, param_ranges, hours, fixed_params=None,
+                          num_trials=65, optimize_metric='calmar_ratio', direction='maximize',
+                          export_dir='./resultados', chunk_freq='YS', n_startup_trials=10,
+                          n_warmup_steps=1, pruner=None, cache=None,
+                          warm_start_dir=None, warm_start_top_k=5):
+    """
+    Otimiza cada hora com poda e exporta no layout de resultados/
+
+    Args:
+        config (dict): Configuração base (symbol, timeframe, datas, custos, path_base...)
+        signal_function (callable): Função de entrada (entries.py)
+        param_ranges (dict): Ranges dos parâmetros
+        hours (list): Horas a otimizar
+        fixed_params (dict): Parâmetros fixos
+        num_trials (int): Trials por hora
+        optimize_metric (str): Métrica otimizada
+        direction (str): 'maximize' ou 'minimize'
+        export_dir (str): Pasta base dos runs
+        chunk_freq (str): Frequência dos blocos
+        n_startup_trials (int): Trials completos antes de começar a podar
+        n_warmup_steps (int): Blocos mínimos antes de podar
+        pruner (optuna.pruners.BasePruner): Pruner alternativo
+        cache (TrialCache): Cache persistente de trials (opcional)
+        warm_start_dir (str): Pasta de runs anteriores para warm start (ex: './resultados')
+        warm_start_top_k (int): Conjuntos de parâmetros enfileirados por hora
+
+    Returns:
+        dict: Study de cada hora
+    """
+    strategy = signal_function.__name__
+    run_dir = create_run_dir(export_dir, config['symbol'], strategy, config['timeframe'])
+
+    run_config = dict(config)
+    run_config.update({
+        'num_trials': num_trials,
+        'export_dir': export_dir,
+        'param_ranges': param_ranges,
+        'fixed_params': fixed_params or {},
+        'strategy': strategy,
+        'strategy_fingerprint': strategy_fingerprint(signal_function),
+        'optimize_metric': optimize_metric,
+        'direction': direction,
+        'pruning': {'chunk_freq': chunk_freq, 'n_startup_trials': n_startup_trials,
+                    'n_warmup_steps': n_warmup_steps}
+    })
+    save_json(f"{run_dir}/config.json", run_config)
+
+    chunks = build_chunks(config['data_ini'], config['data_fim'], chunk_freq)
+    print(f"Run: {run_dir}")
+    print(f"Blocos de avaliação: {len(chunks)} ({chunks[0][0]} a {chunks[-1][1]})")
+
+    session = OptimizerSession(config, signal_function)
+    studies = {}
+    for hour in hours:
+        print(f"\nOtimizando hora {hour:02d}...")
+
+        objective = make_pruned_objective(
+            config, signal_function, param_ranges, hour, fixed_params,
+            optimize_metric, chunks, cache=cache, session=session
+        )
+        study = create_pruned_study(direction, n_startup_trials, n_warmup_steps, pruner)
+
+        seeds = []
+        if warm_start_dir is not None:
+            seeds += prior_params(
+                warm_start_dir, config['symbol'], strategy, hour, param_ranges,
+                config['timeframe'], warm_start_top_k, optimize_metric, direction
+            )
+        if cache is not None and warm_start_top_k:
+            seeds += [p for p in cached_params(cache, config, signal_function, hour, param_ranges,
+                                               warm_start_top_k, optimize_metric, direction)
+                      if p not in seeds]
+        if seeds:
+            print(f"Warm start: {enqueue_prior_trials(study, seeds)} conjuntos enfileirados")
+        study.optimize(objective, n_trials=num_trials)
+        studies[hour] = study
+
+        states = [t.state for t in study.trials]
+        n_pruned = states.count(optuna.trial.TrialState.PRUNED)
+        n_complete = states.count(optuna.trial.TrialState.COMPLETE)
+        n_cached = sum(1 for t in study.trials if t.user_attrs.get('cached'))
+        print(f"Hora {hour:02d}: {n_complete} completos ({n_cached} do cache), {n_pruned} podados")
+
+        if n_complete == 0:
+            print(f"Nenhum trial completo para a hora {hour:02d}")
+            continue
+
+        best = study.best_trial
+        best_params = dict(best.params)
+        best_params.update(fixed_params or {})
+        best_params['allowed_hours'] = [hour]
+
+        save_hour_result(
+            run_dir, hour, best_params, best.value, final_run_metrics(session, best_params),
+            optimize_metric, direction, n_pruned=n_pruned, metrics_source=SOURCE_BACKTESTER,
+            best_value_source=SOURCE_COMPUTED, chunked_metrics=best.user_attrs['metrics']
+        )
+
+    return studies
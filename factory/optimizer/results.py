@@ -0,0 +1,82 @@
+"""
+Leitura e escrita dos arquivos de run em resultados/
+(config.json e results_hour_XX.json), no mesmo layout do StrategyOptimizer.
+"""
+
+import os
+import json
+from datetime import datetime
+
+
+def create_run_dir(export_dir, symbol, strategy, timeframe, timestamp=None):
+    """
+    Cria a pasta run_{symbol}_{strategy}_{timeframe}_{timestamp}
+
+    Args:
+        timestamp (str): Timestamp fixo (padrão: agora); usado para retomar runs
+
+    Returns:
+        str: Caminho da pasta criada
+    """
+    timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+    run_dir = os.path.join(export_dir, f"run_{symbol}_{strategy}_{timeframe}_{timestamp}")
+    os.makedirs(run_dir, exist_ok=True)
+    return run_dir
+
+
+def save_json(path, data):
+    """
+    Salva um dicionário em JSON com indentação de 4 espaços
+
+    A escrita é atômica (arquivo temporário + os.replace), para que uma
+    interrupção nunca deixe um JSON pela metade em resultados/.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def load_json(path):
+    """Carrega um arquivo JSON"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def hour_result_path(run_dir, hour):
+    """Caminho do results_hour_XX.json de uma hora"""
+    return os.path.join(run_dir, f"results_hour_{hour:02d}.json")
+
+
+def save_hour_result(run_dir, hour, best_params, best_value, metrics,
+                     optimize_metric, direction, **extra):
+    """
+    Salva o melhor resultado de uma hora no formato results_hour_XX.json
+
+    Args:
+        run_dir (str): Pasta do run
+        hour (int): Hora otimizada
+        best_params (dict): Melhores parâmetros (incluindo allowed_hours, tp, sl)
+        best_value (float): Valor da métrica otimizada
+        metrics (dict): Métricas completas do melhor trial
+        optimize_metric (str): Nome da métrica otimizada
+        direction (str): 'maximize' ou 'minimize'
+        **extra: Campos adicionais (ex: n_pruned, metrics_source, best_value_source)
+
+    Returns:
+        str: Caminho do arquivo salvo
+    """
+    data = {
+        'hour': hour,
+        'best_params': best_params,
+        'best_value': best_value,
+        'raw_best_value': best_value,
+        'optimize_metric': optimize_metric,
+        'direction': direction,
+        'metrics': metrics
+    }
+    data.update(extra)
+
+    path = hour_result_path(run_dir, hour)
+    save_json(path, data)
+    return path
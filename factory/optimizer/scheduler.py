@@ -0,0 +1,322 @@
+"""
+Agendador de varreduras (sweeps) multi-símbolo com retomada.
+
+Uma varredura é o produto símbolos x estratégias x timeframes x horas.
+Cada combinação vira um job (otimização de uma hora), executado em um
+pool local de processos limitado por CPU e memória. Cada job concluído
+é gravado como results_hour_XX.json no run_* correspondente em
+resultados/, e o estado da varredura fica em resultados/sweeps/{nome}.json.
+Se o processo cair, rodar a mesma varredura de novo pula os jobs já
+concluídos.
+
+Exemplo:
+
+    from optimizer.scheduler import run_sweep
+
+    run_sweep(
+        name='fx_majors_bb',
+        symbols=['EURUSD', 'GBPUSD', 'USDJPY'],
+        strategies=['bb_trend', 'bb_anti_trend'],
+        timeframes=['t5'],
+        hours=[9, 10, 11, 12, 13, 14, 15, 16, 17],
+        param_ranges={'bb_trend': {...}, 'bb_anti_trend': {...}},
+        tp_sl_ranges={'EURUSD': {'tp': (0.03, 0.4), 'sl': (0.03, 0.4)}, ...},
+        max_workers=6,
+        max_memory_gb=12,
+        memory_per_job_gb=1.5
+    )
+"""
+
+import os
+import time
+import importlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+import optuna
+
+from .metrics import SOURCE_BACKTESTER, SOURCE_COMPUTED
+from .objectives import make_objective
+from .pruning import make_pruned_objective, create_pruned_study, final_run_metrics
+from .results import create_run_dir, save_json, load_json, hour_result_path, save_hour_result
+from .session import OptimizerSession
+from .trial_cache import TrialCache, strategy_fingerprint
+from .warm_start import prior_params, enqueue_prior_trials
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+DEFAULT_BASE_CONFIG = {
+    'data_ini': '2019-01-01',
+    'data_fim': '2025-06-14',
+    'initial_cash': 30000,
+    'lote': 1,
+    'slippage': 0,
+    'daytrade': True
+}
+
+
+def job_id(symbol, strategy, timeframe, hour):
+    """Identificador único de um job"""
+    return f"{symbol}|{strategy}|{timeframe}|{hour:02d}"
+
+
+def build_jobs(symbols, strategies, timeframes, hours):
+    """
+    Gera a lista de jobs (produto cartesiano)
+
+    Returns:
+        list: Lista de dicts com symbol, strategy, timeframe, hour
+    """
+    return [
+        {'symbol': symbol, 'strategy': strategy, 'timeframe': timeframe, 'hour': hour}
+        for symbol, strategy, timeframe, hour in itertools.product(symbols, strategies, timeframes, hours)
+    ]
+
+
+def resolve_workers(max_workers=None, max_memory_gb=None, memory_per_job_gb=1.0):
+    """
+    Calcula o número de processos respeitando o orçamento de CPU e memória
+
+    Args:
+        max_workers (int): Limite de CPU (padrão: número de CPUs - 1)
+        max_memory_gb (float): Memória total disponível para a varredura
+        memory_per_job_gb (float): Estimativa de memória de um job (dados + backtest)
+
+    Returns:
+        int: Número de processos
+    """
+    workers = max_workers or max((os.cpu_count() or 2) - 1, 1)
+    if max_memory_gb is not None:
+        workers = min(workers, max(int(max_memory_gb // memory_per_job_gb), 1))
+    return workers
+
+
+def _memory_available(memory_per_job_gb):
+    """Verifica se há memória livre para mais um job (só com psutil instalado)"""
+    if psutil is None:
+        return True
+    return psutil.virtual_memory().available / 1024 ** 3 >= memory_per_job_gb
+
+
+def _symbol_config(symbol, timeframe, base_config):
+    """Monta o config de um símbolo a partir do registro de instrumentos"""
+    from config.dicts_params import INSTRUMENTS
+
+    instrument = INSTRUMENTS.get(symbol)
+    config = dict(DEFAULT_BASE_CONFIG)
+    config.update(base_config or {})
+    config.update({
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'tc': instrument.tc,
+        'valor_lote': instrument.valor_lote,
+        'path_base': instrument.path_base
+    })
+    return config
+
+
+def _job_ranges(job, param_ranges, tp_sl_ranges):
+    """Combina os ranges da estratégia com os de tp/sl do símbolo"""
+    ranges = dict(tp_sl_ranges[job['symbol']])
+    ranges.update(param_ranges[job['strategy']])
+    return ranges
+
+
+def _run_job(job, run_dir, config, ranges, settings):
+    """
+    Executa um job (otimização de uma hora) no worker
+
+    Returns:
+        dict: job, valor e quantidade de trials concluídos
+    """
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+    module = importlib.import_module(settings['entries_module'])
+    signal_function = getattr(module, job['strategy'])
+    hour = job['hour']
+    cache = TrialCache(settings['cache_path']) if settings['cache_path'] else None
+    session = OptimizerSession(config, signal_function)
+
+    if settings['pruning']:
+        objective = make_pruned_objective(config, signal_function, ranges, hour,
+                                          optimize_metric=settings['optimize_metric'], cache=cache,
+                                          session=session)
+        study = create_pruned_study(settings['direction'])
+    else:
+        objective = make_objective(config, signal_function, ranges, hour,
+                                   optimize_metric=settings['optimize_metric'], cache=cache,
+                                   session=session)
+        study = optuna.create_study(direction=settings['direction'])
+
+    if settings['warm_start_dir']:
+        seeds = prior_params(settings['warm_start_dir'], job['symbol'], job['strategy'], hour,
+                             ranges, job['timeframe'], settings['warm_start_top_k'],
+                             settings['optimize_metric'], settings['direction'])
+        enqueue_prior_trials(study, seeds)
+
+    study.optimize(objective, n_trials=settings['num_trials'])
+    if cache is not None:
+        cache.close()
+
+    completed = [t for t in study.trials if t.state == optuna.trial.TrialState.COMPLETE]
+    if not completed:
+        raise RuntimeError("nenhum trial completo")
+
+    best = study.best_trial
+    best_params = dict(best.params)
+    best_params['allowed_hours'] = [hour]
+
+    # Com poda, o valor otimizado vem dos blocos (compute_metrics); as métricas
+    # gravadas são sempre as do Backtester no período completo
+    if settings['pruning']:
+        sources = {'best_value_source': SOURCE_COMPUTED, 'chunked_metrics': best.user_attrs['metrics']}
+        metrics = final_run_metrics(session, best_params)
+    else:
+        sources = {'best_value_source': SOURCE_BACKTESTER}
+        metrics = best.user_attrs['metrics']
+
+    # Checkpoint: o results_hour_XX.json marca o job como concluído
+    save_hour_result(run_dir, hour, best_params, best.value, metrics,
+                     settings['optimize_metric'], settings['direction'],
+                     sweep_job=job_id(**job), metrics_source=SOURCE_BACKTESTER, **sources)
+
+    return {'job': job, 'value': best.value, 'trials': len(completed)}
+
+
+def run_sweep(name, symbols, strategies, timeframes, hours, param_ranges, tp_sl_ranges,
+              base_config=None, num_trials=65, optimize_metric='calmar_ratio',
+              direction='maximize', pruning=True, export_dir='./resultados',
+              entries_module='entries', cache_path=None, warm_start_dir=None,
+              warm_start_top_k=5, max_workers=None, max_memory_gb=None,
+              memory_per_job_gb=1.0):
+    """
+    Executa (ou retoma) uma varredura
+
+    Args:
+        name (str): Nome da varredura; a mesma varredura pode ser retomada pelo nome
+        symbols (list): Símbolos (chaves de config.dicts_params)
+        strategies (list): Nomes das funções em entries.py
+        timeframes (list): Timeframes (ex: ['t5'])
+        hours (list): Horas a otimizar
+        param_ranges (dict): Estratégia -> ranges dos parâmetros do sinal
+        tp_sl_ranges (dict): Símbolo -> {'tp': range, 'sl': range}
+        base_config (dict): Sobrescreve datas, capital, lote, etc. de DEFAULT_BASE_CONFIG
+        num_trials (int): Trials por job
+        optimize_metric (str): Métrica otimizada
+        direction (str): 'maximize' ou 'minimize'
+        pruning (bool): Usa a função objetivo com poda por blocos
+        export_dir (str): Pasta resultados/
+        entries_module (str): Módulo com as funções de entrada
+        cache_path (str): Caminho do TrialCache (None = sem cache)
+        warm_start_dir (str): Pasta de runs anteriores para warm start (None = sem)
+        warm_start_top_k (int): Conjuntos de warm start por job
+        max_workers (int): Limite de processos (CPU)
+        max_memory_gb (float): Orçamento de memória da varredura
+        memory_per_job_gb (float): Estimativa de memória por job
+
+    Returns:
+        dict: Resumo com jobs concluídos, pulados e com falha
+    """
+    state_path = os.path.join(export_dir, 'sweeps', f"{name}.json")
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+
+    # Retomada: reaproveita os run_* criados na primeira execução
+    if os.path.exists(state_path):
+        state = load_json(state_path)
+        print(f"Retomando varredura '{name}' criada em {state['created_at']}")
+    else:
+        state = {
+            'name': name,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'timestamp': datetime.now().strftime('%Y%m%d_%H%M%S'),
+            'run_dirs': {},
+            'failed': {}
+        }
+
+    settings = {
+        'num_trials': num_trials,
+        'optimize_metric': optimize_metric,
+        'direction': direction,
+        'pruning': pruning,
+        'entries_module': entries_module,
+        'cache_path': cache_path,
+        'warm_start_dir': warm_start_dir,
+        'warm_start_top_k': warm_start_top_k
+    }
+
+    # Cria (ou reabre) um run_* por símbolo/estratégia/timeframe
+    pending = []
+    skipped = 0
+    for job in build_jobs(symbols, strategies, timeframes, hours):
+        group = f"{job['symbol']}|{job['strategy']}|{job['timeframe']}"
+        config = _symbol_config(job['symbol'], job['timeframe'], base_config)
+        ranges = _job_ranges(job, param_ranges, tp_sl_ranges)
+
+        run_dir = state['run_dirs'].get(group)
+        if run_dir is None:
+            run_dir = create_run_dir(export_dir, job['symbol'], job['strategy'], job['timeframe'],
+                                     state['timestamp'])
+            state['run_dirs'][group] = run_dir
+            signal_function = getattr(importlib.import_module(entries_module), job['strategy'])
+            save_json(os.path.join(run_dir, 'config.json'), dict(
+                config, num_trials=num_trials, export_dir=export_dir, param_ranges=ranges,
+                fixed_params={}, strategy=job['strategy'],
+                strategy_fingerprint=strategy_fingerprint(signal_function), optimize_metric=optimize_metric,
+                direction=direction, sweep=name,
+                **({'pruning': {'chunk_freq': 'YS'}} if pruning else {})
+            ))
+
+        if os.path.exists(hour_result_path(run_dir, job['hour'])):
+            skipped += 1
+            continue
+        pending.append((job, run_dir, config, ranges))
+
+    save_json(state_path, state)
+
+    workers = resolve_workers(max_workers, max_memory_gb, memory_per_job_gb)
+    total = skipped + len(pending)
+    print(f"Varredura '{name}': {total} jobs | {skipped} já concluídos | {len(pending)} pendentes")
+    print(f"Processos: {workers}")
+
+    done, failed = 0, 0
+    queue = list(pending)
+    running = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while queue or running:
+            # Submete novos jobs enquanto houver vaga e memória livre
+            while queue and len(running) < workers:
+                if running and not _memory_available(memory_per_job_gb):
+                    break
+                job, run_dir, config, ranges = queue.pop(0)
+                future = executor.submit(_run_job, job, run_dir, config, ranges, settings)
+                running[future] = job
+
+            if not running:
+                time.sleep(1)
+                continue
+
+            finished, _ = wait(list(running), timeout=5, return_when=FIRST_COMPLETED)
+            for future in finished:
+                job = running.pop(future)
+                key = job_id(**job)
+                try:
+                    result = future.result()
+                    done += 1
+                    state['failed'].pop(key, None)
+                    print(f"[{skipped + done + failed}/{total}] OK {key} "
+                          f"{optimize_metric}={result['value']:.3f} ({result['trials']} trials)")
+                except Exception as e:
+                    failed += 1
+                    state['failed'][key] = str(e)
+                    print(f"[{skipped + done + failed}/{total}] ERRO {key}: {e}")
+                save_json(state_path, state)
+
+    print(f"\nVarredura '{name}' finalizada: {done} concluídos, {skipped} pulados, {failed} falhas")
+    return {'done': done, 'skipped': skipped, 'failed': dict(state['failed']),
+            'run_dirs': dict(state['run_dirs'])}
@@ -0,0 +1,130 @@
+"""
+Sessão de otimização que reaproveita dados e sinais entre trials.
+
+As funções objetivo dos notebooks criam um Backtester novo a cada trial,
+repetindo a carga e a preparação dos candles em todos os 200+ trials. A
+sessão mantém em memória (LRU) um Backtester por (período, tp, sl): o
+Backtester nunca é reaproveitado com tp/sl diferentes dos da criação, pois
+nada garante que o run() releia bt.tp e bt.sl. Os espaços de busca
+discretizados repetem combinações de tp/sl, que reaproveitam o Backtester
+já carregado. Como o sinal de entrada não depende de tp/sl, as posições
+calculadas pela função de entrada também ficam em memória (LRU), e trials
+que só mudam tp/sl não recalculam indicadores.
+
+Exemplo (notebook):
+
+    from optimizer.session import OptimizerSession
+
+    session = OptimizerSession(config, entrada)
+
+    def objective_ind(trial):
+        params = {'sl': trial.suggest_float('sl', 1.0, 36.0),
+                  'tp': trial.suggest_float('tp', 1.0, 36.0),
+                  'bb_length': trial.suggest_int('bb_length', 4, 9),
+                  'std': trial.suggest_float('std', 0.8, 2.0),
+                  'allowed_hours': [9, 10, 11]}
+        _, metrics = session.evaluate(params)
+        return metrics['total_return']
+"""
+
+from collections import OrderedDict
+
+from .backtest import make_backtester
+from .params import split_params
+from .trial_cache import normalize_value
+
+
+class OptimizerSession:
+    """
+    Mantém Backtesters e sinais em memória para avaliações repetidas
+
+    Args:
+        config (dict): Configuração do run (formato do config.json)
+        signal_function (callable): Função de entrada (entries.py)
+        max_cached_signals (int): Quantidade máxima de séries de posição em memória
+        max_backtesters (int): Quantidade máxima de Backtesters (período, tp, sl) em memória
+    """
+
+    def __init__(self, config, signal_function, max_cached_signals=64, max_backtesters=8):
+        self.config = config
+        self.signal_function = signal_function
+        self.max_cached_signals = max_cached_signals
+        self.max_backtesters = max_backtesters
+
+        self._backtesters = OrderedDict()
+        self.backtester_hits = 0
+        self.backtester_misses = 0
+        self._signals = OrderedDict()
+        self.signal_hits = 0
+        self.signal_misses = 0
+
+    def _backtester(self, data_ini, data_fim, tp, sl):
+        """Retorna o Backtester do período e de tp/sl, criando (e carregando os dados) só na primeira vez"""
+        key = (data_ini, data_fim, normalize_value(tp), normalize_value(sl))
+        bt = self._backtesters.get(key)
+        if bt is not None:
+            self._backtesters.move_to_end(key)
+            self.backtester_hits += 1
+            return bt
+
+        self.backtester_misses += 1
+        bt = make_backtester(self.config, tp, sl, data_ini, data_fim)
+        self._backtesters[key] = bt
+        if self.max_backtesters and len(self._backtesters) > self.max_backtesters:
+            self._backtesters.popitem(last=False)
+        return bt
+
+    def cached_signal(self, df, **signal_args):
+        """
+        Versão memorizada da função de entrada
+
+        A chave combina os argumentos do sinal com o intervalo de candles
+        recebido, para que períodos diferentes nunca compartilhem posições.
+        """
+        key = (
+            len(df), df.index[0], df.index[-1],
+            tuple(sorted((k, str(normalize_value(v))) for k, v in signal_args.items()))
+        )
+
+        position = self._signals.get(key)
+        if position is not None:
+            self._signals.move_to_end(key)
+            self.signal_hits += 1
+            return position.copy()
+
+        self.signal_misses += 1
+        position = self.signal_function(df, **signal_args)
+        self._signals[key] = position
+        if len(self._signals) > self.max_cached_signals:
+            self._signals.popitem(last=False)
+        return position.copy()
+
+    def evaluate(self, params, data_ini=None, data_fim=None):
+        """
+        Avalia um conjunto de parâmetros
+
+        Args:
+            params (dict): Parâmetros completos (tp, sl e argumentos do sinal)
+            data_ini (str): Data inicial (padrão: config['data_ini'])
+            data_fim (str): Data final (padrão: config['data_fim'])
+
+        Returns:
+            tuple: (results, metrics) retornados por Backtester.run
+        """
+        data_ini = data_ini or self.config['data_ini']
+        data_fim = data_fim or self.config['data_fim']
+
+        tp, sl, signal_args = split_params(params)
+        bt = self._backtester(data_ini, data_fim, tp, sl)
+        return bt.run(signal_function=self.cached_signal, signal_args=signal_args)
+
+    def stats(self):
+        """Estatísticas de reaproveitamento da sessão"""
+        return {
+            'backtesters': len(self._backtesters),
+            'backtester_hits': self.backtester_hits,
+            'backtester_misses': self.backtester_misses,
+            'cached_signals': len(self._signals),
+            'signal_hits': self.signal_hits,
+            'signal_misses': self.signal_misses
+        }
@@ -0,0 +1,256 @@
+"""
+Cache persistente de trials do otimizador.
+
+Os espaços de busca discretizados (tp/sl em passos fixos, bb_length
+inteiro, std em passos de 0.1) fazem o sampler repetir combinações já
+avaliadas, no mesmo run ou em runs anteriores. O cache guarda as métricas
+de cada avaliação em um SQLite local, compartilhado por todos os runs da
+máquina, com chave em (símbolo, timeframe, estratégia, hora, período,
+custos, parâmetros).
+
+Caminho padrão: ~/.trading_factory/trial_cache.sqlite
+(pode ser alterado pela variável de ambiente TRADING_FACTORY_CACHE).
+
+Os runs gravam strategy_fingerprint no config.json. Ao importar runs
+anteriores (seed_from_resultados), só entram com o identificador atual os
+runs feitos com o mesmo código da função de entrada; runs sem o registro
+entram com o identificador legado (legacy_fingerprint), que nunca coincide
+com o de uma avaliação nova.
+"""
+
+import os
+import json
+import glob
+import hashlib
+import inspect
+import sqlite3
+from datetime import datetime
+
+from .results import load_json
+
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.trading_factory', 'trial_cache.sqlite')
+
+# Campos do config que alteram o resultado de um backtest
+CONFIG_KEY_FIELDS = ['symbol', 'timeframe', 'data_ini', 'data_fim', 'tc', 'valor_lote',
+                     'lote', 'slippage', 'daytrade', 'initial_cash']
+
+
+def normalize_value(value):
+    """Normaliza números para que 1.2000000000000002 e 1.2 gerem a mesma chave"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float):
+        value = round(value, 8)
+        return int(value) if value.is_integer() else value
+    if isinstance(value, (list, tuple)):
+        return [normalize_value(v) for v in value]
+    return value
+
+
+def strategy_fingerprint(signal_function):
+    """
+    Identifica a versão da função de entrada pelo hash do código-fonte,
+    para que alterações em entries.py invalidem o cache automaticamente
+    """
+    try:
+        source = inspect.getsource(signal_function)
+    except (OSError, TypeError):
+        source = ''
+    digest = hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+    return f"{signal_function.__name__}:{digest}"
+
+
+def legacy_fingerprint(name):
+    """Identificador dos resultados importados de runs sem strategy_fingerprint no config.json"""
+    return f"{name}:legacy"
+
+
+def cache_key(config, strategy, hour, params, source='backtester'):
+    """
+    Gera a chave de cache de uma avaliação
+
+    Args:
+        config (dict): Configuração do run
+        strategy (str): Identificador da estratégia (ver strategy_fingerprint)
+        hour (int): Hora avaliada
+        params (dict): Parâmetros do trial
+        source (str): Origem das métricas ('backtester' ou 'chunked')
+
+    Returns:
+        str: Hash SHA1 da chave canônica
+    """
+    payload = {
+        'config': {k: normalize_value(config.get(k)) for k in CONFIG_KEY_FIELDS},
+        'strategy': strategy,
+        'hour': hour,
+        'params': {k: normalize_value(v) for k, v in sorted(params.items())},
+        'source': source
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+class TrialCache:
+    """
+    Cache de métricas de trials em SQLite
+
+    Args:
+        path (str): Caminho do arquivo SQLite (padrão: DEFAULT_CACHE_PATH)
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv('TRADING_FACTORY_CACHE', DEFAULT_CACHE_PATH)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        # WAL permite vários processos lendo enquanto um escreve
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS trials (
+                key TEXT PRIMARY KEY,
+                symbol TEXT,
+                timeframe TEXT,
+                strategy TEXT,
+                hour INTEGER,
+                data_ini TEXT,
+                data_fim TEXT,
+                params TEXT,
+                metrics TEXT,
+                source TEXT,
+                created_at TEXT
+            )
+        """)
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, config, strategy, hour, params, source='backtester'):
+        """
+        Busca as métricas de uma avaliação
+
+        Returns:
+            dict: Métricas armazenadas ou None se não houver
+        """
+        key = cache_key(config, strategy, hour, params, source)
+        row = self.conn.execute('SELECT metrics FROM trials WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, config, strategy, hour, params, metrics, source='backtester'):
+        """Armazena as métricas de uma avaliação"""
+        key = cache_key(config, strategy, hour, params, source)
+        self.conn.execute(
+            'INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (key, config['symbol'], config['timeframe'], strategy, hour,
+             config['data_ini'], config['data_fim'],
+             json.dumps(params, default=str), json.dumps(metrics, default=float),
+             source, datetime.now().isoformat(timespec='seconds'))
+        )
+        self.conn.commit()
+
+    def best_trials(self, symbol, timeframe, strategy, hour, metric, direction='maximize',
+                    limit=5, data_ini=None, data_fim=None, source='backtester'):
+        """
+        Retorna os melhores trials armazenados para uma hora
+
+        Args:
+            symbol (str): Símbolo
+            timeframe (str): Timeframe
+            strategy (str): Identificador da estratégia (ver strategy_fingerprint)
+            hour (int): Hora
+            metric (str): Métrica usada na ordenação
+            direction (str): 'maximize' ou 'minimize'
+            limit (int): Quantidade máxima de trials
+            data_ini (str): Filtra pelo período (opcional)
+            data_fim (str): Filtra pelo período (opcional)
+            source (str): Origem das métricas; valores de origens diferentes
+                não são comparáveis entre si
+
+        Returns:
+            list: Lista de tuplas (params, metrics)
+        """
+        order = 'DESC' if direction == 'maximize' else 'ASC'
+        query = (
+            "SELECT params, metrics FROM trials "
+            "WHERE symbol = ? AND timeframe = ? AND strategy = ? AND hour = ? AND source = ? "
+            "AND json_extract(metrics, ?) IS NOT NULL"
+        )
+        args = [symbol, timeframe, strategy, hour, source, f'$.{metric}']
+        if data_ini is not None:
+            query += ' AND data_ini = ?'
+            args.append(data_ini)
+        if data_fim is not None:
+            query += ' AND data_fim = ?'
+            args.append(data_fim)
+        query += f' ORDER BY json_extract(metrics, ?) {order} LIMIT ?'
+        args += [f'$.{metric}', limit]
+
+        rows = self.conn.execute(query, args).fetchall()
+        return [(json.loads(p), json.loads(m)) for p, m in rows]
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM trials').fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+def seed_from_resultados(cache, resultados_dir, strategies, seed_legacy=True):
+    """
+    Importa para o cache os melhores trials de runs anteriores
+
+    Os results_hour_*.json guardam apenas o melhor trial de cada hora, com
+    as métricas do Backtester no período do config.json do run. Runs feitos
+    com outra versão da função de entrada são ignorados; runs sem
+    strategy_fingerprint (anteriores ao registro) entram com
+    legacy_fingerprint, consultáveis via best_trials, sem responder a get().
+
+    Args:
+        cache (TrialCache): Cache de destino
+        resultados_dir (str): Pasta com os run_*
+        strategies (dict): Nome da estratégia -> função de entrada, para
+            gerar o mesmo identificador usado nos trials
+        seed_legacy (bool): Importa também os runs sem strategy_fingerprint
+
+    Returns:
+        int: Quantidade de entradas importadas
+    """
+    imported = 0
+
+    for config_path in glob.glob(os.path.join(resultados_dir, 'run_*', 'config.json')):
+        run_dir = os.path.dirname(config_path)
+        try:
+            config = load_json(config_path)
+        except (OSError, json.JSONDecodeError):
+            continue
+
+        signal_function = strategies.get(config.get('strategy'))
+        if signal_function is None:
+            continue
+        recorded = config.get('strategy_fingerprint')
+        if recorded is None:
+            if not seed_legacy:
+                continue
+            strategy = legacy_fingerprint(config['strategy'])
+        elif recorded == strategy_fingerprint(signal_function):
+            strategy = recorded
+        else:
+            continue
+        pruned = 'pruning' in config
+
+        for result_path in glob.glob(os.path.join(run_dir, 'results_hour_*.json')):
+            result = load_json(result_path)
+            if not result.get('metrics'):
+                continue
+            # Runs com poda gravam as métricas do Backtester no período completo (metrics_source);
+            # os mais antigos gravavam as dos blocos
+            source = 'chunked' if pruned and result.get('metrics_source') != 'backtester' else 'backtester'
+            cache.put(config, strategy, result['hour'], result['best_params'],
+                      result['metrics'], source)
+            imported += 1
+
+    return imported
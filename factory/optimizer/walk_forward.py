@@ -0,0 +1,374 @@
+"""
+Otimização walk-forward em paralelo.
+
+O factory otimiza uma única vez no período completo e opera o resultado,
+o que não diz nada sobre a estabilidade dos parâmetros. Aqui o período é
+dividido em janelas rolantes in-sample (IS) / out-of-sample (OOS): cada
+hora é otimizada no IS de cada janela e os melhores parâmetros são
+aplicados no OOS seguinte. As tarefas (janela, hora) rodam em paralelo.
+
+Cada processo worker mantém uma única OptimizerSession sobre o período
+completo (data_ini a data_fim do config): cada avaliação roda o backtest
+no período todo e as janelas são recortes do resultado. Assim os candles
+são carregados uma vez por (tp, sl) em cada worker, não uma vez por
+janela, e o sinal de cada conjunto de parâmetros é calculado uma única vez
+e reaproveitado por todas as janelas. Em troca, cada trial simula o
+período completo, e não só o IS da janela. Como a simulação é contínua,
+os indicadores já chegam aquecidos ao início de cada recorte (exige
+daytrade=True, para que nenhum trade atravesse a fronteira das janelas).
+As métricas IS/OOS por janela são calculadas por compute_metrics sobre a
+coluna strategy dos dois recortes.
+
+Saídas (em resultados/wf_{symbol}_{strategy}_{tf}_{timestamp}/):
+    - config.json: configuração do walk-forward
+    - wf_windows.csv: parâmetros e métricas IS/OOS por janela e hora
+    - oos_equity.csv: equity OOS costurada, por hora e combinada
+    - param_drift.csv: variação dos parâmetros entre janelas por hora
+    - wf_failures.csv: tarefas (janela, hora) que falharam, com o erro
+
+Exemplo:
+
+    from optimizer.walk_forward import run_walk_forward
+
+    wf = run_walk_forward(config, entry, param_ranges, hours=[9, 10, 11],
+                          is_months=24, oos_months=6, num_trials=65,
+                          max_workers=4)
+    wf['summary'], wf['failures']
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import optuna
+import pandas as pd
+
+from .metrics import compute_metrics, SOURCE_COMPUTED
+from .params import suggest_params
+from .results import save_json
+from .session import OptimizerSession
+from .trial_cache import TrialCache, strategy_fingerprint
+
+
+def build_windows(data_ini, data_fim, is_months=24, oos_months=6, step_months=None, anchored=False):
+    """
+    Gera as janelas in-sample/out-of-sample
+
+    Args:
+        data_ini (str): Data inicial do período
+        data_fim (str): Data final do período
+        is_months (int): Meses in-sample
+        oos_months (int): Meses out-of-sample
+        step_months (int): Avanço entre janelas (padrão: oos_months, OOS sem sobreposição)
+        anchored (bool): Se True, o IS sempre começa em data_ini (janela crescente)
+
+    Returns:
+        list: Lista de dicts com is_ini, is_fim, oos_ini, oos_fim
+    """
+    step_months = step_months or oos_months
+    ini = pd.Timestamp(data_ini)
+    fim = pd.Timestamp(data_fim)
+    one_day = pd.Timedelta(days=1)
+
+    windows = []
+    start = ini
+    while True:
+        is_end = start + pd.DateOffset(months=is_months)
+        oos_end = is_end + pd.DateOffset(months=oos_months)
+        if is_end > fim:
+            break
+
+        windows.append({
+            'is_ini': (ini if anchored else start).strftime('%Y-%m-%d'),
+            'is_fim': (is_end - one_day).strftime('%Y-%m-%d'),
+            'oos_ini': is_end.strftime('%Y-%m-%d'),
+            'oos_fim': min(oos_end - one_day, fim).strftime('%Y-%m-%d')
+        })
+        if oos_end > fim:
+            break
+        start = start + pd.DateOffset(months=step_months)
+
+    return windows
+
+
+# Sessão do processo worker (criada por _init_worker)
+_SESSION = None
+
+
+def _init_worker(config, signal_function):
+    """Initializer dos workers: uma sessão por processo, reaproveitada pelas tarefas"""
+    global _SESSION
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    _SESSION = OptimizerSession(config, signal_function)
+
+
+def window_pnl(results, data_ini, data_fim):
+    """Recorte da coluna strategy de uma simulação do período completo (datas inclusivas)"""
+    return results['strategy'].loc[data_ini:data_fim]
+
+
+def make_window_objective(config, signal_function, param_ranges, hour, window, fixed_params=None,
+                          optimize_metric='calmar_ratio', cache=None, session=None):
+    """
+    Cria a função objetivo de uma hora no IS de uma janela
+
+    O backtest roda no período completo da sessão e a métrica é calculada
+    por compute_metrics no recorte IS.
+
+    Args:
+        config (dict): Configuração do walk-forward (data_ini/data_fim = período total)
+        signal_function (callable): Função de entrada (entries.py)
+        param_ranges (dict): Ranges dos parâmetros
+        hour (int): Hora otimizada (vira allowed_hours=[hour])
+        window (dict): Janela (saída de build_windows)
+        fixed_params (dict): Parâmetros fixos
+        optimize_metric (str): Métrica otimizada
+        cache (TrialCache): Cache persistente de trials (opcional)
+        session (OptimizerSession): Sessão do período completo
+
+    Returns:
+        callable: Função objective(trial)
+    """
+    strategy = strategy_fingerprint(signal_function)
+    session = session or OptimizerSession(config, signal_function)
+    initial_cash = config.get('initial_cash', 30000)
+
+    # A chave do cache usa o período do IS; o início da simulação entra na origem
+    is_config = dict(config, data_ini=window['is_ini'], data_fim=window['is_fim'])
+    source = f"walk_forward:{config['data_ini']}"
+
+    def objective(trial):
+        params = suggest_params(trial, param_ranges, fixed_params)
+        params['allowed_hours'] = [hour]
+
+        metrics = cache.get(is_config, strategy, hour, params, source) if cache is not None else None
+        if metrics is None:
+            results, _ = session.evaluate(params)
+            metrics = compute_metrics(window_pnl(results, window['is_ini'], window['is_fim']), initial_cash)
+            if cache is not None:
+                cache.put(is_config, strategy, hour, params, metrics, source)
+        else:
+            trial.set_user_attr('cached', True)
+
+        trial.set_user_attr('metrics', metrics)
+        return metrics[optimize_metric]
+
+    return objective
+
+
+def _run_task(config, signal_function, param_ranges, fixed_params, hour, window_id, window,
+              num_trials, optimize_metric, direction, cache_path):
+    """
+    Otimiza uma hora no IS de uma janela e avalia no OOS (roda no worker)
+
+    Returns:
+        dict: Resultado da tarefa, incluindo a série de resultado OOS
+    """
+    if _SESSION is None:
+        _init_worker(config, signal_function)
+    session = _SESSION
+    cache = TrialCache(cache_path) if cache_path else None
+
+    objective = make_window_objective(config, signal_function, param_ranges, hour, window,
+                                      fixed_params, optimize_metric, cache, session)
+    study = optuna.create_study(direction=direction)
+    study.optimize(objective, n_trials=num_trials)
+
+    best_params = dict(study.best_trial.params)
+    best_params.update(fixed_params or {})
+    best_params['allowed_hours'] = [hour]
+
+    # Mesma simulação do período completo (Backtester e sinal já em memória), recortada no OOS
+    initial_cash = config.get('initial_cash', 30000)
+    results, _ = session.evaluate(best_params)
+    oos_pnl = window_pnl(results, window['oos_ini'], window['oos_fim'])
+
+    if cache is not None:
+        cache.close()
+
+    return {
+        'window': window_id,
+        'hour': hour,
+        **window,
+        'best_params': best_params,
+        'is_value': study.best_value,
+        'is_metrics': study.best_trial.user_attrs['metrics'],
+        'oos_metrics': compute_metrics(oos_pnl, initial_cash),
+        'oos_pnl': oos_pnl
+    }
+
+
+def parameter_drift(windows_df, param_names):
+    """
+    Resume a variação dos parâmetros entre janelas por hora
+
+    Numéricos: média, desvio e desvio relativo (desvio/|média|).
+    Categóricos: quantidade de trocas de valor entre janelas consecutivas.
+
+    Args:
+        windows_df (pandas.DataFrame): Uma linha por (janela, hora) com os parâmetros em colunas
+        param_names (list): Parâmetros analisados
+
+    Returns:
+        pandas.DataFrame: Uma linha por (hora, parâmetro)
+    """
+    rows = []
+    for hour, group in windows_df.sort_values('window').groupby('hour'):
+        for name in param_names:
+            values = group[name]
+            row = {'hour': hour, 'param': name, 'windows': len(values),
+                   'changes': int((values != values.shift()).iloc[1:].sum())}
+            if pd.api.types.is_numeric_dtype(values):
+                mean = values.mean()
+                row.update({'mean': mean, 'std': values.std(), 'min': values.min(), 'max': values.max(),
+                            'rel_std': values.std() / abs(mean) if mean else float('nan')})
+            rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+def run_walk_forward(config, signal_function, param_ranges, hours, fixed_params=None,
+                     is_months=24, oos_months=6, step_months=None, anchored=False,
+                     num_trials=65, optimize_metric='calmar_ratio', direction='maximize',
+                     max_workers=None, export_dir='./resultados', cache_path=None):
+    """
+    Executa o walk-forward de todas as horas em paralelo
+
+    Args:
+        config (dict): Configuração base (formato do config.json; data_ini/data_fim = período total)
+        signal_function (callable): Função de entrada (precisa ser importável, ex: entries.bb_trend)
+        param_ranges (dict): Ranges dos parâmetros
+        hours (list): Horas a otimizar
+        fixed_params (dict): Parâmetros fixos
+        is_months (int): Meses in-sample por janela
+        oos_months (int): Meses out-of-sample por janela
+        step_months (int): Avanço entre janelas
+        anchored (bool): IS ancorado no início do período
+        num_trials (int): Trials por (janela, hora)
+        optimize_metric (str): Métrica otimizada
+        direction (str): 'maximize' ou 'minimize'
+        max_workers (int): Processos paralelos (padrão: número de CPUs)
+        export_dir (str): Pasta base de saída
+        cache_path (str): Caminho do TrialCache compartilhado entre os processos (opcional)
+
+    Returns:
+        dict: windows (DataFrame), oos_equity (DataFrame), drift (DataFrame),
+              summary (DataFrame com métricas OOS por hora e combinadas),
+              failures (DataFrame com as tarefas que falharam), run_dir
+    """
+    windows = build_windows(config['data_ini'], config['data_fim'], is_months, oos_months,
+                            step_months, anchored)
+    if not windows:
+        raise ValueError("Período curto demais para uma janela IS + OOS")
+
+    strategy = signal_function.__name__
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    run_dir = os.path.join(export_dir, f"wf_{config['symbol']}_{strategy}_{config['timeframe']}_{timestamp}")
+    os.makedirs(run_dir, exist_ok=True)
+
+    save_json(os.path.join(run_dir, 'config.json'), dict(
+        config, strategy=strategy, param_ranges=param_ranges, fixed_params=fixed_params or {},
+        hours=list(hours), windows=windows, num_trials=num_trials,
+        optimize_metric=optimize_metric, direction=direction,
+        metrics_source=SOURCE_COMPUTED
+    ))
+
+    print(f"Walk-forward: {len(windows)} janelas x {len(hours)} horas")
+    for i, w in enumerate(windows):
+        print(f"  [{i}] IS {w['is_ini']} a {w['is_fim']} | OOS {w['oos_ini']} a {w['oos_fim']}")
+
+    tasks = []
+    failures = []
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(config, signal_function)) as executor:
+        futures = {
+            executor.submit(_run_task, config, signal_function, param_ranges, fixed_params, hour,
+                            i, window, num_trials, optimize_metric, direction,
+                            cache_path): (i, window, hour)
+            for i, window in enumerate(windows) for hour in hours
+        }
+        for future in as_completed(futures):
+            try:
+                task = future.result()
+            except Exception as e:
+                i, window, hour = futures[future]
+                print(f"Erro na janela {i} hora {hour:02d} do walk-forward: {e}")
+                failures.append({'window': i, 'hour': hour, **window, 'error': repr(e)})
+                continue
+            tasks.append(task)
+            print(f"Janela {task['window']} hora {task['hour']:02d}: "
+                  f"IS {optimize_metric}={task['is_metrics'][optimize_metric]:.3f} | "
+                  f"OOS {optimize_metric}={task['oos_metrics'][optimize_metric]:.3f}")
+
+    failures_df = pd.DataFrame(failures, columns=['window', 'hour', 'is_ini', 'is_fim', 'oos_ini',
+                                                  'oos_fim', 'error'])
+    failures_df = failures_df.sort_values(['hour', 'window']).reset_index(drop=True)
+    failures_df.to_csv(os.path.join(run_dir, 'wf_failures.csv'), index=False)
+
+    if not tasks:
+        raise RuntimeError(f"Nenhuma tarefa do walk-forward foi concluída (ver {run_dir}/wf_failures.csv)")
+
+    # Tabela por janela/hora
+    param_names = list(param_ranges.keys()) + list((fixed_params or {}).keys())
+    rows = []
+    for task in tasks:
+        row = {k: task[k] for k in ['window', 'hour', 'is_ini', 'is_fim', 'oos_ini', 'oos_fim']}
+        row.update({name: task['best_params'].get(name) for name in param_names})
+        # Valor do objetivo no IS (a métrica otimizada, calculada no recorte IS)
+        row['is_objective'] = task['is_value']
+        row.update({f'is_{k}': v for k, v in task['is_metrics'].items()})
+        row.update({f'oos_{k}': v for k, v in task['oos_metrics'].items()})
+        rows.append(row)
+    windows_df = pd.DataFrame(rows).sort_values(['hour', 'window']).reset_index(drop=True)
+
+    # Equity OOS costurada por hora e combinada
+    initial_cash = config.get('initial_cash', 30000)
+    pnl_by_hour = {}
+    for hour in hours:
+        parts = [t['oos_pnl'] for t in sorted(tasks, key=lambda t: t['window']) if t['hour'] == hour]
+        if parts:
+            pnl = pd.concat(parts)
+            pnl_by_hour[hour] = pnl[~pnl.index.duplicated(keep='first')]
+
+    pnl_df = pd.DataFrame(pnl_by_hour).fillna(0).sort_index()
+    pnl_df['combined'] = pnl_df.sum(axis=1)
+    oos_equity = initial_cash + pnl_df.cumsum()
+    oos_equity.columns = [f'hour_{c:02d}' if isinstance(c, int) else c for c in oos_equity.columns]
+
+    summary = pd.DataFrame({
+        (f'hour_{c:02d}' if isinstance(c, int) else c): compute_metrics(pnl_df[c], initial_cash)
+        for c in pnl_df.columns
+    }).T
+
+    # Eficiência walk-forward: métrica OOS média / métrica IS média por hora
+    # (ambas calculadas por compute_metrics em cada janela)
+    means = windows_df.groupby('hour')[[f'is_{optimize_metric}', f'oos_{optimize_metric}']].mean()
+    efficiency = means[f'oos_{optimize_metric}'] / means[f'is_{optimize_metric}']
+    summary['wf_efficiency'] = [efficiency.get(int(i[5:])) if i.startswith('hour_') else None
+                                for i in summary.index]
+
+    # Janelas sem OOS (tarefa falhou): a equity da hora fica sem resultado nesses períodos
+    failed = failures_df.groupby('hour').size()
+    summary['failed_windows'] = [int(failed.get(int(i[5:]), 0)) if i.startswith('hour_') else len(failures_df)
+                                 for i in summary.index]
+
+    drift = parameter_drift(windows_df, param_names)
+
+    windows_df.to_csv(os.path.join(run_dir, 'wf_windows.csv'), index=False)
+    oos_equity.to_csv(os.path.join(run_dir, 'oos_equity.csv'))
+    drift.to_csv(os.path.join(run_dir, 'param_drift.csv'), index=False)
+    summary.to_csv(os.path.join(run_dir, 'oos_summary.csv'))
+
+    print(f"\nResultados do walk-forward salvos em: {run_dir}")
+    print(summary[['total_return', optimize_metric, 'max_drawdown', 'trades', 'wf_efficiency']])
+    if not failures_df.empty:
+        print(f"Atenção: {len(failures_df)} tarefas falharam (wf_failures.csv)")
+
+    return {
+        'windows': windows_df,
+        'oos_equity': oos_equity,
+        'drift': drift,
+        'summary': summary,
+        'failures': failures_df,
+        'run_dir': run_dir
+    }
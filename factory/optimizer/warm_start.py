@@ -0,0 +1,193 @@
+"""
+Warm start de novos runs a partir de resultados/ anteriores.
+
+Cada results_hour_XX.json guarda os best_params de uma hora. Para um novo
+run, os melhores conjuntos de parâmetros de runs anteriores do mesmo
+símbolo/estratégia/hora são enfileirados no study antes da otimização,
+para que o sampler já comece por regiões conhecidas.
+"""
+
+import os
+import glob
+import json
+
+from .params import _is_numeric_range
+from .results import load_json
+from .trial_cache import strategy_fingerprint
+
+
+def find_prior_results(resultados_dir, symbol, strategy, hour, timeframe=None):
+    """
+    Busca os results_hour_XX.json de runs anteriores compatíveis
+
+    Args:
+        resultados_dir (str): Pasta com os run_*
+        symbol (str): Símbolo (ex: 'WDO@N')
+        strategy (str): Nome da estratégia (ex: 'bb_trend')
+        hour (int): Hora
+        timeframe (str): Timeframe (None = qualquer)
+
+    Returns:
+        list: Lista de tuplas (config, result)
+    """
+    found = []
+
+    for config_path in glob.glob(os.path.join(resultados_dir, 'run_*', 'config.json')):
+        try:
+            config = load_json(config_path)
+        except (OSError, json.JSONDecodeError):
+            continue
+
+        if config.get('symbol') != symbol or config.get('strategy') != strategy:
+            continue
+        if timeframe is not None and config.get('timeframe') != timeframe:
+            continue
+
+        result_path = os.path.join(os.path.dirname(config_path), f"results_hour_{hour:02d}.json")
+        if os.path.exists(result_path):
+            found.append((config, load_json(result_path)))
+
+    return found
+
+
+def fit_to_ranges(params, param_ranges):
+    """
+    Ajusta parâmetros antigos ao espaço de busca atual
+
+    Valores numéricos são limitados ao range e arredondados ao passo;
+    conjuntos com categoria inexistente no range atual (inclusive listas de
+    int/bool, como [5, 10, 20, 40] ou [True, False]) são descartados.
+
+    Args:
+        params (dict): Parâmetros de um run anterior
+        param_ranges (dict): Ranges do run atual
+
+    Returns:
+        dict: Parâmetros ajustados ou None se incompatíveis
+    """
+    fitted = {}
+
+    for name, spec in param_ranges.items():
+        if name not in params:
+            return None
+        value = params[name]
+
+        # Mesma regra do suggest_params: listas que não são ranges numéricos são categóricas
+        if isinstance(spec, list) and not _is_numeric_range(spec):
+            if value not in spec:
+                return None
+            fitted[name] = value
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+
+        low, high = spec[0], spec[1]
+        value = min(max(value, low), high)
+        if len(spec) == 3:
+            step = spec[2]
+            value = low + round((value - low) / step) * step
+            value = min(value, high)
+        if all(isinstance(v, int) for v in spec):
+            value = int(round(value))
+        else:
+            value = round(float(value), 10)
+        fitted[name] = value
+
+    return fitted
+
+
+def prior_params(resultados_dir, symbol, strategy, hour, param_ranges, timeframe=None,
+                 top_k=5, optimize_metric=None, direction='maximize'):
+    """
+    Seleciona os top-k conjuntos de parâmetros de runs anteriores
+
+    Args:
+        resultados_dir (str): Pasta com os run_*
+        symbol (str): Símbolo
+        strategy (str): Nome da estratégia
+        hour (int): Hora
+        param_ranges (dict): Ranges do run atual
+        timeframe (str): Timeframe (None = qualquer)
+        top_k (int): Quantidade máxima de conjuntos
+        optimize_metric (str): Métrica para ordenar (None = best_value de cada run)
+        direction (str): 'maximize' ou 'minimize'
+
+    Returns:
+        list: Lista de dicts de parâmetros, do melhor para o pior
+    """
+    candidates = []
+
+    for _, result in find_prior_results(resultados_dir, symbol, strategy, hour, timeframe):
+        if optimize_metric is None:
+            score = result.get('best_value')
+        else:
+            score = result.get('metrics', {}).get(optimize_metric)
+        if score is None:
+            continue
+
+        fitted = fit_to_ranges(result['best_params'], param_ranges)
+        if fitted is not None:
+            candidates.append((score, fitted))
+
+    candidates.sort(key=lambda c: c[0], reverse=(direction == 'maximize'))
+
+    selected = []
+    for _, params in candidates:
+        if params not in selected:
+            selected.append(params)
+        if len(selected) >= top_k:
+            break
+
+    return selected
+
+
+def cached_params(cache, config, signal_function, hour, param_ranges, top_k=5,
+                  optimize_metric='calmar_ratio', direction='maximize'):
+    """
+    Seleciona os top-k conjuntos de parâmetros do cache persistente
+
+    Diferente dos results_hour_*.json (um melhor por run), o cache guarda
+    todos os trials completos já avaliados no mesmo período. Só entram os
+    trials com métricas do Backtester no período completo; os valores dos
+    blocos de runs com poda (compute_metrics) não são comparáveis a eles.
+
+    Args:
+        cache (TrialCache): Cache persistente de trials
+        config (dict): Configuração do run atual
+        signal_function (callable): Função de entrada
+        hour (int): Hora
+        param_ranges (dict): Ranges do run atual
+        top_k (int): Quantidade máxima de conjuntos
+        optimize_metric (str): Métrica para ordenar
+        direction (str): 'maximize' ou 'minimize'
+
+    Returns:
+        list: Lista de dicts de parâmetros, do melhor para o pior
+    """
+    trials = cache.best_trials(
+        config['symbol'], config['timeframe'], strategy_fingerprint(signal_function), hour,
+        optimize_metric, direction, limit=top_k * 4,
+        data_ini=config['data_ini'], data_fim=config['data_fim']
+    )
+
+    selected = []
+    for params, _ in trials:
+        fitted = fit_to_ranges(params, param_ranges)
+        if fitted is not None and fitted not in selected:
+            selected.append(fitted)
+        if len(selected) >= top_k:
+            break
+
+    return selected
+
+
+def enqueue_prior_trials(study, params_list):
+    """
+    Enfileira conjuntos de parâmetros para serem avaliados primeiro
+
+    Returns:
+        int: Quantidade de trials enfileirados
+    """
+    for params in params_list:
+        study.enqueue_trial(params, skip_if_exists=True)
+    return len(params_list)
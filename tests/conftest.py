@@ -0,0 +1,30 @@
+"""
+Configuração dos testes: os scripts de deploy/, controle/ e factory/ usam
+imports entre arquivos irmãos, então as pastas entram no sys.path.
+
+Sem o futures_backtester instalado, um módulo vazio ocupa o lugar dele para
+que o optimizer possa ser importado; os testes trocam make_backtester por um
+Backtester falso.
+"""
+
+import sys
+import types
+import importlib.util
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+for folder in [ROOT, ROOT / 'deploy', ROOT / 'controle', ROOT / 'factory']:
+    if str(folder) not in sys.path:
+        sys.path.insert(0, str(folder))
+
+
+class MissingBacktester:
+    """Backtester indisponível (futures_backtester não instalado)"""
+
+    def __init__(self, *args, **kwargs):
+        raise ImportError("futures_backtester não está instalado; use um Backtester falso no teste")
+
+
+if importlib.util.find_spec('futures_backtester') is None:
+    sys.modules['futures_backtester'] = types.ModuleType('futures_backtester')
+    sys.modules['futures_backtester'].Backtester = MissingBacktester
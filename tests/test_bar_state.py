@@ -0,0 +1,43 @@
+import pandas as pd
+
+from bar_state import merge_bars
+
+
+def _bars(start, n, base=100.0):
+    index = pd.date_range(start, periods=n, freq='5min', name='time')
+    close = base + pd.Series(range(n), index=index, dtype=float)
+    return pd.DataFrame({'open': close - 1, 'high': close + 2, 'low': close - 2, 'close': close,
+                         'tick_volume': 10}, index=index)
+
+
+def test_overlapping_bars_are_appended():
+    bars = _bars('2025-06-02 09:00', 10)
+    merged = merge_bars(bars.iloc[:6], bars.iloc[4:])
+
+    pd.testing.assert_frame_equal(merged, bars)
+
+
+def test_new_bars_replace_the_overlap():
+    bars = _bars('2025-06-02 09:00', 10)
+    new = bars.iloc[4:].copy()
+    new['tick_volume'] = 99
+    merged = merge_bars(bars.iloc[:6], new)
+
+    assert list(merged['tick_volume']) == [10] * 4 + [99] * 6
+
+
+def test_changed_prices_in_the_overlap_break_continuity():
+    bars = _bars('2025-06-02 09:00', 10)
+    new = bars.iloc[4:].copy()
+    new.iloc[0, new.columns.get_loc('close')] += 5
+
+    assert merge_bars(bars.iloc[:6], new) is None
+
+
+def test_gap_or_missing_bar_breaks_continuity():
+    bars = _bars('2025-06-02 09:00', 10)
+
+    assert merge_bars(bars.iloc[:4], bars.iloc[6:]) is None
+    assert merge_bars(bars.iloc[:6], bars.iloc[4:].drop(bars.index[5])) is None
+    assert merge_bars(None, bars) is None
+    assert merge_bars(bars.iloc[:0], bars) is None
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.bars import BarAggregator, bar_starts, resample_bars, timeframe_minutes
+
+
+def _ticks(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.Timestamp('2025-06-02 09:00') + pd.to_timedelta(np.sort(rng.integers(0, 3 * 86_400_000, n)), unit='ms')
+    return pd.DataFrame({'last': 100000 + np.cumsum(rng.normal(0, 5, n)), 'volume': rng.integers(1, 10, n)},
+                        index=pd.DatetimeIndex(times, name='time'))
+
+
+@pytest.mark.parametrize('timeframe, minutes', [('t7', 7), ('h4', 240), ('h24', 1440), ('d1', 1440)])
+def test_timeframes_up_to_one_day(timeframe, minutes):
+    assert timeframe_minutes(timeframe) == minutes
+
+
+@pytest.mark.parametrize('timeframe', ['d2', 'd5', 'h25', 't1441', 't0', 'w1'])
+def test_invalid_or_multi_day_timeframes_are_rejected(timeframe):
+    with pytest.raises(ValueError):
+        timeframe_minutes(timeframe)
+
+
+def test_bar_starts_restart_at_midnight():
+    times = pd.DatetimeIndex(['2025-06-02 23:55', '2025-06-03 00:03', '2025-06-03 00:08'])
+    assert list(pd.DatetimeIndex(bar_starts(times, 't7')).strftime('%d %H:%M')) == ['02 23:55', '03 00:00',
+                                                                                    '03 00:07']
+
+
+@pytest.mark.parametrize('timeframe', ['t1', 't5', 't7', 'h1'])
+def test_streaming_aggregation_matches_the_whole_block(timeframe):
+    ticks = _ticks()
+    expected = resample_bars(ticks, timeframe)
+
+    aggregator = BarAggregator(timeframe)
+    parts = [aggregator.update(ticks.iloc[i:i + 333]) for i in range(0, len(ticks), 333)]
+    parts.append(aggregator.flush())
+    streamed = pd.concat(parts)
+
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)
+
+
+def test_aggregator_drops_late_ticks_and_closes_by_clock():
+    ticks = _ticks(200)
+    aggregator = BarAggregator('t5')
+    aggregator.update(ticks.iloc[100:])
+    assert aggregator.update(ticks.iloc[:10]).empty
+    assert aggregator.late == 10
+
+    partial_start = aggregator.partial.index[0]
+    assert aggregator.close_until(partial_start + pd.Timedelta(minutes=4)).empty
+    closed = aggregator.close_until(partial_start + pd.Timedelta(minutes=5))
+    assert list(closed.index) == [partial_start] and aggregator.partial is None
@@ -0,0 +1,70 @@
+import os
+import shutil
+
+from optimizer.catalog import ResultsCatalog
+from optimizer.results import save_json, hour_result_path
+
+
+def _run(resultados, name, symbol, hours, calmar):
+    run_dir = os.path.join(resultados, name)
+    os.makedirs(run_dir)
+    save_json(os.path.join(run_dir, 'config.json'), {
+        'symbol': symbol, 'strategy': 'bb_trend', 'timeframe': 't5', 'data_ini': '2019-01-01',
+        'data_fim': '2025-06-14', 'optimize_metric': 'calmar_ratio', 'direction': 'maximize'})
+    for hour in hours:
+        save_json(hour_result_path(run_dir, hour), {
+            'hour': hour, 'best_params': {'tp': 10, 'allowed_hours': [hour]}, 'best_value': calmar + hour,
+            'metrics': {'calmar_ratio': calmar + hour, 'total_trades': 100 * hour}})
+    return run_dir
+
+
+def test_ingest_query_and_incremental_update(tmp_path):
+    resultados = str(tmp_path)
+    _run(resultados, 'run_WIN@N_bb_trend_t5_20250101_120000', 'WIN@N', [9, 10], 1.0)
+    old = _run(resultados, 'run_WDO@N_bb_trend_t5_20250102_120000', 'WDO@N', [9], 2.0)
+    catalog = ResultsCatalog(resultados)
+
+    assert catalog.update(verbose=False) == 3
+    assert catalog.update(verbose=False) == 0
+
+    df = catalog.query(symbol='WIN@N')
+    assert list(df['hour']) == [10, 9]
+    assert list(df['trades']) == [1000, 900]
+    assert df['params'].iloc[0]['allowed_hours'] == [10]
+    assert df['run_timestamp'].iloc[0] == '2025-01-01T12:00:00'
+    assert list(catalog.query(min_trades=950)['hour']) == [10]
+
+    # Run novo entra, run apagado sai
+    _run(resultados, 'run_WIN@N_bb_trend_t5_20250103_120000', 'WIN@N', [9], 5.0)
+    shutil.rmtree(old)
+    assert catalog.update(verbose=False) == 1
+
+    df = catalog.query(best_per_hour=True)
+    assert set(df['symbol']) == {'WIN@N'}
+    assert sorted(zip(df['hour'], df['calmar_ratio'])) == [(9, 14.0), (10, 11.0)]
+    catalog.close()
+
+
+def test_modified_result_is_reingested(tmp_path):
+    resultados = str(tmp_path)
+    run_dir = _run(resultados, 'run_WIN@N_bb_trend_t5_20250101_120000', 'WIN@N', [9], 1.0)
+    catalog = ResultsCatalog(resultados)
+    catalog.update(verbose=False)
+
+    path = hour_result_path(run_dir, 9)
+    save_json(path, {'hour': 9, 'best_params': {}, 'best_value': 3.0, 'metrics': {'calmar_ratio': 3.0}})
+    os.utime(path, (os.path.getmtime(path) + 10, os.path.getmtime(path) + 10))
+
+    assert catalog.update(verbose=False) == 1
+    assert list(catalog.query()['calmar_ratio']) == [3.0]
+    catalog.close()
+
+
+def test_insert_does_not_modify_the_result(tmp_path):
+    catalog = ResultsCatalog(str(tmp_path))
+    result = {'hour': 9, 'best_params': {}, 'metrics': {'total_trades': 7}}
+
+    catalog._insert('run_x', {}, result)
+
+    assert result['metrics'] == {'total_trades': 7}
+    catalog.close()
@@ -0,0 +1,23 @@
+import pandas as pd
+
+from latency import LatencyTracker, STAT_COLUMNS
+
+
+def test_percentiles_have_fixed_columns_without_samples():
+    df = LatencyTracker().percentiles()
+    assert list(df.columns) == STAT_COLUMNS
+    assert df['p50'].isna().all()
+
+
+def test_export_header_is_stable_across_idle_and_busy_exports(tmp_path):
+    path = tmp_path / 'latency.csv'
+    tracker = LatencyTracker(export_path=str(path))
+    tracker.export()
+    tracker.record('total', 0.012)
+    tracker.record('total', 0.020)
+    tracker.export()
+
+    df = pd.read_csv(path)
+    assert list(df.columns) == ['timestamp', 'stage'] + STAT_COLUMNS
+    busy = df[(df['stage'] == 'total') & (df['n'] > 0)]
+    assert busy['max'].iloc[0] == 20.0
@@ -0,0 +1,105 @@
+import os
+
+import pandas as pd
+import pytest
+
+os.environ.setdefault('MT5_FAKE', '1')
+import monitor_all_configs_mt5 as monitor
+
+
+SPECS = [{'config_file': f'combined_strategy_{m}.json', 'magic_number': m, 'data_fim': pd.Timestamp('2025-07-01')}
+         for m in (1111, 2222)]
+NEW_DEAL = pd.DataFrame({'position_id': [1]})
+
+
+class Store:
+    def compact(self):
+        pass
+
+
+def _daemon(monkeypatch, new_deals_by_cycle, update_results, split=lambda deals, magics: {}):
+    cycles = iter(new_deals_by_cycle)
+    monkeypatch.setattr(monitor, 'load_specs', lambda data_fim: (SPECS, 0))
+    monkeypatch.setattr(monitor, 'connect_mt5', lambda: monitor.mt5.initialize())
+    monkeypatch.setattr(monitor, 'open_deal_store', lambda store_dir: Store())
+    monkeypatch.setattr(monitor, 'sync_deal_store', lambda specs, store: (pd.DataFrame(), next(cycles)))
+    monkeypatch.setattr(monitor, 'split_deals_by_magic', split)
+    monkeypatch.setattr(monitor, 'changed_magics', lambda by_magic, new: {1111} if not new.empty else set())
+    monkeypatch.setattr(monitor, 'update_results', update_results)
+    monitor.run_daemon(interval=0, max_cycles=len(new_deals_by_cycle))
+
+
+def test_daemon_retries_magics_whose_update_failed(monkeypatch):
+    calls = []
+
+    def update_results(specs, deals_by_magic, changed, writer=None, verbose=True, failed=None):
+        calls.append(set(changed))
+        if len(calls) == 2:
+            failed.add(1111)
+        return len(changed), 0
+
+    _daemon(monkeypatch, [pd.DataFrame(), NEW_DEAL, pd.DataFrame(), pd.DataFrame()], update_results)
+
+    assert calls == [{1111, 2222}, {1111}, {1111}]
+
+
+def test_daemon_reprocesses_everything_when_a_cycle_fails_after_sync(monkeypatch):
+    calls = []
+    splits = []
+
+    def split(deals, magics):
+        splits.append(1)
+        if len(splits) == 2:
+            raise RuntimeError('falha depois do sync')
+        return {}
+
+    def update_results(specs, deals_by_magic, changed, writer=None, verbose=True, failed=None):
+        calls.append(set(changed))
+        return len(changed), 0
+
+    _daemon(monkeypatch, [pd.DataFrame(), NEW_DEAL, pd.DataFrame(), pd.DataFrame()], update_results, split)
+
+    assert calls == [{1111, 2222}, {1111, 2222}]
+
+
+def test_writer_reports_failed_saves_once(monkeypatch):
+    def save_results(spec, result_df):
+        if spec['magic_number'] == 2222:
+            raise OSError('disco cheio')
+
+    monkeypatch.setattr(monitor, 'save_results', save_results)
+    monkeypatch.setattr(monitor, 'results_path', lambda spec: str(spec['magic_number']))
+    writer = monitor.ResultsWriter()
+    for spec in SPECS:
+        writer.submit(spec, pd.DataFrame())
+    writer.close()
+
+    assert writer.take_failed() == {2222}
+    assert writer.take_failed() == set()
+
+
+def test_update_results_reprocesses_when_the_config_changes(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    config_file = tmp_path / 'combined_strategy_1.json'
+    config_file.write_text('{"tc": 0.5}')
+    spec = {'config_file': str(config_file), 'group': '*WIN*', 'symbol2': 'WINQ25', 'magic_number': 1111,
+            'cost_per_lot': 0.5, 'timeframe': 't5', 'strategy': 'bb_trend',
+            'data_ini': pd.Timestamp('2025-06-25'), 'data_fim': pd.Timestamp('2025-07-01')}
+    processed = []
+
+    def process_trades_data(dfmt5, magic_number, cost_per_lot, timeframe):
+        processed.append(cost_per_lot)
+        return pd.DataFrame({'pts_final': [1.0]})
+
+    monkeypatch.setattr(monitor, 'process_trades_data', process_trades_data)
+
+    monitor.update_results([spec], {}, changed=set())
+    monitor.update_results([spec], {}, changed=set())
+    assert processed == [0.5]
+
+    config_file.write_text('{"tc": 1.0}')
+    monitor.update_results([spec], {}, changed=set())
+    spec['cost_per_lot'] = 1.0
+    monitor.update_results([spec], {}, changed=set())
+    monitor.update_results([spec], {}, changed=set())
+    assert processed == [0.5, 0.5, 1.0]
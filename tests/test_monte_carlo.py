@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from optimizer.monte_carlo import trades_from_results, monte_carlo
+
+
+def _results():
+    index = pd.date_range('2025-06-02 09:00', periods=8, freq='5min', name='time')
+    # Posição só no candle de sinal, com o resultado do trade na mesma linha;
+    # dois sinais de compra seguidos são dois trades
+    position = [0, 1, 1, 0, -1, 0, 1, 0]
+    strategy = [0, 50, -30, 0, 20, 0, 0, 0]
+    return pd.DataFrame({'position': position, 'strategy': strategy}, index=index)
+
+
+def test_each_signal_candle_is_a_trade():
+    trades = trades_from_results(_results())
+
+    assert trades.tolist() == [50, -30, 20, 0]
+    assert list(trades.index.strftime('%H:%M')) == ['09:05', '09:10', '09:20', '09:30']
+
+
+def test_without_position_column_each_candle_with_result_is_a_trade():
+    trades = trades_from_results(_results().drop(columns='position'))
+
+    assert trades.tolist() == [50, -30, 20]
+
+
+def test_bootstrap_resamples_whole_trades():
+    trades = trades_from_results(_results())
+    sims = monte_carlo(trades, n_sims=200, scenario='bootstrap', seed=1)
+
+    # Somas de 4 trades sorteados entre 50, -30, 20 e 0
+    values = (50, -30, 20, 0)
+    possible = {a + b + c + d for a in values for b in values for c in values for d in values}
+    assert set(np.round(sims['total_return'], 6)) <= possible
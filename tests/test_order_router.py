@@ -0,0 +1,59 @@
+from fake_broker import FakeBroker
+from order_router import OrderRouter, RETCODE_DONE_PARTIAL
+
+
+def _request(magic=1, volume=2.0):
+    return {'symbol': 'WIN', 'direction': 1, 'volume': volume, 'tp': 100, 'sl': 100, 'magic': magic}
+
+
+def test_requote_is_resent_until_filled():
+    broker = FakeBroker(latency=0.0, requote_prob=1.0)
+    router = OrderRouter(broker, max_inflight=0, max_retries=2, retry_delay=0.0)
+    router.submit(_request())
+    record = router.completed[0]
+    assert record['attempts'] == 3 and not record['ok']
+    assert broker.exposure('WIN', 1) == {'position_volume': 0.0, 'working_volume': 0.0}
+
+
+def test_partial_fill_is_not_resent():
+    broker = FakeBroker(latency=0.0, partial_prob=1.0)
+    router = OrderRouter(broker, max_inflight=0, retry_delay=0.0)
+    router.submit(_request(volume=4.0))
+
+    record = router.completed[0]
+    assert len(broker.sends) == 1
+    assert record['retcode'] == RETCODE_DONE_PARTIAL and record['filled'] == 2.0 and not record['ok']
+    assert record['reconciled'] == {'position_volume': 2.0, 'working_volume': 2.0}
+    # Posição + restante no livro nunca passam do volume pedido
+    assert sum(record['reconciled'].values()) == 4.0
+
+
+def test_lost_reply_is_reconciled_instead_of_resent():
+    broker = FakeBroker(latency=0.0, no_reply_prob=1.0)
+    router = OrderRouter(broker, max_inflight=0, retry_delay=0.0)
+    router.submit(_request(volume=2.0))
+
+    record = router.completed[0]
+    assert len(broker.sends) == 1
+    assert record['retcode'] is None and record['ok'] and record['filled'] == 2.0
+    assert broker.exposure('WIN', 1)['position_volume'] == 2.0
+
+
+def test_threaded_router_sends_every_magic_once():
+    broker = FakeBroker(latency=0.005)
+    router = OrderRouter(broker, max_inflight=3, max_queue=10)
+    for magic in range(6):
+        assert router.submit(_request(magic))
+    router.close()
+    assert sorted(r['magic'] for r in router.completed) == list(range(6))
+    assert all(r['ok'] for r in router.completed)
+    assert not any(router.is_pending(m) for m in range(6))
+
+
+def test_full_queue_drops_request():
+    broker = FakeBroker(latency=0.2)
+    router = OrderRouter(broker, max_inflight=1, max_queue=1, submit_timeout=0.01)
+    results = [router.submit(_request(m)) for m in range(4)]
+    router.close()
+    assert results.count(False) >= 1
+    assert len(router.dropped) == results.count(False)
@@ -0,0 +1,67 @@
+import pandas as pd
+
+from optimizer import session as session_module
+from optimizer.session import OptimizerSession
+
+
+class TpBacktester:
+    """Backtester falso: o resultado por candle é o tp da criação (não relê bt.tp no run)"""
+
+    created = []
+
+    def __init__(self, tp, sl, data_ini, data_fim):
+        self.tp, self.sl = tp, sl
+        self._created_tp = tp
+        TpBacktester.created.append((data_ini, data_fim, tp, sl))
+
+    def run(self, signal_function, signal_args):
+        df = pd.DataFrame({'close': [1.0, 2.0, 3.0]},
+                          index=pd.date_range('2025-01-02 09:00', periods=3, freq='5min'))
+        results = pd.DataFrame({'strategy': signal_function(df, **signal_args) * self._created_tp})
+        return results, {'total_return': float(results['strategy'].sum())}
+
+
+def _session(monkeypatch, calls, **kwargs):
+    TpBacktester.created = []
+    monkeypatch.setattr(session_module, 'make_backtester',
+                        lambda config, tp, sl, data_ini, data_fim: TpBacktester(tp, sl, data_ini, data_fim))
+
+    def signal(df, factor=1.0):
+        calls.append(factor)
+        return pd.Series(factor, index=df.index)
+
+    return OptimizerSession({'data_ini': '2025-01-01', 'data_fim': '2025-01-31'}, signal, **kwargs)
+
+
+def test_each_tp_sl_gets_its_own_backtester(monkeypatch):
+    calls = []
+    session = _session(monkeypatch, calls)
+
+    returns = [session.evaluate({'tp': tp, 'sl': 5})[1]['total_return'] for tp in (10, 20, 10, 30)]
+
+    assert returns == [30, 60, 30, 90]
+    assert TpBacktester.created == [('2025-01-01', '2025-01-31', tp, 5) for tp in (10, 20, 30)]
+    assert (session.backtester_hits, session.backtester_misses) == (1, 3)
+
+
+def test_signal_is_computed_once_per_signal_args(monkeypatch):
+    calls = []
+    session = _session(monkeypatch, calls)
+
+    session.evaluate({'tp': 10, 'sl': 5, 'factor': 2.0})
+    session.evaluate({'tp': 20, 'sl': 5, 'factor': 2.0})
+    session.evaluate({'tp': 20, 'sl': 5, 'factor': 3.0})
+
+    assert calls == [2.0, 3.0]
+    assert (session.signal_hits, session.signal_misses) == (1, 2)
+
+
+def test_backtesters_are_evicted_in_lru_order(monkeypatch):
+    session = _session(monkeypatch, [], max_backtesters=2)
+
+    for tp in (10, 20, 10, 30, 20):
+        session.evaluate({'tp': tp, 'sl': 5})
+
+    # 20 saiu ao entrar o 30 (10 tinha sido usado depois) e precisou ser recriado
+    assert [c[2] for c in TpBacktester.created] == [10, 20, 30, 20]
+    assert session.stats()['backtesters'] == 2
@@ -0,0 +1,39 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from common.shared_ohlc import SharedOHLC, attach_all, shared_frame
+
+
+def _bars(n=1000):
+    index = pd.date_range('2025-01-02 09:00', periods=n, freq='5min', name='time')
+    close = 100000 + np.arange(n, dtype=float)
+    return pd.DataFrame({'open': close, 'high': close + 5, 'low': close - 5, 'close': close,
+                         'tick_volume': 1.0, 'volume': 2.0}, index=index)
+
+
+def _worker_sum(key):
+    frame = shared_frame(key)
+    return float(frame.column('close').sum()), str(frame.index[-1])
+
+
+def test_spawned_worker_attaches_after_publish():
+    df = _bars()
+    with SharedOHLC() as plane:
+        spec = plane.publish(('WIN@N', 't5'), df)
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(2, mp_context=context, initializer=attach_all, initargs=([spec],)) as executor:
+            results = list(executor.map(_worker_sum, [('WIN@N', 't5')] * 4))
+
+    assert results == [(float(df['close'].sum()), str(df.index[-1]))] * 4
+
+
+def test_parent_keeps_block_open_until_close():
+    plane = SharedOHLC()
+    spec = plane.publish('x', _bars(10))
+    shm = plane.blocks[spec.shm_name]
+    assert np.ndarray((10,), dtype=np.int64, buffer=shm.buf)[0] == pd.Timestamp('2025-01-02 09:00').value
+    plane.close()
+    assert not plane.blocks
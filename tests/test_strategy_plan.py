@@ -0,0 +1,70 @@
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.strategy_plan import GroupSignal, compile_plan
+
+
+def rsi_like(df, length, level, allowed_hours=None, position_type='both'):
+    """Mesma estrutura das funções de entries.py: indicador, posição e máscara de horas no fim"""
+    mean = df['close'].rolling(length).mean()
+    position = pd.Series(np.where(df['close'] > mean + level, 1, np.where(df['close'] < mean - level, -1, 0)),
+                         index=df.index)
+    if allowed_hours is not None:
+        position[~df.index.hour.isin(allowed_hours)] = 0
+    return position
+
+
+STRATEGIES = types.SimpleNamespace(rsi_like=rsi_like)
+
+
+def _config(**hour_params):
+    return {'symbol': 'WINQ25', 'timeframe': 't5', 'strategy': 'rsi_like', 'magic_number': 1111,
+            'hours': [int(h) for h in hour_params], 'hour_params': hour_params}
+
+
+def _bars():
+    index = pd.date_range('2025-06-02 09:00', periods=2000, freq='5min', name='time')
+    close = 100000 + np.cumsum(np.random.default_rng(3).normal(0, 20, len(index)))
+    return pd.DataFrame({'close': close}, index=index)
+
+
+def test_compile_plan_groups_identical_hours_and_types_values():
+    same = {'tp': 100.0, 'sl': 80, 'length': 9.0, 'level': 5, 'allowed_hours': [9]}
+    plan = compile_plan(_config(**{'9': same, '10': dict(same, allowed_hours=[10]),
+                                   '11': dict(same, length=14)}), strategies_module=STRATEGIES)
+
+    assert [g.hours for g in plan.groups] == [(9, 10), (11,)]
+    assert plan.by_hour[10] is plan.groups[0]
+    assert plan.groups[0].signal_args() == {'length': 9, 'level': 5, 'allowed_hours': [9, 10]}
+    assert isinstance(plan.groups[0].signal_args()['length'], int)
+    assert plan.hour_group(12) is None
+
+
+@pytest.mark.parametrize('config, message', [
+    ({'symbol': 'X'}, 'campos obrigatórios'),
+    (_config(**{'9': {'sl': 1, 'length': 9, 'level': 5}}), 'tp/sl'),
+    (dict(_config(**{'9': {'tp': 1, 'sl': 1, 'length': 9, 'level': 5}}), hours=[9, 10]), 'sem hour_params'),
+    (_config(**{'9': {'tp': 1, 'sl': 1, 'length': 9, 'bogus': 5}}), 'incompatíveis'),
+])
+def test_compile_plan_rejects_invalid_configs(config, message):
+    with pytest.raises(ValueError, match=message):
+        compile_plan(config, strategies_module=STRATEGIES)
+
+
+def test_group_signal_matches_per_hour_calls_with_one_computation():
+    params = {'tp': 100, 'sl': 80, 'length': 12, 'level': 10}
+    plan = compile_plan(_config(**{'9': params, '10': params, '11': params}), strategies_module=STRATEGIES)
+    group = plan.groups[0]
+    signal = GroupSignal(plan.signal_function, group)
+    df = _bars()
+
+    for hour in group.hours:
+        expected = rsi_like(df, 12, 10, allowed_hours=[hour])
+        pd.testing.assert_series_equal(signal.for_hour(hour)(df), expected, check_names=False)
+
+    assert signal.calls == 1
+    signal.position(df.iloc[:-10])
+    assert signal.calls == 2
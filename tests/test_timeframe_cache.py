@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from common.bars import resample_bars
+from common.candle_store import CandleStore
+from common.timeframe_cache import TimeframeCache
+
+
+def _t1(days=3):
+    index = pd.date_range('2025-06-02 09:00', periods=days * 24 * 60, freq='min', name='time')
+    close = 100000 + np.cumsum(np.random.default_rng(0).normal(0, 5, len(index)))
+    return pd.DataFrame({'open': close, 'high': close + 5, 'low': close - 5, 'close': close,
+                         'tick_volume': 1.0, 'volume': 2.0}, index=index)
+
+
+def test_derived_timeframes_are_reused_from_disk(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.append('WIN@N', 't1', _t1())
+
+    first = TimeframeCache(store)
+    derived = first.get('WIN@N', 't5')
+    second = TimeframeCache(store)
+    pd.testing.assert_frame_equal(second.get('WIN@N', 't5'), derived, check_freq=False)
+
+    assert (first.derived, second.derived, second.disk_hits) == (1, 0, 1)
+    assert store.timeframes('WIN@N') == ['t1', 't5']
+
+
+def test_derived_timeframe_is_rebuilt_when_the_base_changes_inside_the_period(tmp_path):
+    store = CandleStore(str(tmp_path))
+    base = _t1()
+    store.append('WIN@N', 't1', base)
+    TimeframeCache(store).get('WIN@N', 't15')
+
+    # Mesmo primeiro e último candle: só a impressão digital do t1 detecta a mudança
+    changed = base.copy()
+    changed.iloc[2000, changed.columns.get_loc('high')] += 500
+    changed = changed.drop(changed.index[3000:3100])
+    store.drop('WIN@N', 't1')
+    store.append('WIN@N', 't1', changed)
+
+    cache = TimeframeCache(store)
+    rebuilt = cache.get('WIN@N', 't15')
+
+    assert (cache.derived, cache.disk_hits) == (1, 0)
+    pd.testing.assert_frame_equal(rebuilt, resample_bars(changed, 't15'), check_freq=False)
+    pd.testing.assert_frame_equal(store.load('WIN@N', 't15'), rebuilt, check_freq=False)
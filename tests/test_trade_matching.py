@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_matching import DEAL_ENTRY_IN, DEAL_ENTRY_INOUT, DEAL_ENTRY_OUT, match_trades, split_reversals
+
+
+def _deals(rows, entry=True):
+    columns = ['time', 'type', 'entry', 'position_id', 'magic', 'price', 'volume', 'profit', 'comment']
+    df = pd.DataFrame(rows, columns=columns)
+    df['time'] = pd.to_datetime(df['time'])
+    return df if entry else df.drop(columns='entry')
+
+
+def test_entry_and_exit_become_one_trade():
+    trades = match_trades(_deals([
+        ('2025-06-02 09:05', 0, DEAL_ENTRY_IN, 1, 1111, 100.0, 1.0, 0.0, ''),
+        ('2025-06-02 09:20', 1, DEAL_ENTRY_OUT, 1, 1111, 110.0, 1.0, 10.0, '[tp 110]'),
+    ]))
+
+    assert len(trades) == 1
+    trade = trades.iloc[0]
+    assert (trade['posi'], trade['price_ent'], trade['price_ext'], trade['profit']) == ('long', 100.0, 110.0, 10.0)
+    assert trade['time_ext'] == pd.Timestamp('2025-06-02 09:20')
+    assert trade['leg'] == 0
+
+
+def test_partial_exits_are_weighted_by_volume():
+    trades = match_trades(_deals([
+        ('2025-06-02 09:05', 1, DEAL_ENTRY_IN, 2, 1111, 200.0, 3.0, 0.0, ''),
+        ('2025-06-02 09:10', 0, DEAL_ENTRY_OUT, 2, 1111, 190.0, 1.0, 10.0, ''),
+        ('2025-06-02 09:15', 0, DEAL_ENTRY_OUT, 2, 1111, 180.0, 2.0, 40.0, ''),
+    ]))
+
+    trade = trades.iloc[0]
+    assert trade['posi'] == 'short'
+    assert trade['n_exits'] == 2
+    assert trade['volume_ext'] == 3.0
+    assert trade['price_ext'] == pytest.approx(550.0 / 3)
+    assert trade['profit'] == 50.0
+    assert trade['time_ext'] == pd.Timestamp('2025-06-02 09:15')
+
+
+def test_without_entry_column_uses_magic_and_comment():
+    trades = match_trades(_deals([
+        ('2025-06-02 09:05', 0, None, 3, 1111, 100.0, 1.0, 0.0, ''),
+        ('2025-06-02 09:20', 1, None, 3, 0, 95.0, 1.0, -5.0, 'stop'),
+        ('2025-06-02 10:05', 0, None, 4, 1111, 100.0, 1.0, 0.0, ''),
+        ('2025-06-02 10:20', 1, None, 4, 1111, 90.0, 1.0, -10.0, '[sl 90]'),
+    ], entry=False))
+
+    assert list(trades['position_id']) == [3, 4]
+    assert list(trades['price_ext']) == [95.0, 90.0]
+    assert list(trades['n_exits']) == [1, 1]
+
+
+def test_reversal_closes_the_position_and_opens_the_opposite_one():
+    trades = match_trades(_deals([
+        ('2025-06-02 09:05', 0, DEAL_ENTRY_IN, 7, 1111, 100.0, 1.0, 0.0, ''),
+        ('2025-06-02 09:20', 1, DEAL_ENTRY_INOUT, 7, 1111, 110.0, 2.0, 10.0, ''),
+        ('2025-06-02 09:40', 0, DEAL_ENTRY_OUT, 7, 1111, 105.0, 1.0, 5.0, '[tp 105]'),
+    ]))
+
+    assert len(trades) == 2
+    long_leg, short_leg = trades.iloc[0], trades.iloc[1]
+    assert (long_leg['posi'], long_leg['leg'], long_leg['price_ent'], long_leg['price_ext']) == ('long', 0, 100.0, 110.0)
+    assert (long_leg['volume'], long_leg['volume_ext'], long_leg['profit']) == (1.0, 1.0, 10.0)
+    assert (short_leg['posi'], short_leg['leg'], short_leg['price_ent'], short_leg['price_ext']) == ('short', 1, 110.0, 105.0)
+    assert (short_leg['volume'], short_leg['volume_ext'], short_leg['profit']) == (1.0, 1.0, 5.0)
+    assert short_leg['time_ent'] == pd.Timestamp('2025-06-02 09:20')
+    assert list(trades['position_id']) == [7, 7]
+
+
+def test_split_reversals_keeps_other_positions_untouched():
+    deals = _deals([
+        ('2025-06-02 09:00', 1, DEAL_ENTRY_IN, 5, 1111, 100.0, 1.0, 0.0, ''),
+        ('2025-06-02 09:05', 0, DEAL_ENTRY_IN, 7, 1111, 100.0, 1.0, 0.0, ''),
+        ('2025-06-02 09:20', 1, DEAL_ENTRY_INOUT, 7, 1111, 110.0, 3.0, 10.0, ''),
+        ('2025-06-02 09:30', 0, DEAL_ENTRY_INOUT, 7, 1111, 104.0, 4.0, 12.0, ''),
+    ])
+    split = split_reversals(deals).sort_values(['position_id', 'leg', 'time'], kind='stable')
+
+    assert list(split['leg']) == [0, 0, 0, 1, 1, 2]
+    assert list(split['entry']) == [DEAL_ENTRY_IN, DEAL_ENTRY_IN, DEAL_ENTRY_OUT, DEAL_ENTRY_IN,
+                                    DEAL_ENTRY_OUT, DEAL_ENTRY_IN]
+    assert list(split['volume']) == [1.0, 1.0, 1.0, 2.0, 2.0, 2.0]
+    assert list(split['profit']) == [0.0, 0.0, 10.0, 0.0, 12.0, 0.0]
+    assert split['volume'].dtype == deals['volume'].dtype
+
+
+def test_magic_filter_and_open_positions():
+    trades = match_trades(_deals([
+        ('2025-06-02 09:05', 0, DEAL_ENTRY_IN, 1, 1111, 100.0, 1.0, 0.0, ''),
+        ('2025-06-02 09:06', 0, DEAL_ENTRY_IN, 2, 2222, 100.0, 1.0, 0.0, ''),
+        ('2025-06-02 09:20', 1, DEAL_ENTRY_OUT, 2, 2222, 101.0, 1.0, 1.0, ''),
+    ]), magic_numbers=[1111])
+
+    assert list(trades['position_id']) == [1]
+    assert pd.isna(trades['time_ext'].iloc[0]) and np.isnan(trades['price_ext'].iloc[0])
+    assert trades['n_exits'].iloc[0] == 0
@@ -0,0 +1,80 @@
+import os
+
+from optimizer.results import save_json, save_hour_result
+from optimizer.trial_cache import TrialCache, seed_from_resultados, strategy_fingerprint, legacy_fingerprint
+
+
+def bb_trend(df, bb_length=5, std=1.0, allowed_hours=None):
+    return df['close'] * 0
+
+
+CONFIG = {'symbol': 'WIN@N', 'timeframe': 't5', 'data_ini': '2024-01-01', 'data_fim': '2024-12-31',
+          'tc': 1.0, 'valor_lote': 0.2, 'strategy': 'bb_trend'}
+
+
+def _run(resultados, name, fingerprint, calmar):
+    run_dir = os.path.join(resultados, f'run_WIN@N_bb_trend_t5_{name}')
+    os.makedirs(run_dir)
+    config = dict(CONFIG) if fingerprint is None else dict(CONFIG, strategy_fingerprint=fingerprint)
+    save_json(os.path.join(run_dir, 'config.json'), config)
+    save_hour_result(run_dir, 9, {'bb_length': 5, 'std': 1.0 + calmar, 'allowed_hours': [9]}, calmar,
+                     {'calmar_ratio': calmar}, 'calmar_ratio', 'maximize')
+
+
+def test_seed_keeps_stale_and_unrecorded_runs_apart(tmp_path):
+    resultados = str(tmp_path / 'resultados')
+    current = strategy_fingerprint(bb_trend)
+    _run(resultados, 'current', current, 1.0)
+    _run(resultados, 'stale', 'bb_trend:0123456789ab', 2.0)
+    _run(resultados, 'legacy', None, 3.0)
+
+    cache = TrialCache(str(tmp_path / 'cache.sqlite'))
+    assert seed_from_resultados(cache, resultados, {'bb_trend': bb_trend}) == 2
+
+    trials = cache.best_trials('WIN@N', 't5', current, 9, 'calmar_ratio')
+    assert [m['calmar_ratio'] for _, m in trials] == [1.0]
+    assert cache.get(CONFIG, current, 9, {'bb_length': 5, 'std': 4.0, 'allowed_hours': [9]}) is None
+
+    legacy = cache.best_trials('WIN@N', 't5', legacy_fingerprint('bb_trend'), 9, 'calmar_ratio')
+    assert [m['calmar_ratio'] for _, m in legacy] == [3.0]
+
+    cache.close()
+    cache = TrialCache(str(tmp_path / 'cache_no_legacy.sqlite'))
+    assert seed_from_resultados(cache, resultados, {'bb_trend': bb_trend}, seed_legacy=False) == 1
+    cache.close()
+
+
+def test_seed_uses_the_recorded_metrics_source_of_pruned_runs(tmp_path):
+    resultados = str(tmp_path / 'resultados')
+    config = dict(CONFIG, strategy_fingerprint=strategy_fingerprint(bb_trend), pruning={'chunk_freq': 'YS'})
+    params = {'bb_length': 5, 'std': 1.0, 'allowed_hours': [9]}
+    for name, extra in [('old', {}), ('new', {'metrics_source': 'backtester'})]:
+        run_dir = os.path.join(resultados, f'run_WIN@N_bb_trend_t5_{name}')
+        os.makedirs(run_dir)
+        save_json(os.path.join(run_dir, 'config.json'), config)
+        save_hour_result(run_dir, 9, dict(params, std=2.0 if name == 'new' else 1.0), 1.0,
+                         {'calmar_ratio': 1.0}, 'calmar_ratio', 'maximize', **extra)
+
+    cache = TrialCache(str(tmp_path / 'cache.sqlite'))
+    seed_from_resultados(cache, resultados, {'bb_trend': bb_trend})
+    current = strategy_fingerprint(bb_trend)
+
+    assert cache.get(CONFIG, current, 9, params, source='chunked') is not None
+    assert cache.get(CONFIG, current, 9, params) is None
+    assert cache.get(CONFIG, current, 9, dict(params, std=2.0)) is not None
+    cache.close()
+
+
+def test_best_trials_do_not_mix_metric_sources(tmp_path):
+    cache = TrialCache(str(tmp_path / 'cache.sqlite'))
+    current = strategy_fingerprint(bb_trend)
+    params = {'bb_length': 5, 'allowed_hours': [9]}
+    cache.put(CONFIG, current, 9, dict(params, std=1.0), {'calmar_ratio': 1.0})
+    cache.put(CONFIG, current, 9, dict(params, std=2.0), {'calmar_ratio': 9.0}, source='chunked')
+
+    full = cache.best_trials('WIN@N', 't5', current, 9, 'calmar_ratio')
+    chunked = cache.best_trials('WIN@N', 't5', current, 9, 'calmar_ratio', source='chunked')
+
+    assert [p['std'] for p, _ in full] == [1.0]
+    assert [p['std'] for p, _ in chunked] == [2.0]
+    cache.close()
@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+
+from optimizer import session as session_module
+from optimizer import walk_forward
+from optimizer.walk_forward import build_windows, window_pnl
+
+
+CONFIG = {'symbol': 'WIN@N', 'timeframe': 't5', 'data_ini': '2024-01-01', 'data_fim': '2024-12-31',
+          'initial_cash': 30000}
+
+
+class DailyBacktester:
+    """Backtester falso: um candle por dia e resultado = posição x tp"""
+
+    created = []
+
+    def __init__(self, tp, data_ini, data_fim):
+        self.tp = tp
+        self.index = pd.date_range(data_ini, data_fim, freq='D', name='time')
+        DailyBacktester.created.append((data_ini, data_fim, tp))
+
+    def run(self, signal_function, signal_args):
+        df = pd.DataFrame({'close': 1.0}, index=self.index)
+        results = pd.DataFrame({'strategy': signal_function(df, **signal_args) * self.tp})
+        return results, {'total_return': float(results['strategy'].sum())}
+
+
+def entry(df, allowed_hours=None):
+    return pd.Series(1.0, index=df.index)
+
+
+@pytest.fixture
+def fake_backtester(monkeypatch):
+    DailyBacktester.created = []
+    monkeypatch.setattr(session_module, 'make_backtester',
+                        lambda config, tp, sl, data_ini, data_fim: DailyBacktester(tp, data_ini, data_fim))
+    monkeypatch.setattr(walk_forward, '_SESSION', None)
+
+
+def test_rolling_and_anchored_windows():
+    windows = build_windows('2024-01-01', '2024-12-31', is_months=6, oos_months=3)
+
+    assert [(w['is_ini'], w['is_fim'], w['oos_ini'], w['oos_fim']) for w in windows] == [
+        ('2024-01-01', '2024-06-30', '2024-07-01', '2024-09-30'),
+        ('2024-04-01', '2024-09-30', '2024-10-01', '2024-12-31'),
+    ]
+    anchored = build_windows('2024-01-01', '2024-12-31', is_months=6, oos_months=3, anchored=True)
+    assert [w['is_ini'] for w in anchored] == ['2024-01-01', '2024-01-01']
+
+
+def test_last_oos_is_cut_at_the_end_of_the_period():
+    windows = build_windows('2024-01-01', '2024-11-15', is_months=6, oos_months=3)
+
+    assert windows[-1]['oos_fim'] == '2024-11-15'
+
+
+def test_window_pnl_includes_the_whole_last_day():
+    index = pd.date_range('2024-06-29', '2024-07-02 23:00', freq='h')
+    results = pd.DataFrame({'strategy': 1.0}, index=index)
+
+    pnl = window_pnl(results, '2024-06-30', '2024-07-01')
+    assert (pnl.index[0], pnl.index[-1], len(pnl)) == (pd.Timestamp('2024-06-30 00:00'),
+                                                      pd.Timestamp('2024-07-01 23:00'), 48)
+
+
+def test_windows_are_sliced_from_one_run_of_the_whole_period(fake_backtester):
+    windows = build_windows(CONFIG['data_ini'], CONFIG['data_fim'], is_months=6, oos_months=3)
+    tasks = [walk_forward._run_task(CONFIG, entry, {'tp': (1, 3)}, {'sl': 1}, 10, i, window,
+                                    num_trials=6, optimize_metric='total_return', direction='maximize',
+                                    cache_path=None)
+             for i, window in enumerate(windows)]
+
+    for task, window in zip(tasks, windows):
+        tp = task['best_params']['tp']
+        is_days = len(pd.date_range(window['is_ini'], window['is_fim']))
+        oos_days = len(pd.date_range(window['oos_ini'], window['oos_fim']))
+
+        assert task['is_metrics']['total_return'] == tp * is_days
+        assert task['oos_metrics']['total_return'] == tp * oos_days
+        assert task['oos_pnl'].index[0] == pd.Timestamp(window['oos_ini'])
+        assert task['oos_pnl'].index[-1] == pd.Timestamp(window['oos_fim'])
+
+    # Os Backtesters cobrem sempre o período completo, um por tp, compartilhados pelas janelas
+    assert {(ini, fim) for ini, fim, _ in DailyBacktester.created} == {(CONFIG['data_ini'], CONFIG['data_fim'])}
+    assert len(DailyBacktester.created) == len({tp for _, _, tp in DailyBacktester.created})
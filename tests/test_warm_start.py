@@ -0,0 +1,48 @@
+from optimizer.warm_start import fit_to_ranges
+
+
+RANGES = {
+    'tp': (10.0, 50.0),
+    'sl': [2.0, 32.0, 0.5],
+    'length': (4, 9),
+    'std': (0.8, 2.0, 0.1),
+    'ma_length': [5, 10, 20, 40],
+    'use_filter': [True, False],
+    'mode': ['trend', 'reversal'],
+}
+
+
+def _params(**overrides):
+    params = {'tp': 20.0, 'sl': 7.3, 'length': 6, 'std': 1.23, 'ma_length': 20,
+              'use_filter': False, 'mode': 'trend'}
+    params.update(overrides)
+    return params
+
+
+def test_numeric_values_are_clipped_and_snapped_to_the_step():
+    fitted = fit_to_ranges(_params(tp=80.0, length=12, std=1.23, sl=7.3), RANGES)
+
+    assert fitted['tp'] == 50.0
+    assert fitted['length'] == 9 and isinstance(fitted['length'], int)
+    assert fitted['std'] == 1.2
+    assert fitted['sl'] == 7.5
+
+
+def test_int_and_bool_categorical_lists_are_kept_as_categories():
+    fitted = fit_to_ranges(_params(ma_length=40, use_filter=True), RANGES)
+
+    assert fitted['ma_length'] == 40
+    assert fitted['use_filter'] is True
+
+
+def test_values_outside_categorical_lists_are_rejected():
+    assert fit_to_ranges(_params(ma_length=30), RANGES) is None
+    assert fit_to_ranges(_params(mode='breakout'), RANGES) is None
+    assert fit_to_ranges(_params(use_filter=None), RANGES) is None
+
+
+def test_missing_or_non_numeric_values_are_rejected():
+    params = _params()
+    del params['std']
+    assert fit_to_ranges(params, RANGES) is None
+    assert fit_to_ranges(_params(length='6'), RANGES) is None